@@ -1,677 +1,702 @@
 import streamlit as st
-import json
-from typing import Dict, List, Any
-from pathlib import Path
+import logging
+import os
+import time
 from html import escape
+from typing import List, Mapping, Optional, Sequence, Tuple
+from pathlib import Path
 
-# ページ設定
-st.set_page_config(
-    page_title="2026年衆院選 政策比較アプリ",
-    page_icon="🗳️",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from card_renderer import (
+    build_district_panels,
+    build_party_candidate_panels,
+    render_district_panel,
+    render_party_card,
+    render_search_results,
+    render_stylesheet,
+)
+from data_diff import CHANGE_ADDED, CHANGE_CHANGED, CHANGE_REMOVED, ChangeSet
+from data_loader import InboxReloader, StoreReloader, describe_load_error, read_store
+from data_shards import DEFAULT_SHARD_CACHE_SIZE, MANIFEST_NAME, ShardIntegrityError
+from election_registry import (
+    REGISTRY_NAME,
+    ElectionInfo,
+    ElectionRegistry,
+    ResidentDatasets,
+    StaticDataset,
+    load_registry,
+    single_election,
+)
+from election_store import (
+    BACKEND_MEMORY,
+    EMPTY_DATA,
+    PartyRecord,
+    PolicyStore,
+    compile_election_data,
 )
+from fragment_cache import FragmentCache, VersionedPanels, normalize_selection
+from policy_matrix import COVERAGE_COLUMN, PolicyMatrix
+from policy_search import FIELD_EXPLANATION, KIND_GENERAL, KIND_PERSONALIZED, PolicySearchIndex
+from postal_resolver import PostalResolver, load_postal_resolver, normalize_postal_code
+from rerun_metrics import NULL_METRICS, MetricsRegistry, RerunMetrics, serve_metrics
 
-# カスタムCSS - スマートフォン対応のレスポンシブデザイン + ダークモード対応
-st.markdown("""
-    <style>
-    /* 全体のフォント設定 */
-    .main {
-        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-    }
-    
-    /* ヘッダー */
-    .header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-        text-align: center;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    .header h1 {
-        margin: 0;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: white !important;
-    }
-    
-    .header p {
-        margin: 0.5rem 0 0 0;
-        font-size: 0.95rem;
-        opacity: 0.9;
-        color: white !important;
-    }
-    
-    /* ライトモード用の政党カード */
-    [data-testid="stAppViewContainer"][data-theme="light"] .party-card {
-        background: white;
-        border-radius: 16px;
-        padding: 0;
-        margin-bottom: 2.5rem;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.12);
-        border: 2px solid #e5e7eb;
-        transition: all 0.3s ease;
-        overflow: hidden;
-    }
-    
-    /* ダークモード用の政党カード */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .party-card {
-        background: #2d3748;
-        border-radius: 16px;
-        padding: 0;
-        margin-bottom: 2.5rem;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.5);
-        border: 2px solid #4a5568;
-        transition: all 0.3s ease;
-        overflow: hidden;
-    }
-    
-    .party-card:hover {
-        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
-        transform: translateY(-4px);
-    }
-    
-    /* ライトモード用の政党名 */
-    [data-testid="stAppViewContainer"][data-theme="light"] .party-name {
-        font-size: 2.2rem;
-        font-weight: 900;
-        color: #ffffff;
-        margin: 0;
-        padding: 1.5rem 2rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        letter-spacing: 0.08em;
-        text-shadow: 0 2px 8px rgba(0, 0, 0, 0.3);
-        text-align: center;
-        border-bottom: 4px solid rgba(255, 255, 255, 0.3);
-    }
-    
-    /* ダークモード用の政党名 */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .party-name {
-        font-size: 2.2rem;
-        font-weight: 900;
-        color: #ffffff;
-        margin: 0;
-        padding: 1.5rem 2rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        letter-spacing: 0.08em;
-        text-shadow: 0 2px 8px rgba(0, 0, 0, 0.5);
-        text-align: center;
-        border-bottom: 4px solid rgba(255, 255, 255, 0.2);
-    }
-    
-    /* カードの内側のパディング */
-    .party-card-content {
-        padding: 1.5rem;
-    }
-    
-    .policy-section {
-        margin-bottom: 2rem;
-    }
-    
-    /* ライトモード用のセクションタイトル */
-    [data-testid="stAppViewContainer"][data-theme="light"] .policy-section-title {
-        font-size: 1.1rem;
-        font-weight: 700;
-        color: #1f2937;
-        margin-bottom: 1rem;
-        margin-top: 0.5rem;
-        padding: 0.75rem 1rem;
-        background: linear-gradient(90deg, #f3f4f6 0%, #e5e7eb 100%);
-        border-radius: 8px;
-        border-left: 5px solid #667eea;
-    }
-
-    /* ライトモード用の政策カテゴリラベル */
-    [data-testid="stAppViewContainer"][data-theme="light"] .policy-category-label {
-        display: inline-block;
-        padding: 0.15rem 0.6rem;
-        border-radius: 999px;
-        background-color: #e0e7ff;
-        color: #3730a3;
-        font-weight: 700;
-        font-size: 0.95rem;
-    }
-    
-    /* ダークモード用のセクションタイトル */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .policy-section-title {
-        font-size: 1.1rem;
-        font-weight: 700;
-        color: #f7fafc;
-        margin-bottom: 1rem;
-        margin-top: 0.5rem;
-        padding: 0.75rem 1rem;
-        background: linear-gradient(90deg, #4a5568 0%, #2d3748 100%);
-        border-radius: 8px;
-        border-left: 5px solid #667eea;
-    }
-
-    /* ダークモード用の政策カテゴリラベル */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .policy-category-label {
-        display: inline-block;
-        padding: 0.15rem 0.6rem;
-        border-radius: 999px;
-        background-color: #4338ca;
-        color: #e0e7ff;
-        font-weight: 700;
-        font-size: 0.95rem;
-    }
-
-    .explanation-label {
-        font-weight: 700;
-        margin-bottom: 0.25rem;
-    }
-
-    /* 長文の折り返し対策（政策・解説） */
-    .party-card .policy-item {
-        overflow-wrap: anywhere;
-        word-break: break-word;
-        white-space: normal;
-    }
-
-    .party-card [data-testid="stExpander"] summary {
-        overflow-wrap: anywhere;
-        word-break: break-word;
-        white-space: normal;
-    }
-
-    .party-card [data-testid="stAlert"] {
-        overflow-wrap: anywhere;
-        word-break: break-word;
-        white-space: normal;
-    }
-    
-    /* ライトモード用の政策アイテム */
-    [data-testid="stAppViewContainer"][data-theme="light"] .policy-item {
-        padding: 0.75rem 1rem;
-        margin: 0.5rem 0;
-        background-color: #f9fafb;
-        border-left: 4px solid #667eea;
-        border-radius: 6px;
-        font-size: 0.95rem;
-        line-height: 1.7;
-        color: #1f2937;
-    }
-    
-    /* ダークモード用の政策アイテム */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .policy-item {
-        padding: 0.75rem 1rem;
-        margin: 0.5rem 0;
-        background-color: #1a202c;
-        border-left: 4px solid #667eea;
-        border-radius: 6px;
-        font-size: 0.95rem;
-        line-height: 1.7;
-        color: #f7fafc;
-    }
-    
-    /* ライトモード用の候補者カード */
-    [data-testid="stAppViewContainer"][data-theme="light"] .candidate-card {
-        background: white;
-        border-radius: 8px;
-        padding: 1rem;
-        margin-bottom: 1rem;
-        border: 1px solid #e5e7eb;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05);
-    }
-    
-    /* ダークモード用の候補者カード */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .candidate-card {
-        background: #2d3748;
-        border-radius: 8px;
-        padding: 1rem;
-        margin-bottom: 1rem;
-        border: 1px solid #4a5568;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.3);
-    }
-    
-    /* ライトモード用の候補者名 */
-    [data-testid="stAppViewContainer"][data-theme="light"] .candidate-name {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #1f2937;
-    }
-    
-    /* ダークモード用の候補者名 */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .candidate-name {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #f7fafc;
-    }
-    
-    .candidate-party {
-        display: inline-block;
-        padding: 0.25rem 0.75rem;
-        background-color: #dbeafe;
-        color: #1e40af;
-        border-radius: 12px;
-        font-size: 0.85rem;
-        margin: 0.5rem 0;
-        font-weight: 500;
-    }
-    
-    /* ライトモード用の候補者メモ */
-    [data-testid="stAppViewContainer"][data-theme="light"] .candidate-note {
-        color: #6b7280;
-        font-size: 0.9rem;
-        margin-top: 0.5rem;
-    }
-    
-    /* ダークモード用の候補者メモ */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .candidate-note {
-        color: #94a3b8;
-        font-size: 0.9rem;
-        margin-top: 0.5rem;
-    }
-    
-    /* ライトモード用のセクション見出し */
-    [data-testid="stAppViewContainer"][data-theme="light"] .section-header {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #1f2937;
-        margin: 2rem 0 1rem 0;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #e5e7eb;
-    }
-    
-    /* ダークモード用のセクション見出し */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .section-header {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #f7fafc;
-        margin: 2rem 0 1rem 0;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #4a5568;
-    }
-    
-    /* レスポンシブ対応 */
-    @media (max-width: 768px) {
-        .header h1 {
-            font-size: 1.4rem;
-        }
-        
-        .party-name {
-            font-size: 1.6rem !important;
-            padding: 1rem 1.5rem !important;
-        }
-        
-        .section-header {
-            font-size: 1.3rem;
-        }
-    }
-    
-    /* ライトモード用の空状態メッセージ */
-    [data-testid="stAppViewContainer"][data-theme="light"] .empty-state {
-        text-align: center;
-        padding: 3rem 1rem;
-        color: #6b7280;
-    }
-    
-    /* ダークモード用の空状態メッセージ */
-    [data-testid="stAppViewContainer"][data-theme="dark"] .empty-state {
-        text-align: center;
-        padding: 3rem 1rem;
-        color: #94a3b8;
-    }
-    
-    .empty-state-icon {
-        font-size: 3rem;
-        margin-bottom: 1rem;
-    }
-    </style>
-""", unsafe_allow_html=True)
+logger = logging.getLogger(__name__)
+
+# 再実行ごとの計測
+# ELECTION_METRICS_FILE（Prometheusテキスト形式のファイル）または ELECTION_METRICS_PORT（/metrics）で公開する
+# サイドバーの計測パネルは ELECTION_DEBUG_PANEL を有効にしたサーバーでだけ、URLに ?debug=1 を付けると表示する
+# （公開サイトの閲覧者が内部の計測値を見られないよう、URLだけでは有効にならない）。どれも指定が無ければ計測しない
+METRICS_FILE = os.environ.get("ELECTION_METRICS_FILE", "")
+METRICS_PORT = int(os.environ.get("ELECTION_METRICS_PORT", "0"))
+DEBUG_PANEL_ENABLED = os.environ.get("ELECTION_DEBUG_PANEL", "") in ("1", "true", "yes")
+_metrics = RerunMetrics() if (METRICS_FILE or METRICS_PORT or DEBUG_PANEL_ENABLED) else NULL_METRICS
+_metrics.phase("setup")
 
 
-@st.cache_data
-def load_election_data() -> Dict[str, Any]:
+def markdown(body: str, unsafe_allow_html: bool = False):
     """
-    election_data.jsonを読み込む
-    Geminiが生成したデータ構造に柔軟に対応
+    st.markdown と同じ（計測が有効な再実行では呼び出し回数と送信バイト数を数える）
     """
-    json_path = Path(__file__).parent / "election_data.json"
-    
+    _metrics.count_markdown(body)
+    st.markdown(body, unsafe_allow_html=unsafe_allow_html)
+
+
+@st.cache_resource
+def get_stylesheet_html() -> str:
+    """
+    カスタムCSS（styles.css を最小化した <style> 要素。読み込みと最小化はプロセスで1回だけ）
+    """
+    return render_stylesheet()
+
+
+# 分割形式（election_data/manifest.json）があればそちらを優先する
+# ELECTION_DATA_PATH を指定すると別のファイル・ディレクトリを読み込む（ベンチマーク用の合成データなど）
+SHARDED_DATA_PATH = Path(__file__).parent / "election_data" / MANIFEST_NAME
+DATA_PATH = Path(os.environ.get("ELECTION_DATA_PATH") or (
+    SHARDED_DATA_PATH if SHARDED_DATA_PATH.exists() else Path(__file__).parent / "election_data.json"))
+
+# 複数の選挙の登録簿（無ければ DATA_PATH だけを扱う。ELECTION_DATA_PATH を指定した場合も登録簿は使わない）
+REGISTRY_PATH = Path(os.environ.get("ELECTION_REGISTRY_PATH") or Path(__file__).parent / REGISTRY_NAME)
+
+# 同時にメモリに置く選挙データの数（超えると最も長く使われていない選挙を破棄）
+RESIDENT_ELECTIONS = int(os.environ.get("ELECTION_RESIDENT_DATASETS", "3"))
+
+# データバージョンごとに構築する索引・パネルの保持数（読み込み済みの各選挙の新旧バージョン分）
+VERSION_CACHE_ENTRIES = max(4, 2 * RESIDENT_ELECTIONS)
+
+# ホットリロード（選挙当日など頻繁にデータを差し替える運用向け）
+HOT_RELOAD_ENABLED = os.environ.get("ELECTION_DATA_HOT_RELOAD", "") in ("1", "true", "yes")
+HOT_RELOAD_INTERVAL = float(os.environ.get("ELECTION_DATA_RELOAD_INTERVAL", "2.0"))
+
+# 差分ファイルの取り込み（データファイルの隣の election_data.inbox/ に置かれた JSON Patch を順に適用する）
+# 有効にすると元のデータファイルもホットリロードと同じ間隔で監視する
+DELTA_INBOX_ENABLED = os.environ.get("ELECTION_DATA_INBOX", "") in ("1", "true", "yes")
+
+# 描画済みカードキャッシュの上限（バイト）
+FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get("FRAGMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# 候補者データの保持方法（memory: 既定、sqlite: election_data.sqlite から都度読み込み）
+DATA_BACKEND = os.environ.get("ELECTION_DATA_BACKEND", BACKEND_MEMORY)
+
+# 分割形式で保持するシャード数の上限
+SHARD_CACHE_SIZE = int(os.environ.get("ELECTION_DATA_SHARD_CACHE", str(DEFAULT_SHARD_CACHE_SIZE)))
+
+
+@st.cache_resource
+def get_election_registry() -> Tuple[ElectionRegistry, Optional[str]]:
+    """
+    選挙の登録簿（elections.json）を読み込む
+    読み込めない場合は DATA_PATH だけの登録簿と、表示するエラーを返す
+    （ページ設定より前に画面へ出力しないよう、ここでは表示しない）
+    """
+    if os.environ.get("ELECTION_DATA_PATH"):
+        return single_election(DATA_PATH), None
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        st.error(f"データファイルが見つかりません: {json_path}")
-        return {"parties": [], "districts": {}}
-    except json.JSONDecodeError as e:
-        st.error(f"JSONファイルの形式が正しくありません: {e}")
-        return {"parties": [], "districts": {}}
+        return load_registry(REGISTRY_PATH, DATA_PATH), None
+    except (OSError, ValueError) as e:
+        logger.warning("%s を読み込めませんでした: %s", REGISTRY_PATH, e)
+        return single_election(DATA_PATH), f"{REGISTRY_NAME} を読み込めませんでした: {e}"
+
+
+def open_dataset(election: ElectionInfo):
+    """
+    選挙データを読み込む（ホットリロード・差分ファイルの取り込みが有効なら選挙ごとに監視を開始）
+    """
+    if DELTA_INBOX_ENABLED or HOT_RELOAD_ENABLED:
+        fragment_cache = get_fragment_cache()
+        reloader = InboxReloader if DELTA_INBOX_ENABLED else StoreReloader
+        return reloader(election.path, interval=HOT_RELOAD_INTERVAL, shard_cache_size=SHARD_CACHE_SIZE,
+                        backend=DATA_BACKEND,
+                        on_change=lambda old, new: discard_changed_cards(fragment_cache, old, new)).start()
+    return StaticDataset(read_store(election.path, shard_cache_size=SHARD_CACHE_SIZE, backend=DATA_BACKEND))
+
+
+@st.cache_resource
+def get_resident_datasets() -> ResidentDatasets:
+    """
+    プロセス内で共有する読み込み済みの選挙データ（選挙IDごと・上限付きLRU）
+    コンパイル済みストアは読み取り専用のため、全セッションで共有する
+    """
+    return ResidentDatasets(open_dataset, max_entries=RESIDENT_ELECTIONS)
+
+
+def load_election_data(election: Optional[ElectionInfo] = None) -> PolicyStore:
+    """
+    選挙データの現在のスナップショットを取得（未指定なら既定の選挙）
+    1回の再実行の中では、ここで取得したストアだけを使うこと
+    """
+    election = election or get_election_registry()[0].default
+    try:
+        dataset = get_resident_datasets().get(election)
     except Exception as e:
-        st.error(f"データ読み込みエラー: {e}")
-        return {"parties": [], "districts": {}}
+        # 読み込みに失敗した選挙は保持しない（次の再実行で読み込み直す）
+        st.error(describe_load_error(election.path, e))
+        return compile_election_data(EMPTY_DATA)
+
+    store = dataset.snapshot()
+    if dataset.last_error and not store.parties:
+        st.error(dataset.last_error)
+    return store
+
+
+DATASET_SELECTION_KEYS = ("selected_professions", "selected_topics", "candidate_party")
+
+
+def reset_dataset_selection():
+    """
+    選挙を切り替えたときに、前の選挙のデータに依存する選択を消す
+    """
+    for key in DATASET_SELECTION_KEYS:
+        st.session_state.pop(key, None)
+
+
+def on_election_change():
+    """サイドバーで選挙を切り替えたとき（URLにも反映して共有・再読み込みできるようにする）"""
+    st.query_params["election"] = st.session_state["election"]
+    reset_dataset_selection()
+
+
+def select_election(registry: ElectionRegistry) -> ElectionInfo:
+    """
+    表示する選挙を決める（URLの ?election=ID またはサイドバーの選択）
+    画面には何も出力しない（選んだ選挙でページ設定をしてから display_election_selector で選択欄を出す）
+    """
+    requested = st.query_params.get("election")
+    if requested in registry and requested != st.session_state.get("election"):
+        # URLで指定された（初回表示・リンクから開いた）場合
+        if "election" in st.session_state:
+            reset_dataset_selection()
+        st.session_state["election"] = requested
+    elif st.session_state.get("election") not in registry:
+        st.session_state["election"] = registry.default.id
+    return registry.resolve(st.session_state["election"])
+
+
+def display_election_selector(registry: ElectionRegistry):
+    """サイドバーの選挙の選択欄（登録が1件なら出さない）"""
+    if len(registry) > 1:
+        with st.sidebar:
+            st.selectbox(
+                "🗳️ 選挙",
+                options=registry.ids,
+                format_func=lambda election_id: registry.resolve(election_id).title,
+                key="election",
+                on_change=on_election_change,
+            )
+
+
+def get_all_profession_keys(store: PolicyStore) -> List[str]:
+    """
+    全政党のpersonalized_policiesから職種キーを抽出（コンパイル時に構築済み）
+    """
+    return list(store.professions)
+
+
+def get_all_general_policy_keys(store: PolicyStore) -> List[str]:
+    """
+    全政党のgeneral_policiesから政策トピックを抽出（コンパイル時に構築済み）
+    """
+    return list(store.topics)
 
 
-def get_all_profession_keys(parties: List[Dict]) -> List[str]:
+@st.cache_resource
+def get_fragment_cache() -> FragmentCache:
     """
-    全政党のpersonalized_policiesから職種キーを抽出
+    全セッションで共有する描画済みカードのキャッシュ
     """
-    professions = set()
-    for party in parties:
-        if "personalized_policies" in party and isinstance(party["personalized_policies"], dict):
-            professions.update(party["personalized_policies"].keys())
-    return sorted(list(professions))
+    return FragmentCache(max_bytes=FRAGMENT_CACHE_MAX_BYTES)
 
 
-def get_all_general_policy_keys(parties: List[Dict]) -> List[str]:
+def discard_changed_cards(fragment_cache: FragmentCache, old: PolicyStore, new: PolicyStore):
     """
-    全政党のgeneral_policiesから政策トピックを抽出
+    差し替えで内容が変わった政党の、古いバージョンの描画済みカードだけを破棄
+    （変わっていない政党のカードはキーのバージョンが変わらないため、そのまま使われ続ける）
     """
-    topics = set()
-    for party in parties:
-        if "general_policies" in party and isinstance(party["general_policies"], dict):
-            topics.update(party["general_policies"].keys())
-    return sorted(list(topics))
+    if new.delta is None:
+        return
+    stale = {(party_id, old.party_revision(party_id)) for party_id in new.delta.parties}
+    fragment_cache.discard(lambda key: (key[0], key[-1]) in stale)
 
 
-def display_party_card(party: Dict, selected_professions: List[str], selected_topics: List[str], 
-                       show_explanations: bool = True):
+def display_party_card(party: PartyRecord, selected_professions: List[str], selected_topics: List[str], 
+                       show_explanations: bool = True, revision: str = ""):
     """
     政党カードを表示（選択された項目のみ）
     解説機能付き - 政党名を大きく目立たせる
+    カード全体を1つのHTMLとして組み立て、1要素として送信する
+    同じ選択内容の描画結果はプロセス内で共有キャッシュする（revision は store.party_revision(party.id)）
     """
-    def normalize_explanation(value: Any) -> str:
-        if isinstance(value, list):
-            items = [item.strip() for item in value if isinstance(item, str) and item.strip()]
-            return "\n\n".join(items)
-        if isinstance(value, str):
-            return value.strip()
-        return ""
+    key = (party.id, tuple(selected_professions), tuple(selected_topics), show_explanations, revision)
+    try:
+        card_html = get_fragment_cache().get_or_render(
+            key,
+            lambda: render_party_card(party, selected_professions, selected_topics, show_explanations),
+        )
+    except ShardIntegrityError as e:
+        display_shard_error(party.name, e)
+        return
+    markdown(card_html, unsafe_allow_html=True)
 
-    party_name = party.get("name", "不明な政党")
-    
-    # カード全体のHTML開始（政党名をヘッダーとして表示）
-    card_html = f"""
-    <div style="
-        background: white;
-        border-radius: 12px;
-        margin-bottom: 2rem;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        border: 2px solid #e5e7eb;
-        overflow: hidden;
-    ">
-        <div style="
-            font-size: 1.4rem;
-            font-weight: 800;
-            color: #ffffff;
-            padding: 0.9rem 1.5rem;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            text-align: center;
-            border-bottom: 3px solid rgba(255, 255, 255, 0.3);
-        ">
-            {party_name}
-        </div>
+
+def display_shard_error(label: str, error: ShardIntegrityError):
     """
-    
-    st.markdown(card_html, unsafe_allow_html=True)
-    
-    # コンテンツエリアの開始（政策がある場合のみパディングを追加）
-    has_content = (selected_professions and "personalized_policies" in party) or \
-                  (selected_topics and "general_policies" in party)
-    
-    if has_content:
-        st.markdown('<div style="padding: 1.5rem;">', unsafe_allow_html=True)
-  
-    # 専門職向け政策の表示
-    if selected_professions and "personalized_policies" in party:
-        personalized = party["personalized_policies"]
-        explanations = party.get("personalized_explanations", {}) if show_explanations else {}
-        
-        for profession in selected_professions:
-            if profession in personalized:
-                policies = personalized[profession]
-                
-                # セクションタイトル
-                st.markdown(f"""
-                <div style="
-                    font-size: 1.1rem;
-                    font-weight: 700;
-                    color: #1f2937;
-                    margin-bottom: 1rem;
-                    margin-top: 1rem;
-                    padding: 0.75rem 1rem;
-                    background: linear-gradient(90deg, #f3f4f6 0%, #e5e7eb 100%);
-                    border-radius: 8px;
-                    border-left: 5px solid #667eea;
-                ">
-                    <span style="
-                        display: inline-block;
-                        padding: 0.15rem 0.6rem;
-                        border-radius: 999px;
-                        background-color: #e0e7ff;
-                        color: #3730a3;
-                        font-weight: 700;
-                        font-size: 0.95rem;
-                    ">🏥 {profession}向け政策</span>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                if isinstance(policies, list):
-                    # リスト形式の政策
-                    for i, policy in enumerate(policies):
-                        explanation = None
-                        if show_explanations and profession in explanations:
-                            profession_explanations = explanations.get(profession)
-                            if isinstance(profession_explanations, list) and i < len(profession_explanations):
-                                explanation = normalize_explanation(profession_explanations[i])
-                            elif isinstance(profession_explanations, str):
-                                explanation = normalize_explanation(profession_explanations)
-
-                        if explanation:
-                            with st.expander(f"💡 {policy}", expanded=False):
-                                st.markdown('<div style="font-weight: 700; margin-bottom: 0.25rem;">解説</div>', unsafe_allow_html=True)
-                                st.info(explanation)
-                        else:
-                            st.markdown(f"""
-                            <div style="
-                                padding: 0.75rem 1rem;
-                                margin: 0.5rem 0;
-                                background-color: #f9fafb;
-                                border-left: 4px solid #667eea;
-                                border-radius: 6px;
-                                font-size: 0.95rem;
-                                line-height: 1.7;
-                                color: #1f2937;
-                            ">• {policy}</div>
-                            """, unsafe_allow_html=True)
-                
-                elif isinstance(policies, str):
-                    if show_explanations and profession in explanations:
-                        profession_explanations = explanations.get(profession)
-                        explanation = normalize_explanation(profession_explanations)
-
-                        if explanation:
-                            with st.expander(f"💡 {policies}", expanded=False):
-                                st.markdown('<div style="font-weight: 700; margin-bottom: 0.25rem;">解説</div>', unsafe_allow_html=True)
-                                st.info(explanation)
-                        else:
-                            st.markdown(f"""
-                            <div style="
-                                padding: 0.75rem 1rem;
-                                margin: 0.5rem 0;
-                                background-color: #f9fafb;
-                                border-left: 4px solid #667eea;
-                                border-radius: 6px;
-                                font-size: 0.95rem;
-                                line-height: 1.7;
-                                color: #1f2937;
-                            ">{policies}</div>
-                            """, unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"""
-                        <div style="
-                            padding: 0.75rem 1rem;
-                            margin: 0.5rem 0;
-                            background-color: #f9fafb;
-                            border-left: 4px solid #667eea;
-                            border-radius: 6px;
-                            font-size: 0.95rem;
-                            line-height: 1.7;
-                            color: #1f2937;
-                        ">{policies}</div>
-                        """, unsafe_allow_html=True)
-    
-    # 一般政策の表示
-    if selected_topics and "general_policies" in party:
-        general = party["general_policies"]
-        general_explanations = party.get("general_explanations", {}) if show_explanations else {}
-        
-        # セクションタイトル
-        st.markdown(f"""
-        <div style="
-            font-size: 1.1rem;
-            font-weight: 700;
-            color: #1f2937;
-            margin-bottom: 1rem;
-            margin-top: 1rem;
-            padding: 0.75rem 1rem;
-            background: linear-gradient(90deg, #f3f4f6 0%, #e5e7eb 100%);
-            border-radius: 8px;
-            border-left: 5px solid #667eea;
-        ">
-            <span style="
-                display: inline-block;
-                padding: 0.15rem 0.6rem;
-                border-radius: 999px;
-                background-color: #e0e7ff;
-                color: #3730a3;
-                font-weight: 700;
-                font-size: 0.95rem;
-            ">📋 一般政策</span>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        for topic in selected_topics:
-            if topic in general:
-                policy = general[topic]
-                
-                if show_explanations and topic in general_explanations:
-                    explanation = general_explanations[topic]
-                    with st.expander(f"💡 {topic}: {policy}", expanded=False):
-                        st.markdown('<div style="font-weight: 700; margin-bottom: 0.25rem;">解説</div>', unsafe_allow_html=True)
-                        st.info(explanation)
-                else:
-                    st.markdown(f"""
-                    <div style="
-                        padding: 0.75rem 1rem;
-                        margin: 0.5rem 0;
-                        background-color: #f9fafb;
-                        border-left: 4px solid #667eea;
-                        border-radius: 6px;
-                        font-size: 0.95rem;
-                        line-height: 1.7;
-                        color: #1f2937;
-                    "><strong>{topic}:</strong> {policy}</div>
-                    """, unsafe_allow_html=True)
-    
-    # カード終了
-    if has_content:
-        st.markdown('</div>', unsafe_allow_html=True)  # コンテンツエリア終了
-    st.markdown('</div>', unsafe_allow_html=True)  # カード終了
+    分割形式のシャードが壊れている場合に、その政党・選挙区（label）の欄にだけエラーを表示する
+    （ページ全体は表示を続ける。壊れたシャードはログに記録する）
+    """
+    logger.error("シャード %s の内容がマニフェストと一致しません（%s）", error.path, label)
+    st.error(f"{label}のデータを読み込めませんでした。時間をおいて再読み込みしてください")
+
+
+VIEW_CARDS = "カード"
+VIEW_MATRIX = "比較表"
+VIEW_CHANGES = "最近の変更"
 
 
-def display_candidates(district_name: str, candidates: List[Dict]):
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def get_policy_matrix(data_version: str, _store: PolicyStore) -> PolicyMatrix:
     """
-    候補者リストを表示
+    全職種・全トピック × 全政党の比較表（データバージョンごとに1回だけ構築）
     """
-    st.markdown(f'<div class="section-header">📍 {district_name}の立候補者</div>', 
-                unsafe_allow_html=True)
-    
-    if not candidates:
-        st.markdown("""
-            <div class="empty-state">
-                <div class="empty-state-icon">🔍</div>
-                <p>この選挙区の候補者情報はまだ登録されていません</p>
-            </div>
-        """, unsafe_allow_html=True)
+    return PolicyMatrix.from_store(_store)
+
+
+def display_policy_matrix(matrix: PolicyMatrix, selected_professions: List[str], selected_topics: List[str]):
+    """
+    選択された項目の比較表（行 = 職種・トピック、列 = 政党）を1つの表として表示
+    政策の記載が無いセルは「記載なし」と表示する
+    """
+    rows = matrix.rows_for(selected_professions, selected_topics)
+    if rows.size == 0:
+        st.warning("表示できる項目がありません")
         return
-    
-    for candidate in candidates:
-        name = escape(str(candidate.get("name", "不明")))
-        party = escape(str(candidate.get("party", "無所属")))
-        note_value = candidate.get("memo") or candidate.get("note") or ""
-        note = escape(str(note_value))
-        
-        st.markdown(f"""
-            <div class="candidate-card">
-                <div class="candidate-name">{name}</div>
-                <div class="candidate-party">{party}</div>
-                {f'<div class="candidate-note">{note}</div>' if note else ''}
-            </div>
-        """, unsafe_allow_html=True)
+    st.dataframe(
+        matrix.frame(rows),
+        height=min(36 + 35 * int(rows.size), 800),
+        placeholder="— 記載なし",
+        column_config={
+            COVERAGE_COLUMN: st.column_config.ProgressColumn(
+                COVERAGE_COLUMN, help="この項目の政策を掲げている政党の数", format="%d党",
+                min_value=0, max_value=matrix.party_count, pinned=True),
+        },
+    )
+    missing = matrix.missing_count(rows)
+    if missing:
+        st.caption(f"記載なし: {missing}件 ／ {rows.size * matrix.party_count}件（詳しい解説はカード表示で確認できます）")
+
+
+@st.cache_resource
+def get_district_panel_versions() -> VersionedPanels:
+    """データバージョンごとの選挙区パネルHTML（プロセス内で共有）"""
+    return VersionedPanels(VERSION_CACHE_ENTRIES)
+
+
+@st.cache_resource
+def get_party_candidate_panel_versions() -> VersionedPanels:
+    """データバージョンごとの政党別候補者一覧HTML（プロセス内で共有）"""
+    return VersionedPanels(VERSION_CACHE_ENTRIES)
+
+
+def base_version(store: PolicyStore) -> Optional[str]:
+    """差し替えで公開されたストアなら、直前に公開されていたデータバージョン"""
+    return store.delta.base_version if store.delta is not None else None
+
+
+def get_district_panels(store: PolicyStore) -> Mapping[str, str]:
+    """
+    全選挙区の候補者パネルHTML（データバージョンごとに1回だけ構築）
+    候補者を遅延読み込みするストア（分割形式・SQLite）では参照された選挙区だけを描画する
+    差し替えで公開されたバージョンは、直前のバージョンのパネルから変わった選挙区だけ描画し直す
+    """
+    return get_district_panel_versions().get(
+        store.version,
+        lambda previous: build_district_panels(store, lazy=store.lazy_candidates, previous=previous),
+        base_version=base_version(store),
+    )
+
+
+def get_party_candidate_panels(store: PolicyStore) -> Mapping[str, str]:
+    """
+    政党ごとの全国候補者一覧HTML（データバージョンごとに1回だけ構築）
+    候補者を遅延読み込みするストア（分割形式・SQLite）では参照された政党だけを描画する
+    差し替えで公開されたバージョンは、直前のバージョンの一覧から候補者が変わった政党だけ描画し直す
+    """
+    return get_party_candidate_panel_versions().get(
+        store.version,
+        lambda previous: build_party_candidate_panels(store, lazy=store.lazy_candidates, previous=previous),
+        base_version=base_version(store),
+    )
+
+
+def get_recent_changes(election: ElectionInfo) -> Sequence[ChangeSet]:
+    """
+    選挙データの最近の変更（新しい順。ホットリロード・差分ファイルの取り込みで差し替えた場合のみ）
+    """
+    return get_resident_datasets().get(election).changes
+
+
+def display_recent_changes(change_sets: Sequence[ChangeSet]):
+    """
+    最近の変更を、差し替えごとに1つの表（種類・政党/選挙区・項目・変更前・変更後）として表示
+    """
+    markdown('<div class="section-header">🕒 最近の変更</div>', unsafe_allow_html=True)
+    if not change_sets:
+        st.info("アプリの起動後に更新されたデータはまだありません")
+        return
+    for changes in change_sets:
+        counts = changes.counts()
+        published = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(changes.published_at))
+        markdown(f"**{published} の更新** — 追加 {counts[CHANGE_ADDED]}件・削除 {counts[CHANGE_REMOVED]}件・"
+                 f"変更 {counts[CHANGE_CHANGED]}件")
+        st.dataframe(
+            [change.to_dict() for change in changes.changes],
+            hide_index=True,
+            height=min(36 + 35 * len(changes), 400),
+            column_order=("kind", "label", "item", "field", "old", "new"),
+            column_config={
+                "kind": "種類", "label": "政党・選挙区", "item": "項目", "field": "欄",
+                "old": "変更前", "new": "変更後",
+            },
+        )
+        st.caption(f"データバージョン {changes.base_version} → {changes.version}")
+
+
+def display_candidate_toggle(party: PartyRecord, count: int):
+    """
+    政党カード下の「候補者一覧」ボタン
+    押すとカード一覧の下にその政党の全国の候補者を表示（もう一度押すと閉じる）
+    """
+    if count == 0:
+        return
+    if st.button(f"👥 {party.name}の候補者一覧（{count}名）", key=f"party-candidates-{party.id}",
+                 use_container_width=True):
+        current = st.session_state.get("candidate_party")
+        st.session_state["candidate_party"] = None if current == party.id else party.id
+
+
+@st.cache_resource(max_entries=VERSION_CACHE_ENTRIES)
+def get_policy_search_index(data_version: str, _store: PolicyStore) -> PolicySearchIndex:
+    """
+    政策・解説の全文検索インデックス（データバージョンごとに1回だけ構築）
+    """
+    return PolicySearchIndex.from_store(_store)
+
+
+def show_search_hits_in_cards(professions: List[str], topics: List[str], explanations: bool):
+    """
+    検索でヒットした職種・トピックを比較表示の選択に追加する（ボタンのコールバック）
+    """
+    st.session_state["selected_professions"] = sorted(
+        set(st.session_state.get("selected_professions", [])) | set(professions))
+    st.session_state["selected_topics"] = sorted(
+        set(st.session_state.get("selected_topics", [])) | set(topics))
+    if explanations:
+        st.session_state["show_explanations"] = True
+
+
+def display_search_results(query: str, store: PolicyStore):
+    """
+    キーワード検索の結果を表示
+    ボタンで該当項目を政党カードに表示し、結果のリンクからカード内の該当箇所へ移動できる
+    """
+    try:
+        hits = get_policy_search_index(store.version, store).search(query)
+    except ShardIntegrityError as e:
+        display_shard_error("キーワード検索", e)
+        return
+    markdown(render_search_results(query, hits), unsafe_allow_html=True)
+    
+    if hits:
+        professions = sorted({hit.document.key for hit in hits if hit.document.kind == KIND_PERSONALIZED})
+        topics = sorted({hit.document.key for hit in hits if hit.document.kind == KIND_GENERAL})
+        explanations = any(hit.document.field == FIELD_EXPLANATION for hit in hits)
+        st.button(
+            "🎯 該当する項目を政党カードで表示",
+            on_click=show_search_hits_in_cards,
+            args=(professions, topics, explanations),
+            help="検索結果の職種・トピックを比較表示に追加します。結果の政党名をクリックすると該当箇所へ移動します"
+        )
+    markdown("<br>", unsafe_allow_html=True)
+
+
+@st.cache_resource
+def get_postal_resolver() -> Optional[PostalResolver]:
+    """
+    郵便番号・市区町村 → 選挙区の解決表（mmap、プロセス内で共有）
+    validate_data.py・postal_resolver.py で作成済みの表を開くだけ（無い・古い・空なら None で、検索は無効）
+    """
+    try:
+        return load_postal_resolver()
+    except (OSError, ValueError) as e:
+        st.warning(f"郵便番号データを読み込めませんでした: {e}")
+        return None
+
+
+def district_search_hints(resolver: Optional[PostalResolver]) -> Tuple[str, str]:
+    """
+    選挙区検索の見出しと入力例（市区町村・郵便番号は postal_districts.csv に登録がある場合だけ案内する）
+    """
+    targets = ["選挙区", "都道府県"]
+    examples = ["千葉8区", "ちば"]
+    if resolver is not None and resolver.has_municipalities:
+        targets.append("市区町村")
+        examples.append("柏市")
+    if resolver is not None and resolver.has_postal_codes:
+        targets.append("郵便番号")
+        examples.append("277-0005")
+    return "・".join(targets) + "で検索", "例: " + "、".join(examples)
+
+
+def find_districts(query: str, store: PolicyStore, resolver: Optional[PostalResolver]) -> List[str]:
+    """
+    検索語から選挙区を探す
+    郵便番号なら解決表、それ以外は市区町村名の完全一致＋検索インデックス（＋候補者の全文検索）の順で返す
+    """
+    resolved: List[str] = []
+    if resolver is not None:
+        if normalize_postal_code(query) is not None:
+            resolved = resolver.districts_for_postal(query)
+        else:
+            resolved = resolver.districts_for_municipality(query)
+
+    # データに存在する選挙区だけに絞る
+    results = [name for name in resolved if name in store.districts]
+    if normalize_postal_code(query) is None:
+        results += [name for name in store.district_search.search(query) if name not in results]
+        # SQLiteバックエンドでは候補者名・メモの全文検索からも選挙区を探す
+        search_candidates = getattr(store.districts, "search_candidates", None)
+        if search_candidates is not None:
+            results += [name for name in search_candidates(query) if name not in results]
+    return results
+
+
+def display_candidates(panel_html: str):
+    """
+    候補者リストを表示（事前構築済みのパネルを1要素として送信）
+    """
+    markdown(panel_html, unsafe_allow_html=True)
+
+
+@st.cache_resource
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    プロセス内で共有する計測値の集計（ELECTION_METRICS_PORT 指定時は /metrics も起動）
+    ポートを開けない場合（複数のプロセスで同じポートを指定した場合など）は警告を1回ログに出し、
+    /metrics なしで集計を続ける（ELECTION_METRICS_FILE 指定時はファイルへの書き出しは行う）
+    """
+    registry = MetricsRegistry()
+    if METRICS_PORT:
+        fragment_cache = get_fragment_cache()
+        try:
+            serve_metrics(registry, METRICS_PORT, gauges=lambda: fragment_cache_gauges(fragment_cache))
+        except OSError as e:
+            logger.warning("ELECTION_METRICS_PORT=%d で /metrics を起動できませんでした: %s", METRICS_PORT, e)
+    return registry
+
+
+def fragment_cache_gauges(fragment_cache: FragmentCache) -> dict:
+    """描画済みカードキャッシュの統計（Prometheus の gauge として出力）"""
+    return {f"fragment_cache_{name}": value for name, value in fragment_cache.stats().items()}
+
+
+def display_debug_panel(metrics: RerunMetrics):
+    """
+    サイドバーの計測パネル（ELECTION_DEBUG_PANEL を有効にしたサーバーで ?debug=1 のとき）
+    パネル自体の描画は計測に含めない
+    """
+    rows = "\n".join(f"| {name} | {seconds * 1000:.2f} |" for name, seconds in metrics.phase_seconds().items())
+    with st.sidebar:
+        with st.expander("🛠️ 計測（この再実行）", expanded=True):
+            st.markdown("| 段階 | ms |\n|---|---:|\n" + rows)
+            st.caption(f"合計 {metrics.total_seconds * 1000:.1f} ms ／ st.markdown {metrics.markdown_calls}回 ／ "
+                       f"HTML {metrics.html_bytes:,} バイト")
+            st.caption(f"カードキャッシュ: {get_fragment_cache().stats()}")
+            st.caption(f"選挙データ: {get_resident_datasets().stats()} ／ 読み込み済み: "
+                       f"{', '.join(get_resident_datasets().resident_ids())}")
+
+
+def debug_panel_requested() -> bool:
+    """この再実行で計測パネルを表示するか（サーバー側で有効な場合だけ ?debug=1 を見る）"""
+    return DEBUG_PANEL_ENABLED and st.query_params.get("debug") == "1"
+
+
+def finish_rerun_metrics():
+    """再実行の計測を締めて、集計・公開する（計測しない再実行では何もしない）"""
+    if not _metrics.enabled:
+        return
+    _metrics.finish()
+    registry = get_metrics_registry()
+    registry.record(_metrics)
+    if METRICS_FILE:
+        try:
+            registry.write_textfile(Path(METRICS_FILE), fragment_cache_gauges(get_fragment_cache()))
+        except OSError:
+            pass
+    if debug_panel_requested():
+        display_debug_panel(_metrics)
 
 
 def main():
+    """1回の再実行（計測が有効なら各段階の時間を記録する）"""
+    try:
+        render_page()
+    finally:
+        finish_rerun_metrics()
+
+
+def render_page():
+    # 表示する選挙
+    _metrics.phase("election")
+    registry, registry_error = get_election_registry()
+    election = select_election(registry)
+    # ページ設定（選挙ごとのタイトル。他の出力より前に1回だけ呼ぶ）
+    st.set_page_config(
+        page_title=f"{election.short_title} 政策比較アプリ",
+        page_icon="🗳️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # カスタムCSS - スマートフォン対応のレスポンシブデザイン + ダークモード対応
+    # カード・パネルのHTMLはクラス名だけを含み、見た目はこのスタイルシートで指定する
+    # （Streamlitは再実行で送られなかった要素を消すため、スタイルシートも再実行ごとに1要素として送る）
+    markdown(get_stylesheet_html(), unsafe_allow_html=True)
+    if registry_error:
+        st.error(registry_error)
+    display_election_selector(registry)
+    
     # ヘッダー
-    st.markdown("""
+    _metrics.phase("header")
+    subtitle = f"{escape(election.subtitle)} | " if election.subtitle else ""
+    markdown(f"""
         <div class="header">
-            <h1>🗳️ 2026年衆議院議員総選挙 政策比較</h1>
-            <p>2026年2月8日投開票 | あなたと家族のための政策ガイド</p>
+            <h1>🗳️ {escape(election.title)} 政策比較</h1>
+            <p>{subtitle}あなたと家族のための政策ガイド</p>
         </div>
     """, unsafe_allow_html=True)
     
     # データ読み込み
-    data = load_election_data()
-    parties = data.get("parties", [])
-    districts = data.get("districts", {})
+    _metrics.phase("load_data")
+    store = load_election_data(election)
+    parties = store.parties
     
     if not parties:
-        st.warning("政党データが読み込めませんでした。election_data.jsonを確認してください。")
+        st.warning(f"政党データが読み込めませんでした。{election.path.name} を確認してください。")
         return
     
     # 利用可能な職種と一般トピックを動的に取得
-    available_professions = get_all_profession_keys(parties)
-    available_topics = get_all_general_policy_keys(parties)
+    _metrics.phase("facets")
+    available_professions = get_all_profession_keys(store)
+    available_topics = get_all_general_policy_keys(store)
     
     # サイドバー - ユーザー属性と関心事の選択
+    _metrics.phase("sidebar")
     with st.sidebar:
-        st.markdown("### 👤 あなたの属性を選択")
-        st.markdown("*複数選択可能です*")
+        markdown("### 🔎 キーワード検索")
+        
+        policy_query = st.text_input(
+            "政策・解説を検索",
+            placeholder="例: 奨学金、タスクシフト、消費税",
+            help="全政党の政策と詳しい解説からキーワードを探します（空白区切りで複数語のAND検索）"
+        )
+        
+        markdown("---")
+        markdown("### 👤 あなたの属性を選択")
+        markdown("*複数選択可能です*")
         
         selected_professions = st.multiselect(
             "職種・立場",
             options=available_professions,
-            default=[],
+            key="selected_professions",
             help="あなたやご家族に該当する職種を選択してください"
         )
         
-        st.markdown("---")
-        st.markdown("### 📌 関心のある政策")
+        markdown("---")
+        markdown("### 📌 関心のある政策")
         
         selected_topics = st.multiselect(
             "政策トピック",
             options=available_topics,
-            default=[],
+            key="selected_topics",
             help="比較したい政策分野を選択してください"
         )
         
-        st.markdown("---")
-        st.markdown("### 💡 表示設定")
+        markdown("---")
+        markdown("### 💡 表示設定")
         
         show_explanations = st.checkbox(
             "詳しい解説を表示",
-            value=False,
+            key="show_explanations",
             help="政策の詳しい説明を展開可能な形式で表示します（オンにすると表示項目が増えます）"
         )
         
-        st.markdown("---")
-        st.markdown("### 🗺️ 選挙区検索")
+        view_mode = st.radio(
+            "表示形式",
+            options=[VIEW_CARDS, VIEW_MATRIX, VIEW_CHANGES],
+            key="view_mode",
+            horizontal=True,
+            help="比較表では、選択した項目ごとに全政党の政策を1つの表で横に並べて表示します。"
+                 "最近の変更では、データが更新されるたびにどの政策・解説・候補者が変わったかを表示します"
+        )
+        
+        markdown("---")
+        markdown("### 🗺️ 選挙区検索")
+        
+        search_label, search_placeholder = district_search_hints(get_postal_resolver())
+        district_query = st.text_input(
+            search_label,
+            placeholder=search_placeholder,
+            help="ひらがな・カタカナの読みや、1文字程度の誤字でも検索できます"
+        )
+        
+        _metrics.phase("district_search")
+        if district_query:
+            district_options = find_districts(district_query, store, get_postal_resolver())
+            if not district_options:
+                st.caption("該当する選挙区が見つかりませんでした")
+        else:
+            district_options = store.district_names
         
-        district_list = ["選択してください"] + sorted(list(districts.keys()))
         selected_district = st.selectbox(
             "お住まいの選挙区",
-            options=district_list,
+            options=district_options,
+            index=None,
+            placeholder="選択してください",
             help="選挙区を選択すると候補者情報が表示されます"
         )
     
+    # キーワード検索の結果
+    _metrics.phase("policy_search")
+    if policy_query.strip():
+        display_search_results(policy_query.strip(), store)
+    
+    # 最近の変更（データの更新ごとの追加・削除・変更）
+    if view_mode == VIEW_CHANGES:
+        _metrics.phase("changes")
+        display_recent_changes(get_recent_changes(election))
+        return
+    
     # メインコンテンツ
     if not selected_professions and not selected_topics:
-        st.markdown("""
+        markdown("""
             <div class="empty-state">
                 <div class="empty-state-icon">👈</div>
                 <p>左のサイドバーから、あなたの属性や関心のある政策を選択してください</p>
@@ -679,8 +704,13 @@ def main():
         """, unsafe_allow_html=True)
         return
     
+    # キャッシュキーと表示順をそろえるため、選択内容を正規化
+    selected_professions = list(normalize_selection(selected_professions))
+    selected_topics = list(normalize_selection(selected_topics))
+    
     # 政策比較セクション
-    st.markdown('<div class="section-header">🎯 政党別政策比較</div>', unsafe_allow_html=True)
+    _metrics.phase("party_cards")
+    markdown('<div class="section-header">🎯 政党別政策比較</div>', unsafe_allow_html=True)
     
     # 選択された項目の表示
     col1, col2 = st.columns(2)
@@ -691,39 +721,69 @@ def main():
         if selected_topics:
             st.info(f"**選択中のトピック:** {', '.join(selected_topics)}")
     
-    st.markdown("<br>", unsafe_allow_html=True)
+    markdown("<br>", unsafe_allow_html=True)
     
-    # 政党カードをカラム表示（レスポンシブ対応）
-    # PC: 2カラム、タブレット: 2カラム、スマホ: 1カラム（自動調整）
     num_parties = len(parties)
     
     if num_parties == 0:
         st.warning("表示できる政党がありません")
         return
     
-    # 2カラムレイアウト
-    for i in range(0, num_parties, 2):
-        cols = st.columns(2)
-        
-        # 左カラム
-        with cols[0]:
-            display_party_card(parties[i], selected_professions, selected_topics, show_explanations)
-        
-        # 右カラム（存在する場合のみ）
-        if i + 1 < num_parties:
-            with cols[1]:
-                display_party_card(parties[i + 1], selected_professions, selected_topics, show_explanations)
+    if view_mode == VIEW_MATRIX:
+        # 比較表（全政党を1つの表で表示）
+        try:
+            matrix = get_policy_matrix(store.version, store)
+        except ShardIntegrityError as e:
+            display_shard_error("比較表", e)
+        else:
+            display_policy_matrix(matrix, selected_professions, selected_topics)
+    else:
+        # 政党カードをカラム表示（レスポンシブ対応）
+        # PC: 2カラム、タブレット: 2カラム、スマホ: 1カラム（自動調整）
+        for i in range(0, num_parties, 2):
+            cols = st.columns(2)
+            
+            # 左カラム
+            with cols[0]:
+                display_party_card(parties[i], selected_professions, selected_topics, show_explanations,
+                                   store.party_revision(parties[i].id))
+                display_candidate_toggle(parties[i], store.candidate_count(parties[i].id))
+            
+            # 右カラム（存在する場合のみ）
+            if i + 1 < num_parties:
+                with cols[1]:
+                    display_party_card(parties[i + 1], selected_professions, selected_topics, show_explanations,
+                                       store.party_revision(parties[i + 1].id))
+                    display_candidate_toggle(parties[i + 1], store.candidate_count(parties[i + 1].id))
+    
+    # 政党別の候補者一覧（カード下のボタンで選択された政党）
+    _metrics.phase("candidates")
+    candidate_party = st.session_state.get("candidate_party")
+    party_panels = get_party_candidate_panels(store)
+    if candidate_party in party_panels:
+        markdown("<br>", unsafe_allow_html=True)
+        try:
+            markdown(party_panels[candidate_party], unsafe_allow_html=True)
+        except ShardIntegrityError as e:
+            party_name = next((party.name for party in parties if party.id == candidate_party), candidate_party)
+            display_shard_error(f"{party_name}の候補者一覧", e)
     
     # 候補者情報セクション
-    if selected_district and selected_district != "選択してください":
-        st.markdown("<br><br>", unsafe_allow_html=True)
-        candidates = districts.get(selected_district, [])
-        display_candidates(selected_district, candidates)
+    if selected_district:
+        markdown("<br><br>", unsafe_allow_html=True)
+        panels = get_district_panels(store)
+        try:
+            panel_html = panels.get(selected_district) or render_district_panel(selected_district, ())
+        except ShardIntegrityError as e:
+            display_shard_error(selected_district, e)
+        else:
+            display_candidates(panel_html)
     
     # フッター
-    st.markdown("<br><br>", unsafe_allow_html=True)
-    st.markdown("---")
-    st.markdown("""
+    _metrics.phase("footer")
+    markdown("<br><br>", unsafe_allow_html=True)
+    markdown("---")
+    markdown("""
         <div style="text-align: center; color: #6b7280; font-size: 0.85rem;">
             <p>このアプリは各政党の公約を比較するための参考情報です。<br>
             投票の際は、必ず公式情報もご確認ください。</p>
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+選挙区パネル事前構築のベンチマーク
+全国289選挙区・約1,100名規模の合成データで、構築時間・メモリ・参照時間を計測します
+
+使い方:
+    python benchmarks/bench_districts.py [--districts 289] [--candidates 4]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from card_renderer import build_district_panels, render_district_panel  # noqa: E402
+from election_store import compile_election_data  # noqa: E402
+
+
+PARTY_SHORT_NAMES = ["自民", "中道", "維新", "国民", "共産", "参政", "れいわ", "無所属"]
+MEMO = "県内出身。地方議員や民間企業での経験を経て国政へ。物価高対策と地域医療、子育て支援の充実を訴える。"
+
+
+def build_districts(num_districts: int, num_candidates: int) -> dict:
+    """合成の選挙区データ"""
+    return {
+        f"選挙区{i + 1}区": [
+            {
+                "name": f"候補 {i + 1}-{j + 1}",
+                "party": PARTY_SHORT_NAMES[(i + j) % len(PARTY_SHORT_NAMES)],
+                "memo": MEMO,
+            }
+            for j in range(num_candidates)
+        ]
+        for i in range(num_districts)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="選挙区パネル事前構築のベンチマーク")
+    parser.add_argument("--districts", type=int, default=289, help="選挙区数")
+    parser.add_argument("--candidates", type=int, default=4, help="1選挙区あたりの候補者数")
+    parser.add_argument("--lookups", type=int, default=100000, help="参照の回数")
+    args = parser.parse_args()
+
+    store = compile_election_data({"parties": [], "districts": build_districts(args.districts, args.candidates)})
+    names = store.district_names
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    panels = build_district_panels(store)
+    build_ms = (time.perf_counter() - start) * 1000
+    panel_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 事前構築済みパネルの参照（再実行ごとのコスト）
+    start = time.perf_counter()
+    for i in range(args.lookups):
+        panels.get(names[i % len(names)])
+    lookup_us = (time.perf_counter() - start) / args.lookups * 1e6
+
+    # 従来方式: 再実行ごとのエスケープ＋HTML構築と選択肢のソート
+    rounds = 2000
+    start = time.perf_counter()
+    for i in range(rounds):
+        name = names[i % len(names)]
+        render_district_panel(name, store.districts[name])
+        sorted(list(store.districts.keys()))
+    legacy_us = (time.perf_counter() - start) / rounds * 1e6
+
+    total_candidates = sum(len(c) for c in store.districts.values())
+    print(f"📊 選挙区パネル: {len(names)}選挙区 / {total_candidates}名")
+    print(f"  事前構築時間: {build_ms:.1f} ms（データバージョンごとに1回）")
+    print(f"  パネルHTMLの常駐メモリ: {panel_bytes / 1024:.0f} KiB")
+    print(f"  再実行あたり（事前構築済み）: {lookup_us:.2f} µs")
+    print(f"  再実行あたり（従来: 構築＋ソート）: {legacy_us:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+政党カード描画のベンチマーク
+AppTestで全職種・全トピック・解説ONの再実行を行い、送信要素数（delta数）と再実行時間を計測します
+
+使い方:
+    python benchmarks/bench_render.py [--app app.py] [--runs 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def count_deltas(node) -> int:
+    """要素ツリー内のノード数（ブロックも1 deltaとして数える）"""
+    children = getattr(node, "children", None) or {}
+    return sum(1 + count_deltas(child) for child in children.values())
+
+
+def markdown_bytes(at: AppTest) -> int:
+    """送信されたMarkdown/HTMLのバイト数"""
+    return sum(len(m.value.encode("utf-8")) for m in at.markdown)
+
+
+def run_app_benchmark(app_path: Path, runs: int) -> dict:
+    """全項目を選択した状態で再実行を繰り返し計測"""
+    at = AppTest.from_file(str(app_path), default_timeout=60)
+    at.run()
+
+    professions, topics = at.sidebar.multiselect[0], at.sidebar.multiselect[1]
+    professions.set_value(list(professions.options))
+    topics.set_value(list(topics.options))
+    at.sidebar.checkbox[0].set_value(True)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "deltas": count_deltas(at._tree),
+        "markdown_calls": len(at.markdown),
+        "expanders": len(at.expander),
+        "markdown_bytes": markdown_bytes(at),
+        "rerun_ms_median": statistics.median(timings) * 1000,
+        "rerun_ms_min": min(timings) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="政党カード描画のベンチマーク")
+    parser.add_argument("--app", type=Path, default=ROOT / "app.py", help="計測するアプリ")
+    parser.add_argument("--runs", type=int, default=20, help="再実行の回数")
+    args = parser.parse_args()
+
+    result = run_app_benchmark(args.app, args.runs)
+
+    print(f"📊 描画ベンチマーク: {args.app}")
+    print(f"  送信要素数（delta）: {result['deltas']}")
+    print(f"  st.markdown 要素: {result['markdown_calls']}")
+    print(f"  st.expander 要素: {result['expanders']}")
+    print(f"  HTMLバイト数: {result['markdown_bytes']}")
+    print(f"  再実行時間: 中央値 {result['rerun_ms_median']:.1f} ms / 最小 {result['rerun_ms_min']:.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+アプリ全体のベンチマーク
+合成データ（generate_data.py）で、データ読み込み・項目一覧・政党カード・候補者表示・データ検証の各関数と、
+AppTestによる再実行全体の時間を計測し、結果をJSONで出力します
+
+結果はJSON Lines（1回の計測＝1行）で追記できるため、変更ごとに記録して推移を追えます
+
+使い方:
+    python benchmarks/bench_suite.py [--scale national] [--runs 10] [--output bench_results.jsonl]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_data import SCALES, generate_election_data  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def time_calls(func: Callable[[], Any], runs: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """func を runs 回実行した時間（setup は各回の前に実行し、計測には含めない）"""
+    timings = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000, "runs": runs}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_function_benchmarks(data_path: Path, runs: int) -> Dict[str, Dict[str, float]]:
+    """app.py の各関数を直接呼び出して計測（Streamlitの実行環境外のため描画結果は送信されない）"""
+    os.environ["ELECTION_DATA_PATH"] = str(data_path)
+    import app
+    from validate_data import validate_structure
+
+    results = {}
+    results["load_election_data_cold"] = time_calls(app.load_election_data, runs,
+                                                    setup=app.get_resident_datasets.clear)
+    results["load_election_data_warm"] = time_calls(app.load_election_data, runs)
+
+    store = app.load_election_data()
+    results["get_all_profession_keys"] = time_calls(lambda: app.get_all_profession_keys(store), runs)
+    results["get_all_general_policy_keys"] = time_calls(lambda: app.get_all_general_policy_keys(store), runs)
+
+    professions = app.get_all_profession_keys(store)
+    topics = app.get_all_general_policy_keys(store)
+
+    def display_all_cards():
+        for party in store.parties:
+            app.display_party_card(party, professions, topics, True, store.party_revision(party.id))
+
+    results["display_party_card_cold"] = time_calls(display_all_cards, runs, setup=app.get_fragment_cache().clear)
+    results["display_party_card_warm"] = time_calls(display_all_cards, runs)
+
+    def display_all_districts():
+        panels = app.get_district_panels(store)
+        for name in store.district_names:
+            app.display_candidates(panels[name])
+
+    results["display_candidates_cold"] = time_calls(display_all_districts, runs,
+                                                    setup=app.get_district_panel_versions().clear)
+    results["display_candidates_warm"] = time_calls(display_all_districts, runs)
+
+    with open(data_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    results["validate_structure"] = time_calls(lambda: validate_structure(data), runs)
+    return results
+
+
+def run_apptest_benchmark(data_path: Path, runs: int) -> Dict[str, Any]:
+    """AppTestで全職種・全トピック・解説ONの再実行を計測（bench_render.py と同じ手順）"""
+    from bench_render import run_app_benchmark
+
+    os.environ["ELECTION_DATA_PATH"] = str(data_path)
+    return run_app_benchmark(ROOT / "app.py", runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="アプリ全体のベンチマーク")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="national", help="合成データの規模")
+    parser.add_argument("--data", type=Path, help="合成データの代わりに使うデータファイル")
+    parser.add_argument("--runs", type=int, default=10, help="各関数の計測回数")
+    parser.add_argument("--apptest-runs", type=int, default=5, help="AppTestの再実行回数（0 で省略）")
+    parser.add_argument("--seed", type=int, default=0, help="合成データの乱数の種")
+    parser.add_argument("--output", type=Path, help="結果を1行のJSONとして追記するファイル（JSON Lines）")
+    args = parser.parse_args()
+
+    import streamlit
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.data is not None:
+            data_path = args.data
+            dataset: Dict[str, Any] = {"path": str(args.data)}
+        else:
+            data_path = Path(tmp) / "election_data.json"
+            params = SCALES[args.scale]
+            data_path.write_text(json.dumps(generate_election_data(seed=args.seed, **params), ensure_ascii=False),
+                                 encoding='utf-8')
+            dataset = {"scale": args.scale, "seed": args.seed, **params}
+        dataset["bytes"] = data_path.stat().st_size
+
+        functions = run_function_benchmarks(data_path, args.runs)
+        apptest = run_apptest_benchmark(data_path, args.apptest_runs) if args.apptest_runs > 0 else None
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "dataset": dataset,
+        "functions": functions,
+        "apptest": apptest,
+    }
+
+    line = json.dumps(result, ensure_ascii=False)
+    if args.output is not None:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+    print(line)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
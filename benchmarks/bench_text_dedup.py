@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+政策・解説テキストの重複除去（text_table.py）の効果
+JSONからコンパイルした政党レコードが保持するメモリ（tracemalloc）を、共有前と共有後で比較し、
+成果物（election_data.bin）の解説ブロブの大きさも重複除去の前後で比較します
+
+使い方:
+    python benchmarks/bench_text_dedup.py [--scale national] [--data election_data.json]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from election_store import compile_party, share_texts  # noqa: E402
+from explanation_blob import build_explanation_blob  # noqa: E402
+from generate_data import SCALES, generate_election_data  # noqa: E402
+
+
+def measure_parties(raw: bytes):
+    """政党レコードの保持メモリ（共有前, 共有後）、文字列表の統計（延べバイト数, 重複除去後, 件数）"""
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(raw)
+    parties = tuple(compile_party(party, i) for i, party in enumerate(data.get("parties", []))
+                    if isinstance(party, dict))
+    # 元のJSONを手放し、レコードが参照している分だけを数える
+    del data
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+
+    # 文字列表はコンパイル中だけ使う（ストアには残らない）
+    table = share_texts(parties)
+    stats = (table.total_bytes, table.unique_bytes, len(table))
+    del table
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return before, after, stats, parties
+
+
+def main():
+    parser = argparse.ArgumentParser(description="テキストの重複除去の効果")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="national", help="合成データの規模")
+    parser.add_argument("--data", type=Path, help="合成データの代わりに使うデータファイル")
+    parser.add_argument("--seed", type=int, default=0, help="合成データの乱数の種")
+    args = parser.parse_args()
+
+    if args.data is not None:
+        raw = args.data.read_bytes()
+        label = str(args.data)
+    else:
+        raw = json.dumps(generate_election_data(seed=args.seed, **SCALES[args.scale]), ensure_ascii=False).encode()
+        label = f"合成データ（{args.scale}）"
+
+    before, after, (total_bytes, unique_bytes, table_size), parties = measure_parties(raw)
+
+    explanations = [item.explanation for party in parties
+                    for items in (party.personalized or {}).values() for item in items]
+    explanations += [item.explanation for party in parties for item in (party.general or {}).values()]
+    explanations = [text for text in dict.fromkeys(explanations) if text]
+    plain_blob = sum(len(text.encode('utf-8')) for text in explanations)
+    dedup_blob = len(build_explanation_blob(explanations))
+
+    print(f"{label}: {len(raw):,} バイト, 政党 {len(parties)}")
+    print(f"  テキスト（UTF-8）   : {total_bytes:>12,} → {unique_bytes:>12,} バイト"
+          f"（{total_bytes - unique_bytes:,} バイト削減, 文字列表 {table_size:,} 件）")
+    print(f"  政党レコードのメモリ: {before:>12,} → {after:>12,} バイト"
+          f"（{before - after:,} バイト削減, {100 * (before - after) / before:.0f}%）")
+    print(f"  成果物の解説ブロブ  : {plain_blob:>12,} → {dedup_blob:>12,} バイト（オフセット表を含む）")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
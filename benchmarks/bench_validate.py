@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+データ検証の並列化ベンチマーク
+全国規模の合成データ（単一ファイルと分割形式）で、validate_data.py の検証時間を
+プロセス数（--jobs）ごとに計測します
+
+使い方:
+    python benchmarks/bench_validate.py [--jobs 1 2 4 8] [--candidates 16] [--memo-repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_districts import MEMO, build_districts  # noqa: E402
+from data_shards import write_shards  # noqa: E402
+from validate_data import validate_sharded, validate_structure  # noqa: E402
+
+
+PROFESSIONS = ["医学生", "勤務医", "開業医", "看護師", "薬剤師", "理学療法士", "介護福祉士", "ケアマネージャー"]
+TOPICS = ["消費税", "子育て", "エネルギー", "投資・経済", "年金", "外交・安全保障", "教育", "地方創生"]
+POLICY = "医療・介護現場の処遇改善と人材確保を進め、地域で必要なサービスを維持する。"
+EXPLANATION = "**ポイント:** 診療報酬・介護報酬の改定に合わせて、現場の賃上げにつながる仕組みを整えます。"
+
+
+def build_parties(num_parties: int) -> list:
+    """合成の政党データ"""
+    return [
+        {
+            "id": f"party-{i}",
+            "name": f"合成党{i}",
+            "personalized_policies": {p: [POLICY] * 3 for p in PROFESSIONS},
+            "personalized_explanations": {p: [EXPLANATION] * 3 for p in PROFESSIONS},
+            "general_policies": {t: POLICY for t in TOPICS},
+            "general_explanations": {t: EXPLANATION for t in TOPICS},
+        }
+        for i in range(num_parties)
+    ]
+
+
+def best_of(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="データ検証の並列化ベンチマーク")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8], help="計測するプロセス数")
+    parser.add_argument("--parties", type=int, default=15, help="政党数")
+    parser.add_argument("--districts", type=int, default=289, help="選挙区数")
+    parser.add_argument("--candidates", type=int, default=16, help="1選挙区あたりの候補者数")
+    parser.add_argument("--memo-repeat", type=int, default=20, help="候補者メモの長さ（基本文の繰り返し数）")
+    parser.add_argument("--runs", type=int, default=3, help="各条件の計測回数（最良値を採用）")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    districts = build_districts(args.districts, args.candidates)
+    for candidates in districts.values():
+        for candidate in candidates:
+            candidate["memo"] = MEMO * args.memo_repeat
+    data = {"parties": build_parties(args.parties), "districts": districts}
+
+    results = {"cpu_count": os.cpu_count(), "single_file_ms": {}, "sharded_ms": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "election_data.json"
+        json_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        shard_dir = Path(tmp) / "election_data"
+        write_shards(data, shard_dir)
+        results["file_bytes"] = json_file.stat().st_size
+
+        for jobs in args.jobs:
+            results["single_file_ms"][jobs] = best_of(lambda: validate_structure(data, jobs), args.runs)
+            results["sharded_ms"][jobs] = best_of(lambda: validate_sharded(shard_dir, None, jobs), args.runs)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+        return
+
+    print(f"CPU数: {results['cpu_count']}  データ: {results['file_bytes'] / 1024 / 1024:.1f} MB "
+          f"（政党 {args.parties}, 選挙区 {args.districts} × 候補者 {args.candidates}）")
+    print(f"{'jobs':>6} {'単一ファイル(構造検証)':>22} {'分割形式(解析+検証)':>22}")
+    base_single = results["single_file_ms"][args.jobs[0]]
+    base_sharded = results["sharded_ms"][args.jobs[0]]
+    for jobs in args.jobs:
+        single = results["single_file_ms"][jobs]
+        sharded = results["sharded_ms"][jobs]
+        print(f"{jobs:>6} {single:>12.1f} ms (x{base_single / single:.2f}) "
+              f"{sharded:>12.1f} ms (x{base_sharded / sharded:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+データ検証のメモリ使用量ベンチマーク
+従来の検証（json.load で全体を読み込んでから検証）と逐次解析（validate_data.py --stream）の
+ピークメモリ（tracemalloc）と所要時間を、合成データの規模を変えて比較します
+
+使い方:
+    python benchmarks/bench_validate_memory.py [--candidates 16 64 256] [--memo-repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_districts import MEMO, build_districts  # noqa: E402
+from bench_validate import build_parties  # noqa: E402
+from validate_data import get_statistics, validate_json_syntax, validate_stream, validate_structure  # noqa: E402
+
+
+def validate_loaded(json_file: Path):
+    """従来の経路（構文チェックと読み込みでそれぞれ json.load）"""
+    validate_json_syntax(json_file)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return validate_structure(data), get_statistics(data)
+
+
+def validate_streamed(json_file: Path):
+    """逐次解析の経路"""
+    stats = get_statistics({})
+    return list(validate_stream(json_file, stats)), stats
+
+
+def measure(func, json_file: Path) -> dict:
+    start = time.perf_counter()
+    func(json_file)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(json_file)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": elapsed * 1000, "peak_mib": peak / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="データ検証のメモリ使用量ベンチマーク")
+    parser.add_argument("--parties", type=int, default=15, help="政党数")
+    parser.add_argument("--districts", type=int, default=289, help="選挙区数")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[16, 64, 256],
+                        help="1選挙区あたりの候補者数（複数指定で規模を変えて計測）")
+    parser.add_argument("--memo-repeat", type=int, default=20, help="候補者メモの長さ（基本文の繰り返し数）")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "election_data.json"
+        for num_candidates in args.candidates:
+            districts = build_districts(args.districts, num_candidates)
+            for candidates in districts.values():
+                for candidate in candidates:
+                    candidate["memo"] = MEMO * args.memo_repeat
+            data = {"parties": build_parties(args.parties), "districts": districts}
+            json_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+            del data, districts
+
+            loaded = measure(validate_loaded, json_file)
+            streamed = measure(validate_streamed, json_file)
+            assert sorted(validate_loaded(json_file)[0]) == sorted(validate_streamed(json_file)[0])
+            results.append({
+                "candidates_per_district": num_candidates,
+                "file_mib": json_file.stat().st_size / 1024 / 1024,
+                "json_load": loaded,
+                "stream": streamed,
+            })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+        return
+
+    print(f"{'ファイル':>10} {'従来: ピーク':>14} {'時間':>10} {'逐次: ピーク':>14} {'時間':>10}")
+    for r in results:
+        print(f"{r['file_mib']:>7.1f} MB {r['json_load']['peak_mib']:>10.1f} MiB {r['json_load']['ms']:>7.0f} ms "
+              f"{r['stream']['peak_mib']:>10.1f} MiB {r['stream']['ms']:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
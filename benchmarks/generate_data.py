@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の合成データ生成
+政党数・職種数・トピック数・選挙区数・候補者数・解説の長さを指定して、
+election_data.json と同じ形式の日本語データを作成します（乱数の種を固定すれば毎回同じ内容）
+
+使い方:
+    python benchmarks/generate_data.py out.json [--scale national] [--parties 15] [--explanation-length 300]
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+# 規模のプリセット（個別の引数で上書きできる）
+SCALES = {
+    "small": {"parties": 8, "professions": 6, "topics": 5, "districts": 2, "candidates": 4, "explanation_length": 150},
+    "medium": {"parties": 10, "professions": 12, "topics": 12, "districts": 60, "candidates": 4,
+               "explanation_length": 200},
+    "national": {"parties": 15, "professions": 30, "topics": 30, "districts": 289, "candidates": 4,
+                 "explanation_length": 300},
+}
+
+PARTY_NAMES = [
+    ("未来創造党", "創造"), ("国民生活党", "生活"), ("地域再生の会", "再生"), ("改革連合", "改革"),
+    ("共生社会党", "共生"), ("希望の道", "希望"), ("緑の党ジャパン", "緑"), ("新時代党", "新時代"),
+    ("自由市民連合", "市民"), ("日本労働党", "労働"), ("医療と福祉の会", "医福"), ("教育第一党", "教育"),
+    ("減税日本連合", "減税"), ("みらい技術党", "技術"), ("ふるさと党", "ふるさと"),
+]
+
+PROFESSIONS = [
+    "医学生", "研修医", "勤務医", "開業医", "歯科医師", "薬剤師", "看護師", "准看護師", "保健師", "助産師",
+    "理学療法士", "作業療法士", "言語聴覚士", "臨床検査技師", "診療放射線技師", "臨床工学技士", "管理栄養士",
+    "歯科衛生士", "介護福祉士", "ケアマネージャー", "社会福祉士", "精神保健福祉士", "医療事務", "救急救命士",
+    "視能訓練士", "公認心理師", "保育士", "訪問介護員", "病院経営者", "介護事業所経営者",
+]
+
+TOPICS = [
+    "消費税", "投資・経済", "子育て", "エネルギー", "ペット", "年金", "外交・安全保障", "教育", "地方創生",
+    "物価高対策", "賃上げ", "医療制度", "介護制度", "防災", "環境・気候変動", "デジタル化", "農業・食料",
+    "住宅", "交通・インフラ", "少子化対策", "働き方改革", "税制", "社会保障", "選択的夫婦別姓", "移民・外国人",
+    "憲法改正", "政治改革", "科学技術", "文化・スポーツ", "観光",
+]
+
+PREFECTURES = [
+    ("北海道", 12), ("青森", 3), ("岩手", 3), ("宮城", 5), ("秋田", 3), ("山形", 3), ("福島", 4), ("茨城", 7),
+    ("栃木", 5), ("群馬", 5), ("埼玉", 16), ("千葉", 14), ("東京", 30), ("神奈川", 20), ("新潟", 5), ("富山", 3),
+    ("石川", 3), ("福井", 2), ("山梨", 2), ("長野", 5), ("岐阜", 5), ("静岡", 8), ("愛知", 16), ("三重", 4),
+    ("滋賀", 3), ("京都", 6), ("大阪", 19), ("兵庫", 12), ("奈良", 3), ("和歌山", 2), ("鳥取", 2), ("島根", 2),
+    ("岡山", 4), ("広島", 6), ("山口", 3), ("徳島", 2), ("香川", 3), ("愛媛", 3), ("高知", 2), ("福岡", 11),
+    ("佐賀", 2), ("長崎", 3), ("熊本", 4), ("大分", 3), ("宮崎", 3), ("鹿児島", 4), ("沖縄", 4),
+]
+
+SURNAMES = ["佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤", "吉田", "山田",
+            "佐々木", "山口", "松本", "井上", "木村", "林", "斎藤", "清水", "山崎", "森", "池田", "橋本"]
+GIVEN_NAMES = ["ひろし", "たかし", "あきら", "まさる", "けんじ", "ゆうこ", "まさみ", "さとし", "なおき", "ともこ",
+               "よしひろ", "みどり", "かずや", "えりこ", "しんいち", "はるな", "だいすけ", "あやこ"]
+MUNICIPALITY_SUFFIXES = ["中央市", "北市", "南市", "東市", "西区", "港区", "山手町", "緑町", "本町", "新町"]
+
+POLICY_PHRASES = [
+    "処遇改善と人材確保を進め", "現場の事務負担を減らし", "地域で必要なサービスを維持し", "財源を確保したうえで",
+    "段階的に見直し", "デジタル化で効率化を図り", "若い世代の負担を軽くし", "公平な負担の仕組みを整え",
+]
+POLICY_ENDINGS = ["る方針。", "る方向を示す。", "ることを掲げる。", "る制度改正を目指す。"]
+EXPLANATION_SENTENCES = [
+    "**{term}**は、現場の働き方や家計に直接かかわる仕組みです。",
+    "制度が変わると、手取りや勤務体制、サービスの受けやすさに影響します。",
+    "一方で財源の確保や地域差への配慮が論点になります。",
+    "具体化のタイミングは、予算措置や次回の報酬改定・制度改正で決まります。",
+    "対象範囲や上限、開始時期などの制度設計が使いやすさを左右します。",
+    "現場では人員配置と運用ルールが鍵になります。",
+    "短期の負担軽減と中長期の持続性をどう両立するかが問われます。",
+]
+EXPLANATION_ICONS = ["💡", "🩺", "💊", "👶", "⚡", "🏥", "📋", "🎓", "💰", "🛒"]
+MEMO_SENTENCES = [
+    "{pref}出身。", "地方議員や民間企業での経験を経て国政へ。", "元医師で地域医療の立て直しを訴える。",
+    "物価高対策と子育て支援の充実を掲げる。", "行政改革と減税を主張。", "防災と地域経済の底上げに取り組む。",
+]
+
+
+def _policy(rng: random.Random) -> str:
+    return "、".join(rng.sample(POLICY_PHRASES, 2)) + rng.choice(["充実させ", "推進す", "強化す"]) + rng.choice(POLICY_ENDINGS)
+
+
+def _explanation(rng: random.Random, term: str, length: int) -> str:
+    """およそ length 文字の解説（太字の用語・絵文字付き）"""
+    text = rng.choice(EXPLANATION_ICONS) + " "
+    while len(text) < length:
+        text += rng.choice(EXPLANATION_SENTENCES).format(term=term)
+    return text
+
+
+def generate_parties(rng: random.Random, num_parties: int, professions: List[str], topics: List[str],
+                     explanation_length: int) -> List[Dict[str, Any]]:
+    """合成の政党データ（職種・トピックの一部を欠く政党や、文字列形式・リスト形式の混在も含む）"""
+    parties = []
+    for i in range(num_parties):
+        name, alias = PARTY_NAMES[i] if i < len(PARTY_NAMES) else (f"合成党{i + 1}", f"合成{i + 1}")
+        covered_professions = [p for p in professions if rng.random() < 0.9] or professions[:1]
+        covered_topics = [t for t in topics if rng.random() < 0.9] or topics[:1]
+
+        personalized = {}
+        personalized_explanations = {}
+        for profession in covered_professions:
+            if rng.random() < 0.5:
+                personalized[profession] = _policy(rng)
+                personalized_explanations[profession] = _explanation(rng, profession, explanation_length)
+            else:
+                count = rng.randint(2, 3)
+                personalized[profession] = [_policy(rng) for _ in range(count)]
+                personalized_explanations[profession] = [
+                    _explanation(rng, profession, explanation_length // count) for _ in range(count)]
+
+        parties.append({
+            "id": f"party-{i + 1:02d}",
+            "name": name,
+            "aliases": [alias],
+            "personalized_policies": personalized,
+            "personalized_explanations": personalized_explanations,
+            "general_policies": {topic: _policy(rng) for topic in covered_topics},
+            "general_explanations": {topic: _explanation(rng, topic, explanation_length) for topic in covered_topics},
+        })
+    return parties
+
+
+def district_names(num_districts: int) -> List[str]:
+    """都道府県ごとの区割りに沿った選挙区名（足りない場合は区番号を増やす）"""
+    names = []
+    round_ = 0
+    while len(names) < num_districts:
+        for pref, count in PREFECTURES:
+            for n in range(count * round_ + 1, count * (round_ + 1) + 1):
+                names.append(f"{pref}{n}区")
+        round_ += 1
+    return names[:num_districts]
+
+
+def generate_districts(rng: random.Random, names: List[str], num_candidates: int,
+                       party_labels: List[str]) -> Dict[str, List[Dict[str, str]]]:
+    """合成の候補者データ（所属は政党の略称、または無所属）"""
+    labels = party_labels + ["無所属"]
+    districts = {}
+    for name in names:
+        pref = name.rstrip("0123456789区")
+        districts[name] = [
+            {
+                "name": f"{rng.choice(SURNAMES)} {rng.choice(GIVEN_NAMES)}",
+                "party": rng.choice(labels),
+                "memo": "".join(s.format(pref=pref) for s in rng.sample(MEMO_SENTENCES, 3)),
+            }
+            for _ in range(num_candidates)
+        ]
+    return districts
+
+
+def generate_election_data(parties: int = 8, professions: int = 6, topics: int = 5, districts: int = 2,
+                           candidates: int = 4, explanation_length: int = 150, seed: int = 0) -> Dict[str, Any]:
+    """election_data.json と同じ形式の合成データ"""
+    rng = random.Random(seed)
+    profession_keys = PROFESSIONS[:professions] + [f"職種{i + 1}" for i in range(professions - len(PROFESSIONS))]
+    topic_keys = TOPICS[:topics] + [f"トピック{i + 1}" for i in range(topics - len(TOPICS))]
+
+    party_data = generate_parties(rng, parties, profession_keys, topic_keys, explanation_length)
+    names = district_names(districts)
+    return {
+        "parties": party_data,
+        "districts": generate_districts(rng, names, candidates, [p["aliases"][0] for p in party_data]),
+        "district_areas": {
+            name: [name.rstrip("0123456789区") + suffix for suffix in rng.sample(MUNICIPALITY_SUFFIXES, 2)]
+            for name in names
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データ生成")
+    parser.add_argument("output", type=Path, help="出力するJSONファイル")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="national", help="規模のプリセット")
+    parser.add_argument("--parties", type=int, help="政党数")
+    parser.add_argument("--professions", type=int, help="職種数")
+    parser.add_argument("--topics", type=int, help="一般政策トピック数")
+    parser.add_argument("--districts", type=int, help="選挙区数")
+    parser.add_argument("--candidates", type=int, help="1選挙区あたりの候補者数")
+    parser.add_argument("--explanation-length", type=int, help="解説1件あたりのおよその文字数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+
+    data = generate_election_data(seed=args.seed, **params)
+    args.output.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"✅ {args.output} を作成しました（{args.output.stat().st_size:,} バイト, "
+          + ", ".join(f"{k}={v}" for k, v in params.items()) + "）")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
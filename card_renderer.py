@@ -0,0 +1,308 @@
+"""
+政党カード・選挙区パネルのHTMLレンダラー
+1枚のカードを1つのHTML文字列として組み立て、st.markdown 1回で送信できるようにします
+（Streamlitに依存しないため、ベンチマークや静的出力からも利用できます）
+"""
+
+import hashlib
+import re
+from html import escape
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Collection, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from election_store import CandidateRecord, PartyRecord, PolicyItem, PolicyStore
+from policy_search import FIELD_EXPLANATION, KIND_PERSONALIZED, SearchHit
+
+
+# Markdownパーサーに途中でHTMLブロックを切られないよう、出力には改行を含めない
+# 見た目はすべて styles.css のクラスで指定し、出力にはクラス名だけを含める（ライト・ダークの切り替えもCSS側）
+STYLESHEET_PATH = Path(__file__).parent / "styles.css"
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,])\s*")
+
+
+def minify_css(css: str) -> str:
+    """コメントと余分な空白を除く（セレクタ内の子孫結合子の空白は残す）"""
+    css = _CSS_SPACE.sub(" ", _CSS_COMMENT.sub("", css))
+    return _CSS_PUNCTUATION.sub(r"\1", css).replace(": ", ":").replace(";}", "}").strip()
+
+
+def render_stylesheet(path: Path = STYLESHEET_PATH) -> str:
+    """スタイルシートを最小化した <style> 要素"""
+    return f"<style>{minify_css(path.read_text(encoding='utf-8'))}</style>"
+
+
+_BOLD_PATTERN = re.compile(r"\*\*(.+?)\*\*")
+
+
+def inline_markdown(text: str) -> str:
+    """
+    テキストをエスケープし、解説で使われる **太字** だけをHTMLに変換
+    （HTMLブロック内ではStreamlitのMarkdown変換が効かないため）
+    """
+    return _BOLD_PATTERN.sub(r"<strong>\1</strong>", escape(text))
+
+
+def render_explanation(explanation: str) -> str:
+    """解説本文を段落ごとのHTMLに変換"""
+    paragraphs = [p.strip() for p in explanation.split("\n\n") if p.strip()]
+    body = "".join(
+        f'<p>{inline_markdown(p).replace(chr(10), "<br>")}</p>'
+        for p in paragraphs
+    )
+    return (
+        '<div class="explanation-label">解説</div>'
+        f'<div class="explanation">{body}</div>'
+    )
+
+
+def render_policy_item(item: PolicyItem, show_explanations: bool, topic: str = "", anchor: str = "") -> str:
+    """
+    政策1項目のHTML
+    解説がある場合はネイティブの <details> で折りたたみ表示する
+    """
+    text = inline_markdown(item.text)
+    anchor_attr = f' id="{escape(anchor)}"' if anchor else ""
+    if show_explanations and item.explanation:
+        label = f"{escape(topic)}: {text}" if topic else text
+        return (
+            f'<details{anchor_attr} class="policy-item">'
+            f'<summary>💡 {label}</summary>'
+            f'{render_explanation(item.explanation)}'
+            f'</details>'
+        )
+    if topic:
+        text = f"<strong>{escape(topic)}:</strong> {text}"
+    elif item.bullet:
+        text = f"• {text}"
+    return f'<div{anchor_attr} class="policy-item">{text}</div>'
+
+
+def section_anchor(party_id: str, kind: str, key: str) -> str:
+    """カード内の各セクションへのリンク用ID（検索結果からのジャンプに使用）"""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+    return f"policy-{party_id}-{kind}-{digest}"
+
+
+def render_section_title(title: str, anchor: str = "") -> str:
+    """セクションタイトルのHTML"""
+    anchor_attr = f' id="{escape(anchor)}"' if anchor else ""
+    return (
+        f'<div{anchor_attr} class="policy-section-title">'
+        f'<span class="policy-category-label">{escape(title)}</span>'
+        f'</div>'
+    )
+
+
+GENERAL_SECTION_TITLE = "📋 一般政策"
+
+
+def render_card_header(party: PartyRecord) -> str:
+    """カードの開始タグと政党名（閉じタグは render_party_card が付ける）"""
+    return f'<div class="party-card"><div class="party-name">{escape(party.name)}</div>'
+
+
+def render_profession_section(party: PartyRecord, profession: str, show_explanations: bool) -> str:
+    """職種1つぶんのセクション（タイトル＋政策項目。該当する政策が無ければ空文字）"""
+    items = party.personalized.get(profession) if party.personalized is not None else None
+    if not items:
+        return ""
+    parts = [render_section_title(f"🏥 {profession}向け政策", section_anchor(party.id, "personalized", profession))]
+    for item in items:
+        parts.append(render_policy_item(item, show_explanations))
+    return "".join(parts)
+
+
+def render_topic_item(party: PartyRecord, topic: str, show_explanations: bool) -> str:
+    """一般政策のトピック1つぶんの項目（該当する政策が無ければ空文字）"""
+    item = party.general.get(topic) if party.general is not None else None
+    if item is None:
+        return ""
+    return render_policy_item(item, show_explanations, topic=topic,
+                              anchor=section_anchor(party.id, "general", topic))
+
+
+def render_party_card(party: PartyRecord, selected_professions: List[str], selected_topics: List[str],
+                      show_explanations: bool = True) -> str:
+    """
+    政党カード全体（選択された項目のみ）を1つのHTML文字列として組み立てる
+    各部分は静的出力（static_export.py）でも同じ関数で描画し、ブラウザ側で同じ順に組み立てる
+    """
+    parts = [render_card_header(party)]
+
+    show_personalized = bool(selected_professions) and party.personalized is not None
+    show_general = bool(selected_topics) and party.general is not None
+
+    if show_personalized or show_general:
+        parts.append('<div class="party-card-content">')
+
+        # 専門職向け政策
+        if show_personalized:
+            for profession in selected_professions:
+                parts.append(render_profession_section(party, profession, show_explanations))
+
+        # 一般政策
+        if show_general:
+            parts.append(render_section_title(GENERAL_SECTION_TITLE))
+            for topic in selected_topics:
+                parts.append(render_topic_item(party, topic, show_explanations))
+
+        parts.append('</div>')
+
+    parts.append('</div>')
+    return "".join(parts)
+
+
+def render_district_panel(district_name: str, candidates: Sequence[CandidateRecord]) -> str:
+    """選挙区の候補者パネル（見出し＋候補者カード）を1つのHTML文字列として組み立てる"""
+    parts = [f'<div class="section-header">📍 {escape(district_name)}の立候補者</div>']
+
+    if not candidates:
+        parts.append(
+            '<div class="empty-state">'
+            '<div class="empty-state-icon">🔍</div>'
+            '<p>この選挙区の候補者情報はまだ登録されていません</p>'
+            '</div>'
+        )
+        return "".join(parts)
+
+    for candidate in candidates:
+        parts.append('<div class="candidate-card">')
+        parts.append(f'<div class="candidate-name">{escape(candidate.name)}</div>')
+        parts.append(f'<div class="candidate-party">{escape(candidate.party)}</div>')
+        if candidate.memo:
+            parts.append(f'<div class="candidate-note">{escape(candidate.memo)}</div>')
+        parts.append('</div>')
+    return "".join(parts)
+
+
+class LazyPanels(Mapping):
+    """
+    初回参照時に描画して保持するパネルHTMLの集合（分割データ向け）
+    事前構築すると全シャードを読み込んでしまうため、参照されたものだけ描画する
+    """
+
+    def __init__(self, keys: Collection[str], render: Callable[[str], str]):
+        self._keys = keys
+        self._render = render
+        self._rendered: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self._keys:
+            raise KeyError(key)
+        panel_html = self._rendered.get(key)
+        if panel_html is None:
+            panel_html = self._rendered.setdefault(key, self._render(key))
+        return panel_html
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def update_panels(previous: Mapping[str, str], keys: Collection[str], changed: Collection[str],
+                  render: Callable[[str], str]) -> Mapping[str, str]:
+    """前のバージョンのパネルを引き継ぎ、変わったもの（keys に無くなったものは削除）だけ描画し直す"""
+    panels = dict(previous)
+    for key in changed:
+        if key in keys:
+            panels[key] = render(key)
+        else:
+            panels.pop(key, None)
+    return MappingProxyType(panels)
+
+
+def build_district_panels(store: PolicyStore, lazy: bool = False,
+                          previous: Optional[Mapping[str, str]] = None) -> Mapping[str, str]:
+    """
+    全選挙区のパネルHTMLを事前構築（データバージョンごとに1回、lazy なら参照時に描画）
+    変更範囲（store.delta）の分かるストアは、直前のバージョンのパネル（previous）から変わった選挙区だけ描画し直す
+    """
+    if lazy:
+        return LazyPanels(store.districts, lambda name: render_district_panel(name, store.districts[name]))
+    if previous is not None and store.delta is not None:
+        return update_panels(previous, store.districts, store.delta.districts,
+                             lambda name: render_district_panel(name, store.districts[name]))
+    return MappingProxyType({
+        name: render_district_panel(name, candidates)
+        for name, candidates in store.districts.items()
+    })
+
+
+def render_party_candidates(party: PartyRecord, entries: Sequence[Tuple[str, CandidateRecord]]) -> str:
+    """政党の全国の候補者一覧（選挙区名付き）を1つのHTML文字列として組み立てる"""
+    parts = [f'<div class="section-header">👥 {escape(party.name)}の候補者（全国 {len(entries)}名）</div>']
+
+    if not entries:
+        parts.append(
+            '<div class="empty-state">'
+            '<div class="empty-state-icon">🔍</div>'
+            '<p>この政党の候補者情報はまだ登録されていません</p>'
+            '</div>'
+        )
+        return "".join(parts)
+
+    for district_name, candidate in entries:
+        parts.append('<div class="candidate-card">')
+        parts.append(f'<div class="candidate-name">{escape(candidate.name)}</div>')
+        parts.append(f'<div class="candidate-party">📍 {escape(district_name)}</div>')
+        if candidate.memo:
+            parts.append(f'<div class="candidate-note">{escape(candidate.memo)}</div>')
+        parts.append('</div>')
+    return "".join(parts)
+
+
+def build_party_candidate_panels(store: PolicyStore, lazy: bool = False,
+                                 previous: Optional[Mapping[str, str]] = None) -> Mapping[str, str]:
+    """
+    全政党の候補者一覧HTMLを事前構築（データバージョンごとに1回、lazy なら参照時に描画）
+    変更範囲（store.delta）の分かるストアは、直前のバージョンの一覧（previous）から候補者が変わった政党だけ描画し直す
+    """
+    if lazy:
+        parties = {party.id: party for party in store.parties}
+        return LazyPanels(parties, lambda party_id: render_party_candidates(
+            parties[party_id], store.candidates_for_party(party_id)))
+    if previous is not None and store.delta is not None:
+        parties = {party.id: party for party in store.parties}
+        return update_panels(previous, parties, store.delta.candidate_parties, lambda party_id: render_party_candidates(
+            parties[party_id], store.candidates_for_party(party_id)))
+    return MappingProxyType({
+        party.id: render_party_candidates(party, store.candidates_for_party(party.id))
+        for party in store.parties
+    })
+
+
+def render_search_results(query: str, hits: Sequence[SearchHit]) -> str:
+    """キーワード検索の結果一覧（一致箇所を強調したスニペット付き）"""
+    parts = [f'<div class="section-header">🔎 「{escape(query)}」の検索結果（{len(hits)}件）</div>']
+
+    if not hits:
+        parts.append(
+            '<div class="empty-state">'
+            '<div class="empty-state-icon">🔍</div>'
+            '<p>該当する政策・解説は見つかりませんでした</p>'
+            '</div>'
+        )
+        return "".join(parts)
+
+    for hit in hits:
+        doc = hit.document
+        section = f"🏥 {doc.key}向け政策" if doc.kind == KIND_PERSONALIZED else f"📋 {doc.key}"
+        field = "解説" if doc.field == FIELD_EXPLANATION else "政策"
+        anchor = section_anchor(doc.party_id, doc.kind, doc.key)
+        parts.append(
+            '<div class="policy-item">'
+            f'<a href="#{escape(anchor)}" target="_self"><strong>{escape(doc.party_name)}</strong></a>'
+            f'<span class="policy-category-label search-hit-label">{escape(section)}・{field}</span>'
+            f'<div>{hit.snippet_html}</div>'
+            f'</div>'
+        )
+    return "".join(parts)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+コンパイル済みデータの成果物（election_data.bin）
+検証済みの election_data.json を、解説の対応付け・正規化、政党IDの解決、選挙区検索インデックスまで
+済ませた状態でバイナリに書き出し、起動時はJSONの解析と再構築を省いてストアを組み立てます
+
+形式: 固定長ヘッダー（struct）＋ 文字列・数値のタプルだけで構成した本体（marshal）＋ 解説のブロブ
+解説は本体に含めず、文単位で重複を除いて末尾のブロブ（explanation_blob.py）に置きます。読み込み時は本体だけを解析し、
+ブロブは mmap したまま、表示する解説だけをその都度デコードします（解説を表示しない限りメモリに載らない）
+ヘッダーには成果物の形式バージョン、元JSONのデータバージョン（内容ハッシュ）、本体の長さを記録し、
+JSONと一致する場合だけ使います（一致しない・形式が違う・壊れている場合は None を返し、
+呼び出し側がJSONにフォールバックする）
+
+使い方:
+    python data_artifact.py [election_data.json] [出力ファイル]
+"""
+
+import hashlib
+import json
+import marshal
+import mmap
+import struct
+import sys
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from district_search import DistrictSearchIndex
+from election_store import (
+    CandidateRecord,
+    PartyRecord,
+    PolicyItem,
+    PolicyStore,
+    build_facet_indexes,
+    compile_election_data,
+)
+from explanation_blob import ExplanationBlob, ExplanationRef, build_explanation_blob
+
+
+# ヘッダー: マジック, 成果物の形式バージョン, marshal 形式バージョン, データバージョン, 本体のバイト数
+MAGIC = b"EDC1"
+ARTIFACT_FORMAT_VERSION = 3
+_HEADER = struct.Struct("<4sHH16sQ")
+
+# 解説が無い項目の解説番号
+NO_EXPLANATION = -1
+
+
+def artifact_path(json_path: Path) -> Path:
+    """JSONファイルに対応する成果物のパス（election_data.json → election_data.bin）"""
+    return json_path.with_suffix(".bin")
+
+
+def _dump_store(store: PolicyStore) -> Tuple[tuple, List[str]]:
+    """
+    ストアを marshal できる値（タプル・文字列・数値・None）だけに変換
+    解説は番号に置き換え、解説の本文は番号順のリストとして別に返す（同じ文面は1つにまとめる）
+    """
+    explanations: Dict[str, int] = {}
+
+    def explanation_id(text: str) -> int:
+        if not text:
+            return NO_EXPLANATION
+        return explanations.setdefault(text, len(explanations))
+
+    parties = tuple(
+        (
+            party.id,
+            party.name,
+            None if party.personalized is None else tuple(
+                (profession, tuple((item.text, explanation_id(item.explanation), item.bullet) for item in items))
+                for profession, items in party.personalized.items()
+            ),
+            None if party.general is None else tuple(
+                (topic, item.text, explanation_id(item.explanation), item.bullet)
+                for topic, item in party.general.items()
+            ),
+        )
+        for party in store.parties
+    )
+    districts = tuple(
+        (district, tuple((c.name, c.party, c.memo, c.party_id) for c in candidates))
+        for district, candidates in store.districts.items()
+    )
+    payload = (
+        parties,
+        districts,
+        tuple(store.district_areas.items()),
+        tuple(store.party_aliases.items()),
+        store.district_search.state(),
+    )
+    return payload, list(explanations)
+
+
+def write_artifact(store: PolicyStore, out_path: Path) -> Path:
+    """
+    コンパイル済みストアを成果物として書き出す（一時ファイルに書いてから差し替える）
+    読み込み中のプロセスが mmap している旧ファイルは、差し替え後もそのまま読める
+    """
+    payload, explanations = _dump_store(store)
+    body = marshal.dumps(payload, marshal.version)
+    header = _HEADER.pack(MAGIC, ARTIFACT_FORMAT_VERSION, marshal.version, store.version.encode('ascii'), len(body))
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp_path.write_bytes(header + body + build_explanation_blob(explanations))
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def compile_artifact(raw: bytes, out_path: Path, version: str) -> Path:
+    """JSONのバイト列をコンパイルして成果物を書き出す"""
+    store = compile_election_data(json.loads(raw.decode('utf-8')), version=version)
+    return write_artifact(store, out_path)
+
+
+def read_artifact_version(path: Path) -> Optional[str]:
+    """成果物のヘッダーだけを読み、この環境で読める場合はデータバージョンを返す"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, format_version, marshal_version, raw_version, _ = _HEADER.unpack(header)
+    if magic != MAGIC or format_version != ARTIFACT_FORMAT_VERSION or marshal_version != marshal.version:
+        return None
+    return raw_version.rstrip(b"\0").decode('ascii', 'replace')
+
+
+def read_artifact(path: Path, expected_version: Optional[str] = None) -> Optional[PolicyStore]:
+    """
+    成果物からストアを組み立てる
+    成果物が無い・形式が違う・データバージョンが expected_version と違う場合は None
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # 存在しない・空のファイル
+        return None
+    if len(content) < _HEADER.size:
+        return None
+    magic, format_version, marshal_version, raw_version, body_size = _HEADER.unpack_from(content, 0)
+    version = raw_version.rstrip(b"\0").decode('ascii', 'replace')
+    if magic != MAGIC or format_version != ARTIFACT_FORMAT_VERSION or marshal_version != marshal.version:
+        return None
+    if expected_version is not None and version != expected_version:
+        return None
+
+    try:
+        parties_raw, districts_raw, areas_raw, aliases_raw, search_state = marshal.loads(
+            content[_HEADER.size:_HEADER.size + body_size])
+        # 解説のブロブは mmap のまま参照する（ストアが参照されている間は開いたまま）
+        blob = ExplanationBlob(content, _HEADER.size + body_size)
+    except (EOFError, ValueError, TypeError):
+        # 壊れた成果物はJSONにフォールバックさせる
+        return None
+
+    def explanation(index: int):
+        return "" if index == NO_EXPLANATION else ExplanationRef(blob, index)
+
+    parties = tuple(
+        PartyRecord(
+            party_id=party_id,
+            name=name,
+            personalized=None if personalized is None else MappingProxyType({
+                profession: tuple(PolicyItem(text, explanation(index), bullet) for text, index, bullet in items)
+                for profession, items in personalized
+            }),
+            general=None if general is None else MappingProxyType({
+                topic: PolicyItem(text, explanation(index), bullet) for topic, text, index, bullet in general
+            }),
+        )
+        for party_id, name, personalized, general in parties_raw
+    )
+    districts = {
+        district: tuple(CandidateRecord(*candidate) for candidate in candidates)
+        for district, candidates in districts_raw
+    }
+
+    profession_index, topic_index = build_facet_indexes(parties)
+
+    return PolicyStore(
+        parties=parties,
+        districts=MappingProxyType(districts),
+        professions=tuple(sorted(profession_index)),
+        topics=tuple(sorted(topic_index)),
+        profession_index=profession_index,
+        topic_index=topic_index,
+        version=version,
+        district_areas=MappingProxyType(dict(areas_raw)),
+        party_aliases=MappingProxyType(dict(aliases_raw)),
+        district_search=DistrictSearchIndex.from_state(search_state),
+    )
+
+
+def main():
+    """JSONから成果物を作成（通常は validate_data.py が検証後に作成する）"""
+    script_dir = Path(__file__).parent
+    json_file = Path(sys.argv[1]) if len(sys.argv) > 1 else script_dir / "election_data.json"
+    out_path = Path(sys.argv[2]) if len(sys.argv) > 2 else artifact_path(json_file)
+
+    if not json_file.exists():
+        print(f"❌ ファイルが見つかりません: {json_file}")
+        sys.exit(1)
+
+    raw = json_file.read_bytes()
+    compile_artifact(raw, out_path, hashlib.sha256(raw).hexdigest()[:16])
+    print(f"✅ {out_path} を作成しました（{out_path.stat().st_size:,} バイト）")
+
+
+if __name__ == "__main__":
+    main()
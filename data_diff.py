@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+2つの版の選挙データの差分
+政策・解説・候補者の1項目ごと（葉）に内容ハッシュを求め、政党・選挙区ごとのハッシュが一致するものは
+中身を比べずに読み飛ばします（比較はデータの大きさにほぼ比例した時間で終わる）
+コンパイル済みのストアどうしを比べるため、JSONの書式やキーの並びだけの違いは変更になりません
+
+変更点は政党・選挙区ごとの追加・削除・変更の一覧（ChangeSet）として返し、
+アプリの「最近の変更」表示と、変わった政党・選挙区だけのキャッシュの作り直しに使います
+
+使い方:
+    python data_diff.py old/election_data.json election_data.json    # 変更点を表示
+    python data_diff.py old.json new.json --json                      # JSON Lines で出力
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from card_renderer import GENERAL_SECTION_TITLE
+from election_store import CandidateRecord, PartyRecord, PolicyItem, PolicyStore, StoreDelta
+
+
+CHANGE_ADDED = "追加"
+CHANGE_REMOVED = "削除"
+CHANGE_CHANGED = "変更"
+
+SCOPE_PARTY = "政党"
+SCOPE_DISTRICT = "選挙区"
+
+FIELD_PARTY_NAME = "政党名"
+FIELD_POLICY = "政策"
+FIELD_EXPLANATION = "解説"
+FIELD_FORMAT = "表示形式"
+FIELD_SECTION = "欄"
+FIELD_CANDIDATE = "候補者"
+FIELD_CANDIDATE_PARTY = "所属政党"
+FIELD_CANDIDATE_MEMO = "メモ"
+
+# 欄の有無の葉の項目名（一般政策はカードの見出しと同じ）
+PERSONALIZED_SECTION_LABEL = "🏥 職種別の政策"
+
+# 葉: (項目, 欄) → 内容ハッシュ
+# 値そのものは持たない（解説は表示するまで読み込まないため）。変更前後の値は変わったレコードからだけ取り出す
+Leaves = Dict[Tuple[str, str], bytes]
+
+
+def content_hash(value: str) -> bytes:
+    """葉1つの内容ハッシュ"""
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+
+
+def parts_hash(parts: Iterable[bytes]) -> bytes:
+    """文ごとのUTF-8のバイト列を連結した内容のハッシュ（連結した文字列の content_hash と一致する）"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
+
+
+def _items(party: PartyRecord) -> Iterator[Tuple[str, PolicyItem]]:
+    """政党の政策項目（項目名は比較表と同じく 🏥 職種・📋 トピック。複数項目の職種は番号付き）"""
+    for profession, items in (party.personalized or {}).items():
+        for i, item in enumerate(items):
+            yield (f"🏥 {profession}" if len(items) == 1 else f"🏥 {profession}（{i + 1}）"), item
+    for topic, item in (party.general or {}).items():
+        yield f"📋 {topic}", item
+
+
+def _party_fields(party: PartyRecord) -> Iterator[Tuple[Tuple[str, str], Union[str, PolicyItem]]]:
+    """
+    政党の葉（カードの表示を変えるものすべて）
+    政党名・欄の有無（フィールドが無いのと空なのとでは表示が違う）・各項目の政策と表示形式は文字列、
+    解説は読み込まずに政策項目のまま返す
+    """
+    yield ("", FIELD_PARTY_NAME), party.name
+    if party.personalized is not None:
+        yield (PERSONALIZED_SECTION_LABEL, FIELD_SECTION), "あり"
+    if party.general is not None:
+        yield (GENERAL_SECTION_TITLE, FIELD_SECTION), "あり"
+    for label, item in _items(party):
+        yield (label, FIELD_POLICY), item.text
+        if item.bullet:
+            yield (label, FIELD_FORMAT), "箇条書き"
+        if item.has_explanation:
+            yield (label, FIELD_EXPLANATION), item
+
+
+def party_values(party: PartyRecord) -> Iterator[Tuple[Tuple[str, str], str]]:
+    """政党の葉の値（変わった政党の表示用）"""
+    for key, value in _party_fields(party):
+        yield key, value if isinstance(value, str) else value.explanation
+
+
+def party_leaves(party: PartyRecord) -> Iterator[Tuple[Tuple[str, str], bytes]]:
+    """
+    政党の葉のハッシュ（party_values と同じ葉）
+    解説は文字列にデコードせず、ブロブ・共有の文のバイト列からハッシュを求める
+    """
+    for key, value in _party_fields(party):
+        yield key, content_hash(value) if isinstance(value, str) else parts_hash(value.explanation_parts())
+
+
+def district_values(candidates: Tuple[CandidateRecord, ...]) -> Iterator[Tuple[Tuple[str, str], str]]:
+    """選挙区の葉の値（候補者ごとの所属政党・メモ。同名の候補者は出現順の番号で区別する）"""
+    seen: Dict[str, int] = {}
+    for candidate in candidates:
+        seen[candidate.name] = seen.get(candidate.name, 0) + 1
+        label = candidate.name if seen[candidate.name] == 1 else f"{candidate.name}（{seen[candidate.name]}）"
+        yield (label, FIELD_CANDIDATE_PARTY), candidate.party
+        yield (label, FIELD_CANDIDATE_MEMO), candidate.memo
+        # 政党IDへの対応付けは表示されないが、政党別の候補者一覧の作り直しに使う
+        yield (label, ""), candidate.party_id or ""
+
+
+def district_leaves(candidates: Tuple[CandidateRecord, ...]) -> Iterator[Tuple[Tuple[str, str], bytes]]:
+    """選挙区の葉のハッシュ"""
+    for key, value in district_values(candidates):
+        yield key, content_hash(value)
+
+
+class RecordFingerprint:
+    """政党・選挙区1件の葉のハッシュと、それらをまとめたハッシュ"""
+    __slots__ = ("record", "digest", "leaves")
+
+    def __init__(self, record, leaves: Iterator[Tuple[Tuple[str, str], bytes]]):
+        # 同じレコード（差分の適用で使い回されたもの）は葉を求め直さず、変更前後の値もここから取り出す
+        self.record = record
+        self.leaves: Leaves = {}
+        digest = hashlib.blake2b(digest_size=16)
+        for (item, field), leaf_hash in leaves:
+            self.leaves[(item, field)] = leaf_hash
+            digest.update(f"{item}\0{field}\0".encode('utf-8'))
+            digest.update(leaf_hash)
+        self.digest = digest.digest()
+
+    def values(self) -> Dict[Tuple[str, str], str]:
+        """葉の値（変わったレコードの表示用）"""
+        values = party_values if isinstance(self.record, PartyRecord) else district_values
+        return dict(values(self.record))
+
+
+class StoreFingerprint:
+    """ストア全体の政党ID・選挙区名 → RecordFingerprint"""
+    __slots__ = ("version", "parties", "districts")
+
+    def __init__(self, version: str, parties: Mapping[str, RecordFingerprint],
+                 districts: Mapping[str, RecordFingerprint]):
+        self.version = version
+        self.parties = parties
+        self.districts = districts
+
+    @classmethod
+    def from_store(cls, store: PolicyStore, previous: Optional["StoreFingerprint"] = None) -> "StoreFingerprint":
+        """
+        ストアの葉のハッシュを求める
+        previous を渡すと、前の版と同じレコード（同じオブジェクト）の葉はそのまま使う
+        """
+        parties: Dict[str, RecordFingerprint] = {}
+        for party in store.parties:
+            old = previous.parties.get(party.id) if previous is not None else None
+            parties[party.id] = old if old is not None and old.record is party else RecordFingerprint(
+                party, party_leaves(party))
+        districts: Dict[str, RecordFingerprint] = {}
+        for name, candidates in store.districts.items():
+            old = previous.districts.get(name) if previous is not None else None
+            districts[name] = old if old is not None and old.record is candidates else RecordFingerprint(
+                candidates, district_leaves(candidates))
+        return cls(store.version, MappingProxyType(parties), MappingProxyType(districts))
+
+
+class Change:
+    """変更1件（scope の target（政党ID・選挙区名）の item の field が kind された）"""
+    __slots__ = ("kind", "scope", "target", "label", "item", "field", "old", "new")
+
+    def __init__(self, kind: str, scope: str, target: str, label: str, item: str, field: str,
+                 old: str = "", new: str = ""):
+        self.kind = kind
+        self.scope = scope
+        self.target = target
+        # 表示用の名前（政党名・選挙区名）
+        self.label = label
+        self.item = item
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def to_dict(self) -> Dict[str, str]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ChangeSet:
+    """
+    2つの版の差分
+    parties・districts は変更のあった政党ID・選挙区名、candidate_parties は候補者一覧が変わった政党ID
+    """
+
+    def __init__(self, base_version: str, version: str, changes: List[Change],
+                 parties: frozenset, districts: frozenset, candidate_parties: frozenset):
+        self.base_version = base_version
+        self.version = version
+        self.changes = changes
+        self.parties = parties
+        self.districts = districts
+        self.candidate_parties = candidate_parties
+        # ホットリロードで差し替えた時刻（ファイルどうしの比較では None）
+        self.published_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def counts(self) -> Dict[str, int]:
+        """種類（追加・削除・変更）ごとの件数"""
+        counts = {CHANGE_ADDED: 0, CHANGE_REMOVED: 0, CHANGE_CHANGED: 0}
+        for change in self.changes:
+            counts[change.kind] += 1
+        return counts
+
+    def to_delta(self) -> StoreDelta:
+        """キャッシュの作り直しに使う変更範囲"""
+        return StoreDelta(self.base_version, self.parties, self.districts, self.candidate_parties)
+
+
+def _diff_leaves(old: Optional[RecordFingerprint],
+                 new: Optional[RecordFingerprint]) -> Iterator[Tuple[str, Tuple[str, str], str, str]]:
+    """葉どうしの差分（種類, (項目, 欄), 変更前, 変更後）。変更前の並び → 追加分の順"""
+    old_leaves = old.leaves if old is not None else {}
+    new_leaves = new.leaves if new is not None else {}
+    old_values = old.values() if old is not None else {}
+    new_values = new.values() if new is not None else {}
+    for key, leaf_hash in old_leaves.items():
+        other = new_leaves.get(key)
+        if other is None:
+            yield CHANGE_REMOVED, key, old_values[key], ""
+        elif other != leaf_hash:
+            yield CHANGE_CHANGED, key, old_values[key], new_values[key]
+    for key in new_leaves:
+        if key not in old_leaves:
+            yield CHANGE_ADDED, key, "", new_values[key]
+
+
+def diff_fingerprints(old: StoreFingerprint, new: StoreFingerprint,
+                      old_names: Mapping[str, str], new_names: Mapping[str, str]) -> ChangeSet:
+    """
+    2つの版の差分（政党・選挙区のハッシュが一致するものは葉を比べない）
+    old_names・new_names は政党ID → 政党名（表示用）
+    """
+    changes: List[Change] = []
+    parties = set()
+    districts = set()
+    candidate_parties = set()
+
+    for party_id in list(old.parties) + [party_id for party_id in new.parties if party_id not in old.parties]:
+        before = old.parties.get(party_id)
+        after = new.parties.get(party_id)
+        if before is not None and after is not None and before.digest == after.digest:
+            continue
+        parties.add(party_id)
+        label = new_names.get(party_id) or old_names.get(party_id, party_id)
+        if before is None or after is None:
+            # 政党全体の追加・削除は1件にまとめる
+            fingerprint = after or before
+            count = sum(1 for item, field in fingerprint.leaves if field == FIELD_POLICY)
+            changes.append(Change(CHANGE_ADDED if before is None else CHANGE_REMOVED, SCOPE_PARTY, party_id, label,
+                                  "", SCOPE_PARTY, "" if before is None else f"{count}項目",
+                                  f"{count}項目" if before is None else ""))
+            candidate_parties.add(party_id)
+            continue
+        for kind, (item, field), old_value, new_value in _diff_leaves(before, after):
+            if field == FIELD_PARTY_NAME:
+                # 政党名は候補者一覧の見出しにも使われる
+                candidate_parties.add(party_id)
+            changes.append(Change(kind, SCOPE_PARTY, party_id, label, item, field, old_value, new_value))
+
+    for name in list(old.districts) + [name for name in new.districts if name not in old.districts]:
+        before = old.districts.get(name)
+        after = new.districts.get(name)
+        if before is not None and after is not None and before.digest == after.digest:
+            continue
+        districts.add(name)
+        added_or_removed = set()
+        before_values = before.values() if before is not None else {}
+        after_values = after.values() if after is not None else {}
+        for kind, (item, field), old_value, new_value in _diff_leaves(before, after):
+            # 変わった候補者の変更前後の所属政党の候補者一覧を作り直す
+            candidate_parties.update(values[(item, "")] for values in (before_values, after_values)
+                                     if values.get((item, "")))
+            if not field:
+                continue
+            if kind != CHANGE_CHANGED:
+                # 候補者の追加・削除は候補者ごとに1件にまとめる（所属政党 ／ メモ）
+                if item in added_or_removed:
+                    continue
+                added_or_removed.add(item)
+                values = after_values if kind == CHANGE_ADDED else before_values
+                summary = " ／ ".join(value for value in (values[(item, FIELD_CANDIDATE_PARTY)],
+                                                          values[(item, FIELD_CANDIDATE_MEMO)]) if value)
+                old_value, new_value = ("", summary) if kind == CHANGE_ADDED else (summary, "")
+                field = FIELD_CANDIDATE
+            changes.append(Change(kind, SCOPE_DISTRICT, name, name, item, field, old_value, new_value))
+
+    return ChangeSet(old.version, new.version, changes, frozenset(parties), frozenset(districts),
+                     frozenset(candidate_parties))
+
+
+def diff_stores(old: PolicyStore, new: PolicyStore, old_fingerprint: Optional[StoreFingerprint] = None,
+                new_fingerprint: Optional[StoreFingerprint] = None) -> ChangeSet:
+    """2つのストアの差分（求め済みの葉のハッシュがあれば渡す）"""
+    old_fingerprint = old_fingerprint or StoreFingerprint.from_store(old)
+    new_fingerprint = new_fingerprint or StoreFingerprint.from_store(new, previous=old_fingerprint)
+    return diff_fingerprints(old_fingerprint, new_fingerprint,
+                             {party.id: party.name for party in old.parties},
+                             {party.id: party.name for party in new.parties})
+
+
+def mark_changes(old: PolicyStore, new: PolicyStore, changes: ChangeSet):
+    """
+    差分をもとに、新しいストアの政党のバージョンと変更範囲を設定する
+    変わっていない政党は古いストアと同じバージョンになり、描画済みのカード・パネルがそのまま使われる
+    （公開前のストアに対してだけ呼ぶこと）
+    """
+    new.party_revisions = MappingProxyType({
+        party.id: new.version if party.id in changes.parties else old.party_revision(party.id)
+        for party in new.parties
+    })
+    new.delta = changes.to_delta()
+
+
+def _shorten(text: str, width: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def print_change_set(changes: ChangeSet, width: int = 60):
+    """変更点を政党・選挙区ごとに表示"""
+    counts = changes.counts()
+    print(f"🔍 {changes.base_version} → {changes.version}: {len(changes)}件"
+          f"（追加 {counts[CHANGE_ADDED]}・削除 {counts[CHANGE_REMOVED]}・変更 {counts[CHANGE_CHANGED]}）")
+    current = None
+    for change in changes.changes:
+        if (change.scope, change.target) != current:
+            current = (change.scope, change.target)
+            print(f"\n{'🏛️' if change.scope == SCOPE_PARTY else '📍'} {change.label}")
+        mark = {CHANGE_ADDED: "+", CHANGE_REMOVED: "-", CHANGE_CHANGED: "~"}[change.kind]
+        item = f"{change.item} の{change.field}" if change.item else change.field
+        if change.kind == CHANGE_CHANGED:
+            print(f"  {mark} {item}: {_shorten(change.old, width)} → {_shorten(change.new, width)}")
+        else:
+            print(f"  {mark} {item}: {_shorten(change.new or change.old, width)}")
+
+
+def main():
+    """2つのデータファイルを比較して変更点を表示（変更があれば終了コード 1、diff と同じ）"""
+    from data_loader import read_store
+
+    parser = argparse.ArgumentParser(description="2つの版の選挙データの変更点を表示します")
+    parser.add_argument("old", help="比較元の election_data.json（または分割形式のディレクトリ）")
+    parser.add_argument("new", help="比較先の election_data.json（または分割形式のディレクトリ）")
+    parser.add_argument("--json", action="store_true", help="変更1件を1行のJSONとして出力")
+    parser.add_argument("--width", type=int, default=60, help="変更前後のテキストを表示する最大文字数")
+    args = parser.parse_args()
+
+    stores = []
+    for path in (Path(args.old), Path(args.new)):
+        try:
+            stores.append(read_store(path))
+        except FileNotFoundError:
+            print(f"❌ ファイルが見つかりません: {path}")
+            sys.exit(2)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"❌ JSON構文エラー（{path}）: {e}")
+            sys.exit(2)
+
+    started = time.perf_counter()
+    changes = diff_stores(*stores)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for change in changes.changes:
+            print(json.dumps(change.to_dict(), ensure_ascii=False))
+    elif changes.changes:
+        print_change_set(changes, args.width)
+        print(f"\n⏱️  比較 {elapsed * 1000:.1f} ms")
+    else:
+        print("✅ 変更はありません")
+    sys.exit(1 if changes.changes else 0)
+
+
+if __name__ == "__main__":
+    main()
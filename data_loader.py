@@ -0,0 +1,364 @@
+"""
+選挙データファイルの読み込みとホットリロード
+ファイル更新をバックグラウンドで検知し、新しいストアを丸ごと差し替えます
+単一ファイル（election_data.json）と分割形式（manifest.json）の両方に対応します
+単一ファイルは、validate_data.py が作成したコンパイル済み成果物（election_data.bin）があれば優先して使います
+SQLiteバックエンドを選んだ場合は、候補者をメモリに持たずSQLiteから読み込みます
+InboxReloader は、受信箱に置かれた差分ファイル（JSON Patch）を適用し、変わった政党・選挙区だけを作り直します
+差し替えのたびに前のデータとの差分（data_diff.py）を求め、最近の変更として保持します
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from data_artifact import artifact_path, read_artifact
+from data_diff import ChangeSet, StoreFingerprint, diff_stores, mark_changes
+from data_shards import DEFAULT_SHARD_CACHE_SIZE, MANIFEST_NAME, compile_sharded_store
+from election_store import (
+    BACKEND_MEMORY,
+    BACKEND_SQLITE,
+    EMPTY_DATA,
+    PolicyStore,
+    compile_election_data,
+    patch_election_data,
+    patch_scope,
+)
+from json_patch import JsonPatchError, apply_patch
+from sqlite_store import compile_sqlite_store, database_path
+
+
+# 差分ファイルの受信箱（election_data.json → election_data.inbox/）
+INBOX_SUFFIX = ".inbox"
+
+# 保持する最近の変更（差し替え）の数
+RECENT_CHANGES_LIMIT = 10
+
+
+def data_version(raw: bytes) -> str:
+    """ファイル内容からデータバージョン（短いハッシュ）を算出"""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def resolve_data_path(path: Path) -> Path:
+    """ディレクトリが指定された場合は分割形式のマニフェストを指す"""
+    return path / MANIFEST_NAME if path.is_dir() else path
+
+
+def shard_directory(path: Path) -> Optional[Path]:
+    """分割形式のマニフェストならシャードのあるディレクトリ、単一ファイルなら None"""
+    return path.parent if path.name == MANIFEST_NAME else None
+
+
+def compile_store_bytes(raw: bytes, version: Optional[str] = None, shard_dir: Optional[Path] = None,
+                        shard_cache_size: int = DEFAULT_SHARD_CACHE_SIZE) -> PolicyStore:
+    """
+    JSONのバイト列を解析してストアにコンパイル
+    shard_dir を指定した場合、raw はマニフェストとして扱いシャードは遅延読み込みする
+    （マニフェストには各シャードのハッシュが含まれるため、そのハッシュがデータバージョンになる）
+    """
+    data = json.loads(raw.decode('utf-8'))
+    version = version or data_version(raw)
+    if shard_dir is not None:
+        return compile_sharded_store(shard_dir, manifest=data, version=version, cache_size=shard_cache_size)
+    return compile_election_data(data, version=version)
+
+
+def load_store_bytes(path: Path, raw: bytes, version: str,
+                     shard_cache_size: int = DEFAULT_SHARD_CACHE_SIZE,
+                     backend: str = BACKEND_MEMORY) -> PolicyStore:
+    """
+    読み込んだデータファイルの内容からストアを組み立てる
+    単一ファイルでは、同じ内容から作られたコンパイル済み成果物があればJSONの解析・再構築を省く
+    backend に sqlite を指定した場合、単一ファイルの選挙区・候補者は隣のSQLiteファイルから読む
+    """
+    shard_dir = shard_directory(path)
+    if shard_dir is None and backend == BACKEND_SQLITE:
+        return compile_sqlite_store(json.loads(raw.decode('utf-8')), database_path(path), version)
+    if shard_dir is None:
+        store = read_artifact(artifact_path(path), expected_version=version)
+        if store is not None:
+            return store
+    return compile_store_bytes(raw, version=version, shard_dir=shard_dir, shard_cache_size=shard_cache_size)
+
+
+def read_store(path: Path, shard_cache_size: int = DEFAULT_SHARD_CACHE_SIZE,
+               backend: str = BACKEND_MEMORY) -> PolicyStore:
+    """
+    JSONファイル（または分割形式のマニフェスト）を読み込んでストアにコンパイル
+    読み込み・解析エラーはそのまま送出する（呼び出し側で表示方法を決める）
+    """
+    path = resolve_data_path(path)
+    raw = path.read_bytes()
+    return load_store_bytes(path, raw, data_version(raw), shard_cache_size, backend)
+
+
+def inbox_path(path: Path) -> Path:
+    """データファイルに対応する差分ファイルの受信箱"""
+    return path.with_name(path.stem + INBOX_SUFFIX)
+
+
+def describe_load_error(path: Path, error: Exception) -> str:
+    """読み込みエラーを利用者向けのメッセージに変換"""
+    if isinstance(error, FileNotFoundError):
+        return f"データファイルが見つかりません: {path}"
+    if isinstance(error, (json.JSONDecodeError, UnicodeDecodeError)):
+        return f"JSONファイルの形式が正しくありません: {error}"
+    return f"データ読み込みエラー: {error}"
+
+
+class StoreReloader:
+    """
+    データファイルを監視し、変更があれば再構築してスナップショットを差し替える
+
+    - 監視と再構築は専用のデーモンスレッドで行い、リクエスト処理はブロックしない
+    - 差し替えは参照の代入1回のみ。実行中の再実行は取得済みの古いスナップショットを使い続ける
+    - 再構築に失敗した場合は直前のスナップショットを維持する
+    - 分割形式ではマニフェストを監視する（シャードを書き換えたらマニフェストも作り直すこと）
+    - 差し替えのたびに公開中のストアとの差分を求め、changes（新しい順）に保持する。差分で変わっていない
+      政党は同じバージョンのまま引き継ぎ、描画済みのカード・パネルが使い回される（メモリ保持のみ）
+    - on_change(古いストア, 新しいストア) は差分を求めて差し替えた直後に監視スレッドから呼ばれる
+    """
+
+    def __init__(self, path: Path, interval: float = 2.0, shard_cache_size: int = DEFAULT_SHARD_CACHE_SIZE,
+                 backend: str = BACKEND_MEMORY,
+                 on_change: Optional[Callable[[PolicyStore, PolicyStore], Any]] = None):
+        self.path = resolve_data_path(path)
+        self.interval = interval
+        self.shard_cache_size = shard_cache_size
+        self.backend = backend
+        self.on_change = on_change
+        self.last_error: Optional[str] = None
+        self.reload_count = 0
+        # 最近の変更（新しい順）。参照の代入で差し替えるため、読む側はロック不要
+        self.changes: Tuple[ChangeSet, ...] = ()
+        self._fingerprint: Optional[StoreFingerprint] = None
+
+        self._signature: Optional[Tuple[int, int]] = None
+        self._digest: Optional[str] = None
+        self._rebuild_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot = compile_election_data(EMPTY_DATA)
+
+        # 初回だけは同期的に読み込む（起動直後に空データを返さないため）
+        self.check_now()
+
+    def snapshot(self) -> PolicyStore:
+        """現在のスナップショットを返す（ロック不要）"""
+        return self._snapshot
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check_now(self) -> bool:
+        """
+        ファイルを確認し、内容が変わっていれば再構築する
+        差し替えが行われた場合に True を返す
+        """
+        with self._rebuild_lock:
+            signature = self._stat_signature()
+            if signature is not None and signature == self._signature:
+                return False
+            self._signature = signature
+
+            try:
+                raw = self.path.read_bytes()
+            except OSError as e:
+                self.last_error = describe_load_error(self.path, e)
+                return False
+
+            # mtime だけ変わって中身が同じ場合（touch 等）は再構築しない
+            digest = data_version(raw)
+            if digest == self._digest:
+                return False
+            self._digest = digest
+
+            try:
+                store = load_store_bytes(self.path, raw, digest, self.shard_cache_size, self.backend)
+            except Exception as e:
+                # 書き込み途中のファイル等。古いスナップショットを維持する
+                self.last_error = describe_load_error(self.path, e)
+                return False
+
+            self._install(store)
+            self.last_error = None
+            self.reload_count += 1
+            return True
+
+    def _install(self, store: PolicyStore):
+        """再構築したストアを公開する"""
+        self._publish(store)
+
+    def _publish(self, store: PolicyStore):
+        """
+        公開中のストアとの差分を求めてから、新しいストアを公開する（参照の代入1回）
+        候補者を遅延読み込みするストア（分割形式・SQLite）は全体を読み込むことになるため差分を求めない
+        """
+        previous = self._snapshot
+        changes = None
+        if (previous.parties or previous.districts) and not previous.lazy_candidates and not store.lazy_candidates:
+            old_fingerprint = self._fingerprint
+            if old_fingerprint is None or old_fingerprint.version != previous.version:
+                old_fingerprint = StoreFingerprint.from_store(previous)
+            # 差分の適用で使い回されたレコードは葉のハッシュを求め直さない
+            self._fingerprint = StoreFingerprint.from_store(store, previous=old_fingerprint)
+            changes = diff_stores(previous, store, old_fingerprint, self._fingerprint)
+            mark_changes(previous, store, changes)
+            changes.published_at = time.time()
+            if changes.changes:
+                self.changes = (changes,) + self.changes[:RECENT_CHANGES_LIMIT - 1]
+
+        self._snapshot = store
+        if changes is not None and self.on_change is not None:
+            try:
+                self.on_change(previous, store)
+            except Exception as e:
+                self.last_error = f"差し替え後の処理に失敗しました: {e}"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_now()
+            except Exception as e:
+                self.last_error = describe_load_error(self.path, e)
+
+    def start(self) -> "StoreReloader":
+        """監視スレッドを開始"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="election-data-reloader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """監視スレッドを停止"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+
+class InboxReloader(StoreReloader):
+    """
+    StoreReloader の監視に加えて、受信箱（election_data.inbox/）に置かれた差分ファイル（JSON Patch）を
+    ファイル名順に適用し、変わった政党・選挙区だけを作り直したストアに差し替える
+
+    - 差分は元データを解析した文書に適用する（ファイル全体の読み込み・解析は最初の差分のときの1回だけ）
+    - 新たに置かれた差分ファイルはまとめて適用し、すべて適用し終えたストアだけを公開する（適用途中の状態は見えない）
+    - 適用できない差分ファイル（形式の誤り・test の不一致など）があれば、そのファイル以降は保留する
+      （そのファイルが書き換えられたら再試行する）
+    - 元のデータファイルが差し替えられた場合は、新しいデータに受信箱の差分を最初から適用し直す
+      （全体を更新したら、取り込み済みの差分ファイルは受信箱から取り除くこと）
+    - 差分の適用に対応するのは単一ファイルのメモリ保持のみ（分割形式・SQLiteでは受信箱を無視する）
+    """
+
+    def __init__(self, path: Path, inbox: Optional[Path] = None, **kwargs):
+        self.inbox = inbox or inbox_path(resolve_data_path(path))
+        self.patch_count = 0
+        self._applied: Set[str] = set()
+        self._failed: Optional[Tuple[str, Optional[Tuple[int, int]]]] = None
+        self._document: Any = None
+        self._reloaded: Optional[PolicyStore] = None
+        super().__init__(path, **kwargs)
+
+    def check_now(self) -> bool:
+        """元のデータファイルと受信箱を確認し、どちらかが変わっていれば差し替える"""
+        with self._rebuild_lock:
+            super().check_now()
+            return self._apply_inbox()
+
+    def _install(self, store: PolicyStore):
+        # 受信箱の差分を適用し直してから公開する（差分の無い新しいデータが一瞬見えることもない）
+        self._reloaded = store
+        self._document = None
+        self._applied = set()
+        self._failed = None
+
+    def _pending_files(self) -> List[Path]:
+        """未適用の差分ファイル（ファイル名順。書き込み中の一時ファイル "." で始まる名前は除く）"""
+        try:
+            names = sorted(entry.name for entry in os.scandir(self.inbox)
+                           if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file())
+        except OSError:
+            return []
+        return [self.inbox / name for name in names if name not in self._applied]
+
+    def _file_signature(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _base_document(self) -> Any:
+        """差分を適用する文書（元のデータファイルを解析したもの。以降は差分を適用した文書）"""
+        if self._document is None:
+            raw = self.path.read_bytes()
+            if data_version(raw) != self._digest:
+                # 読み込み後にファイルが変わった（次の確認で全体を読み込み直す）
+                raise ValueError(f"{self.path.name} が更新されています")
+            self._document = json.loads(raw.decode('utf-8'))
+        return self._document
+
+    def _apply_file(self, store: PolicyStore, path: Path) -> PolicyStore:
+        """差分ファイル1つを適用したストア（失敗した場合は文書もストアも変えずに例外を送出）"""
+        raw = path.read_bytes()
+        document, changed = apply_patch(self._base_document(), json.loads(raw.decode('utf-8')))
+        if not isinstance(document, dict):
+            raise JsonPatchError("適用後のデータがオブジェクトではありません")
+
+        # 同じ元データに同じ差分を同じ順に適用すれば、どのプロセスでも同じバージョンになる
+        version = data_version(store.version.encode('ascii') + b"\n" + raw)
+        scope = patch_scope(changed)
+        patched = patch_election_data(store, document, *scope, version) if scope is not None else None
+        if patched is None:
+            patched = compile_election_data(document, version=version)
+        self._document = document
+        return patched
+
+    def _apply_inbox(self) -> bool:
+        """
+        未適用の差分ファイルを順に適用し、結果を1回の代入で公開する
+        差し替えが行われた場合（元データの再読み込みを含む）に True を返す
+        """
+        reloaded, self._reloaded = self._reloaded, None
+        base = reloaded or self._snapshot
+        pending = self._pending_files()
+        if pending and (shard_directory(self.path) is not None or self.backend != BACKEND_MEMORY):
+            self.last_error = "差分ファイルの適用は単一ファイルのメモリ保持のデータにのみ対応しています"
+            pending = []
+
+        store = base
+        for path in pending:
+            signature = self._file_signature(path)
+            if self._failed == (path.name, signature):
+                break
+            try:
+                patched = self._apply_file(store, path)
+            except Exception as e:
+                self._failed = (path.name, signature)
+                self.last_error = f"差分ファイル {path.name} を適用できませんでした: {e}"
+                break
+            store = patched
+            self._applied.add(path.name)
+            self._failed = None
+            self.last_error = None
+            self.patch_count += 1
+
+        if store is base:
+            if reloaded is not None:
+                self._publish(reloaded)
+            return reloaded is not None
+
+        # 変更範囲（キャッシュを作り直す政党・選挙区）は公開中のストアとの差分から求める
+        self._publish(store)
+        return True
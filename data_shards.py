@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+分割（シャード）形式の選挙データ
+マニフェスト＋政党ごと・選挙区ごとのファイルに分け、起動時はマニフェストだけを読み込みます
+各シャードは必要になった時点で読み込み、件数上限付きのキャッシュに保持します
+
+レイアウト:
+    election_data/manifest.json
+    election_data/parties/<内容ハッシュ>.json    … 政党1件（election_data.json の parties[] の要素と同じ形式）
+    election_data/districts/<内容ハッシュ>.json  … {"name": 選挙区名, "candidates": [...]}
+
+シャードのファイル名は内容ハッシュなので、作り直しても既存のファイルの中身は変わりません
+（古いマニフェストから組み立てたストアが、遅延読み込みで別の政党・選挙区の内容を読むことはない）
+読み込み時にはマニフェストの sha256 と照合し、一致しなければ ShardIntegrityError を送出します
+
+使い方（単一ファイルから分割形式を作成）:
+    python data_shards.py [election_data.json] [出力ディレクトリ]
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+
+from election_store import (
+    BACKEND_SHARDS,
+    CandidateRecord,
+    PartyRecord,
+    PolicyStore,
+    compile_candidates,
+    compile_district_areas,
+    compile_party,
+    build_party_aliases,
+    dedupe_party_ids,
+    resolve_party_id,
+)
+
+
+MANIFEST_NAME = "manifest.json"
+SHARD_FORMAT = "election-shards-v1"
+DEFAULT_SHARD_CACHE_SIZE = 512
+
+
+class ShardIntegrityError(ValueError):
+    """シャードの内容がマニフェストの sha256 と一致しない（path は一致しなかったシャード）"""
+
+    def __init__(self, path: Path):
+        super().__init__(f"シャードの内容がマニフェストと一致しません（data_shards.py で作り直してください）: {path}")
+        self.path = path
+
+
+def _dump(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _write_atomic(path: Path, content: bytes):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
+
+
+def _shard_name(directory: str, content: bytes) -> Tuple[str, str]:
+    """シャードの内容ハッシュによるファイル名と sha256"""
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{directory}/{digest[:16]}.json", digest
+
+
+def _manifest_files(manifest_path: Path) -> List[str]:
+    """既存のマニフェストが参照しているシャード（無い・読めない場合は空）"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(manifest, dict):
+        return []
+    return [entry["file"] for key in ("parties", "districts") for entry in manifest.get(key) or []
+            if isinstance(entry, dict) and isinstance(entry.get("file"), str)]
+
+
+def write_shards(data: Dict[str, Any], out_dir: Path) -> Path:
+    """
+    単一ファイル形式のデータを分割形式で書き出し、マニフェストのパスを返す
+    シャードを書き終えてから最後にマニフェストを差し替えるため、監視側が途中の状態を読むことはない
+    1つ前のマニフェストが参照するシャードは次に作り直すまで残す（読み込み中のストアが遅延読み込みできるように）
+    """
+    parties_dir = out_dir / "parties"
+    districts_dir = out_dir / "districts"
+    parties_dir.mkdir(parents=True, exist_ok=True)
+    districts_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    previous_files = _manifest_files(manifest_path)
+
+    written = set()
+
+    def write(directory: str, content: bytes) -> Tuple[str, str]:
+        relative, digest = _shard_name(directory, content)
+        # 同じ名前なら中身も同じなので、既存のファイルは書き換えない
+        if not (out_dir / relative).exists():
+            _write_atomic(out_dir / relative, content)
+        written.add(relative)
+        return relative, digest
+
+    party_entries = []
+    for i, party in enumerate(p for p in data.get("parties", []) if isinstance(p, dict)):
+        relative, digest = write("parties", _dump(party))
+
+        personalized = party.get("personalized_policies")
+        general = party.get("general_policies")
+        party_entries.append({
+            "id": party.get("id") or f"party-{i}",
+            "name": party.get("name") or "不明な政党",
+            "aliases": party.get("aliases") if isinstance(party.get("aliases"), list) else [],
+            "professions": sorted(k for k, v in personalized.items() if isinstance(v, (list, str)))
+            if isinstance(personalized, dict) else [],
+            "topics": sorted(general) if isinstance(general, dict) else [],
+            "file": relative,
+            "sha256": digest,
+        })
+
+    district_entries = []
+    districts = data.get("districts", {})
+    for name, candidates in (districts.items() if isinstance(districts, dict) else []):
+        relative, digest = write("districts", _dump({"name": name, "candidates": candidates}))
+
+        labels = [str(c.get("party", "無所属")) for c in candidates if isinstance(c, dict)] \
+            if isinstance(candidates, list) else []
+        district_entries.append({
+            "name": name,
+            "candidate_parties": labels,
+            "file": relative,
+            "sha256": digest,
+        })
+
+    manifest = {
+        "format": SHARD_FORMAT,
+        "parties": party_entries,
+        "districts": district_entries,
+    }
+    if "district_areas" in data:
+        manifest["district_areas"] = data["district_areas"]
+
+    _write_atomic(manifest_path, _dump(manifest))
+
+    # 今回と1つ前のマニフェストのどちらからも参照されないシャードを削除
+    keep = written.union(previous_files)
+    for stale in list(parties_dir.glob("*.json")) + list(districts_dir.glob("*.json")):
+        if stale.relative_to(out_dir).as_posix() not in keep:
+            stale.unlink()
+
+    return manifest_path
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    """マニフェストを読み込む"""
+    with open(directory / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("format") != SHARD_FORMAT:
+        raise ValueError(f"分割データのマニフェスト形式が不正です: {directory / MANIFEST_NAME}")
+    return manifest
+
+
+def load_sharded_data(directory: Path, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """全シャードを読み込み、単一ファイル形式と同じ辞書に組み立てる（検証用）"""
+    manifest = manifest if manifest is not None else read_manifest(directory)
+    data: Dict[str, Any] = {"parties": [], "districts": {}}
+
+    for entry in manifest.get("parties", []):
+        with open(directory / entry["file"], 'r', encoding='utf-8') as f:
+            data["parties"].append(json.load(f))
+    for entry in manifest.get("districts", []):
+        with open(directory / entry["file"], 'r', encoding='utf-8') as f:
+            data["districts"][entry["name"]] = json.load(f).get("candidates")
+    if "district_areas" in manifest:
+        data["district_areas"] = manifest["district_areas"]
+    return data
+
+
+class ShardCache:
+    """
+    読み込み・コンパイル済みシャードの件数上限付きLRUキャッシュ（スレッドセーフ）
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_SHARD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = load()
+        with self._lock:
+            self.loads += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def read_shard(path: Path, sha256: Optional[str] = None) -> Any:
+    """シャードを読み込む（sha256 を渡すと内容を照合し、一致しなければ ShardIntegrityError）"""
+    raw = path.read_bytes()
+    if sha256 and hashlib.sha256(raw).hexdigest() != sha256:
+        raise ShardIntegrityError(path)
+    return json.loads(raw.decode('utf-8'))
+
+
+class ShardedPartyRecord:
+    """
+    PartyRecord と同じ属性を持つ遅延読み込み版
+    id・name はマニフェストから、政策は初回参照時にシャードから読み込む
+    """
+    __slots__ = ("id", "name", "_path", "_sha256", "_index", "_cache")
+
+    def __init__(self, party_id: str, name: str, path: Path, index: int, cache: ShardCache,
+                 sha256: Optional[str] = None):
+        self.id = party_id
+        self.name = name
+        self._path = path
+        self._sha256 = sha256
+        self._index = index
+        self._cache = cache
+
+    def _record(self) -> PartyRecord:
+        # 同じ内容の政党は同じファイルになるため、位置もキーに含める（IDの補完に位置を使う）
+        return self._cache.get((self._path, self._index),
+                               lambda: compile_party(read_shard(self._path, self._sha256), self._index))
+
+    @property
+    def personalized(self):
+        return self._record().personalized
+
+    @property
+    def general(self):
+        return self._record().general
+
+
+class ShardedDistricts(Mapping):
+    """選挙区名 → 候補者の遅延読み込みマッピング（paths は選挙区名 → (シャードのパス, sha256)）"""
+
+    def __init__(self, paths: Dict[str, Tuple[Path, Optional[str]]], resolve: Callable[[str], Optional[str]],
+                 cache: ShardCache):
+        self._paths = paths
+        self._resolve = resolve
+        self._cache = cache
+
+    def __getitem__(self, name: str) -> Tuple[CandidateRecord, ...]:
+        path, sha256 = self._paths[name]
+        return self._cache.get(path, lambda: compile_candidates(read_shard(path, sha256).get("candidates"),
+                                                                self._resolve))
+
+    def __contains__(self, name: object) -> bool:
+        # Mapping 既定の実装はシャードを読み込んでしまうため上書きする
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+class ShardedCandidatesByParty(Mapping):
+    """
+    政党ID → ((選挙区名, 候補者), ...) の遅延版
+    どの選挙区の何番目かはマニフェストから求めておき、候補者は該当する選挙区のシャードだけ読む
+    """
+
+    def __init__(self, positions: Dict[str, List[Tuple[str, int]]], districts: ShardedDistricts):
+        self._positions = positions
+        self._districts = districts
+
+    def __getitem__(self, party_id: str) -> Tuple[Tuple[str, CandidateRecord], ...]:
+        return tuple(
+            (district_name, self._districts[district_name][position])
+            for district_name, position in self._positions[party_id]
+        )
+
+    def __contains__(self, party_id: object) -> bool:
+        return party_id in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+def compile_sharded_store(directory: Path, manifest: Optional[Dict[str, Any]] = None, version: str = "",
+                          cache_size: int = DEFAULT_SHARD_CACHE_SIZE) -> PolicyStore:
+    """
+    マニフェストだけから PolicyStore を組み立てる（シャードは遅延読み込み）
+    """
+    manifest = manifest if manifest is not None else read_manifest(directory)
+    if not isinstance(manifest, dict) or manifest.get("format") != SHARD_FORMAT:
+        raise ValueError(f"分割データのマニフェスト形式が不正です: {directory / MANIFEST_NAME}")
+    cache = ShardCache(cache_size)
+
+    party_entries = [entry for entry in manifest.get("parties", []) if isinstance(entry, dict)]
+    parties = tuple(
+        ShardedPartyRecord(str(entry.get("id") or f"party-{i}"), str(entry.get("name") or "不明な政党"),
+                           directory / entry["file"], i, cache, entry.get("sha256"))
+        for i, entry in enumerate(party_entries)
+    )
+    dedupe_party_ids(parties)
+
+    profession_index: Dict[str, List[int]] = {}
+    topic_index: Dict[str, List[int]] = {}
+    for i, entry in enumerate(party_entries):
+        for profession in entry.get("professions", []):
+            profession_index.setdefault(profession, []).append(i)
+        for topic in entry.get("topics", []):
+            topic_index.setdefault(topic, []).append(i)
+
+    aliases = build_party_aliases(parties, party_entries)
+    resolved: Dict[str, Optional[str]] = {}
+
+    def resolve(label: str) -> Optional[str]:
+        if label not in resolved:
+            resolved[label] = resolve_party_id(label, aliases, parties)
+        return resolved[label]
+
+    district_entries = [entry for entry in manifest.get("districts", []) if isinstance(entry, dict)]
+    districts = ShardedDistricts({entry["name"]: (directory / entry["file"], entry.get("sha256"))
+                                  for entry in district_entries}, resolve, cache)
+
+    positions: Dict[str, List[Tuple[str, int]]] = {}
+    for entry in sorted(district_entries, key=lambda e: e["name"]):
+        for position, label in enumerate(entry.get("candidate_parties", [])):
+            party_id = resolve(label)
+            if party_id is not None:
+                positions.setdefault(party_id, []).append((entry["name"], position))
+
+    return PolicyStore(
+        parties=parties,
+        districts=districts,
+        professions=tuple(sorted(profession_index)),
+        topics=tuple(sorted(topic_index)),
+        profession_index=MappingProxyType({k: tuple(v) for k, v in profession_index.items()}),
+        topic_index=MappingProxyType({k: tuple(v) for k, v in topic_index.items()}),
+        version=version,
+        district_areas=compile_district_areas(manifest.get("district_areas")),
+        party_aliases=MappingProxyType(aliases),
+        candidates_by_party=ShardedCandidatesByParty(positions, districts),
+        candidate_counts=MappingProxyType({k: len(v) for k, v in positions.items()}),
+        backend=BACKEND_SHARDS,
+    )
+
+
+def main():
+    """単一ファイル形式から分割形式を作成"""
+    script_dir = Path(__file__).parent
+    json_file = Path(sys.argv[1]) if len(sys.argv) > 1 else script_dir / "election_data.json"
+    out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else script_dir / "election_data"
+
+    if not json_file.exists():
+        print(f"❌ ファイルが見つかりません: {json_file}")
+        sys.exit(1)
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    manifest_path = write_shards(data, out_dir)
+    manifest = read_manifest(out_dir)
+    print(f"✅ {manifest_path} を作成しました"
+          f"（政党 {len(manifest['parties'])}件, 選挙区 {len(manifest['districts'])}件）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+選挙区名の検索インデックス
+選挙区名・都道府県名・よみがな（ひらがな/カタカナ）・市区町村名から、
+前方一致・部分一致・誤字許容（1文字違い）で選挙区を検索します
+"""
+
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+
+# 都道府県名（接尾辞なし）→ (接尾辞, よみ, 接尾辞のよみ)
+PREFECTURES: Dict[str, Tuple[str, str, str]] = {
+    "北海道": ("", "ほっかいどう", ""),
+    "青森": ("県", "あおもり", "けん"), "岩手": ("県", "いわて", "けん"),
+    "宮城": ("県", "みやぎ", "けん"), "秋田": ("県", "あきた", "けん"),
+    "山形": ("県", "やまがた", "けん"), "福島": ("県", "ふくしま", "けん"),
+    "茨城": ("県", "いばらき", "けん"), "栃木": ("県", "とちぎ", "けん"),
+    "群馬": ("県", "ぐんま", "けん"), "埼玉": ("県", "さいたま", "けん"),
+    "千葉": ("県", "ちば", "けん"), "東京": ("都", "とうきょう", "と"),
+    "神奈川": ("県", "かながわ", "けん"), "新潟": ("県", "にいがた", "けん"),
+    "富山": ("県", "とやま", "けん"), "石川": ("県", "いしかわ", "けん"),
+    "福井": ("県", "ふくい", "けん"), "山梨": ("県", "やまなし", "けん"),
+    "長野": ("県", "ながの", "けん"), "岐阜": ("県", "ぎふ", "けん"),
+    "静岡": ("県", "しずおか", "けん"), "愛知": ("県", "あいち", "けん"),
+    "三重": ("県", "みえ", "けん"), "滋賀": ("県", "しが", "けん"),
+    "京都": ("府", "きょうと", "ふ"), "大阪": ("府", "おおさか", "ふ"),
+    "兵庫": ("県", "ひょうご", "けん"), "奈良": ("県", "なら", "けん"),
+    "和歌山": ("県", "わかやま", "けん"), "鳥取": ("県", "とっとり", "けん"),
+    "島根": ("県", "しまね", "けん"), "岡山": ("県", "おかやま", "けん"),
+    "広島": ("県", "ひろしま", "けん"), "山口": ("県", "やまぐち", "けん"),
+    "徳島": ("県", "とくしま", "けん"), "香川": ("県", "かがわ", "けん"),
+    "愛媛": ("県", "えひめ", "けん"), "高知": ("県", "こうち", "けん"),
+    "福岡": ("県", "ふくおか", "けん"), "佐賀": ("県", "さが", "けん"),
+    "長崎": ("県", "ながさき", "けん"), "熊本": ("県", "くまもと", "けん"),
+    "大分": ("県", "おおいた", "けん"), "宮崎": ("県", "みやざき", "けん"),
+    "鹿児島": ("県", "かごしま", "けん"), "沖縄": ("県", "おきなわ", "けん"),
+}
+
+# カタカナ → ひらがな
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)}
+
+# 誤字許容の対象にする最短の語長
+_FUZZY_MIN_LENGTH = 2
+
+# 一致の種類（小さいほど上位）
+MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_FUZZY = range(4)
+
+
+def normalize_text(text: str) -> str:
+    """検索用に正規化（全角半角の統一・小文字化・カタカナ→ひらがな・空白除去）"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(text.translate(_KATAKANA_TO_HIRAGANA).split())
+
+
+def split_prefecture(district_name: str) -> Optional[str]:
+    """選挙区名の先頭から都道府県名（接尾辞なし）を取り出す"""
+    for length in (3, 2):
+        head = district_name[:length]
+        if head in PREFECTURES:
+            return head
+    return None
+
+
+def _district_number(district_name: str, prefecture: str) -> str:
+    """「千葉8区」→「8」"""
+    rest = district_name[len(prefecture):]
+    for suffix in ("都", "府", "県"):
+        if rest.startswith(suffix):
+            rest = rest[1:]
+    return unicodedata.normalize("NFKC", rest).rstrip("区")
+
+
+def _single_deletes(term: str) -> Set[str]:
+    """1文字削除した変種"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def district_terms(district_name: str, areas: Sequence[Tuple[str, str]] = ()) -> List[str]:
+    """選挙区に対応する検索語（正規化済み）"""
+    terms = [district_name]
+    prefecture = split_prefecture(district_name)
+    if prefecture is not None:
+        suffix, reading, suffix_reading = PREFECTURES[prefecture]
+        number = _district_number(district_name, prefecture)
+        terms += [prefecture, prefecture + suffix, reading, reading + suffix_reading]
+        if number:
+            terms += [f"{reading}{number}く", f"{reading}{suffix_reading}{number}く"]
+    for municipality, municipality_reading in areas:
+        terms.append(municipality)
+        if municipality_reading:
+            terms.append(municipality_reading)
+
+    normalized = []
+    for term in terms:
+        term = normalize_text(term)
+        if term and term not in normalized:
+            normalized.append(term)
+    return normalized
+
+
+class DistrictSearchIndex:
+    """
+    読み込み時に構築する選挙区検索インデックス
+    - 前方一致: ソート済み語リストの二分探索
+    - 誤字許容: 語の前方部分の1文字削除変種を辞書に登録（SymSpell方式）
+    """
+
+    def __init__(self, district_names: Sequence[str],
+                 district_areas: Optional[Mapping[str, Sequence[Tuple[str, str]]]] = None):
+        district_areas = district_areas or {}
+        self.district_names = tuple(district_names)
+
+        pairs: List[Tuple[str, int]] = []
+        deletes: Dict[str, Set[int]] = {}
+        for index, name in enumerate(self.district_names):
+            for term in district_terms(name, district_areas.get(name, ())):
+                pairs.append((term, index))
+                for length in range(_FUZZY_MIN_LENGTH, len(term) + 1):
+                    prefix = term[:length]
+                    deletes.setdefault(prefix, set()).add(index)
+                    for variant in _single_deletes(prefix):
+                        deletes.setdefault(variant, set()).add(index)
+
+        pairs.sort()
+        self._terms = [term for term, _ in pairs]
+        self._term_districts = [index for _, index in pairs]
+        self._deletes = {variant: tuple(sorted(ids)) for variant, ids in deletes.items()}
+
+    def state(self) -> tuple:
+        """構築済みの索引（コンパイル済み成果物への保存用。タプル・文字列・数値のみ）"""
+        return self.district_names, tuple(self._terms), tuple(self._term_districts), tuple(self._deletes.items())
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "DistrictSearchIndex":
+        """state() の値から再構築せずに復元する"""
+        index = cls.__new__(cls)
+        district_names, terms, term_districts, deletes = state
+        index.district_names = tuple(district_names)
+        index._terms = list(terms)
+        index._term_districts = list(term_districts)
+        index._deletes = dict(deletes)
+        return index
+
+    def _record(self, best: Dict[int, int], indexes: Iterable[int], rank: int):
+        for index in indexes:
+            if rank < best.get(index, MATCH_FUZZY + 1):
+                best[index] = rank
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """一致度順（同順位は選挙区名順）に選挙区名を返す"""
+        q = normalize_text(query)
+        if not q:
+            return []
+
+        best: Dict[int, int] = {}
+
+        # 前方一致（完全一致を含む）
+        start = bisect_left(self._terms, q)
+        for pos in range(start, len(self._terms)):
+            term = self._terms[pos]
+            if not term.startswith(q):
+                break
+            self._record(best, (self._term_districts[pos],), MATCH_EXACT if term == q else MATCH_PREFIX)
+
+        # 部分一致（「8区」「柏」など語の途中から）
+        if len(best) < limit:
+            matches = [index for term, index in zip(self._terms, self._term_districts) if q in term]
+            self._record(best, matches, MATCH_SUBSTRING)
+
+        # 誤字許容（1文字の脱字・余分・置換）
+        if len(best) < limit and len(q) >= _FUZZY_MIN_LENGTH:
+            for variant in _single_deletes(q) | {q}:
+                self._record(best, self._deletes.get(variant, ()), MATCH_FUZZY)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], self.district_names[item[0]]))
+        return [self.district_names[index] for index, _ in ranked[:limit]]
@@ -0,0 +1,179 @@
+"""
+複数の選挙データの登録簿と、読み込み済みデータの上限付きLRU
+elections.json に選挙（衆院選・参院選・地方選など）ごとのデータファイルと見出しを登録し、
+選ばれた選挙のデータだけを必要になった時点で読み込みます（全選挙を常にメモリに持たない）
+
+elections.json:
+    {
+        "default": "2026-shugiin",
+        "elections": [
+            {"id": "2026-shugiin", "title": "2026年衆議院議員総選挙", "short_title": "2026年衆院選",
+             "subtitle": "2026年2月8日投開票"},
+            {"id": "2024-shugiin", "title": "2024年衆議院議員総選挙", "data": "elections/2024-shugiin.json"}
+        ]
+    }
+
+data は elections.json からの相対パス（単一ファイル・分割形式のディレクトリのどちらでも可）
+省略した選挙はアプリ既定のデータ（election_data/ または election_data.json）を使う
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_diff import ChangeSet
+from election_store import PolicyStore
+
+
+REGISTRY_NAME = "elections.json"
+
+# 登録簿が無い場合の見出し（単一の選挙データとして扱う）
+DEFAULT_ELECTION_ID = "default"
+DEFAULT_TITLE = "2026年衆議院議員総選挙"
+DEFAULT_SHORT_TITLE = "2026年衆院選"
+DEFAULT_SUBTITLE = "2026年2月8日投開票"
+
+
+class ElectionInfo:
+    """登録された選挙1件（ID・見出し・データファイル）"""
+    __slots__ = ("id", "title", "short_title", "subtitle", "path")
+
+    def __init__(self, election_id: str, title: str, short_title: str, subtitle: str, path: Path):
+        self.id = election_id
+        self.title = title
+        self.short_title = short_title
+        self.subtitle = subtitle
+        self.path = path
+
+
+class ElectionRegistry:
+    """選挙IDの登録順の一覧と既定の選挙"""
+
+    def __init__(self, elections: List[ElectionInfo], default_id: Optional[str] = None):
+        if not elections:
+            raise ValueError("選挙が1件も登録されていません")
+        self.elections: Dict[str, ElectionInfo] = {election.id: election for election in elections}
+        self.default = self.elections.get(default_id or "", elections[0])
+
+    def __len__(self) -> int:
+        return len(self.elections)
+
+    def __contains__(self, election_id: object) -> bool:
+        return election_id in self.elections
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.elections)
+
+    def resolve(self, election_id: Optional[str]) -> ElectionInfo:
+        """選挙IDに対応する選挙（未登録・未指定なら既定の選挙）"""
+        return self.elections.get(election_id or "", self.default)
+
+
+def single_election(path: Path) -> ElectionRegistry:
+    """データファイル1つだけの登録簿（elections.json が無い場合・データを直接指定した場合）"""
+    return ElectionRegistry([ElectionInfo(DEFAULT_ELECTION_ID, DEFAULT_TITLE, DEFAULT_SHORT_TITLE,
+                                          DEFAULT_SUBTITLE, path)])
+
+
+def parse_registry(data: Any, base_dir: Path, fallback_data_path: Path) -> ElectionRegistry:
+    """elections.json の内容から登録簿を作る（IDの無い選挙は読み飛ばす）"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{REGISTRY_NAME} の形式が正しくありません")
+
+    elections = []
+    for entry in data.get("elections") or []:
+        if not isinstance(entry, dict) or not entry.get("id"):
+            continue
+        title = str(entry.get("title") or entry["id"])
+        elections.append(ElectionInfo(
+            election_id=str(entry["id"]),
+            title=title,
+            short_title=str(entry.get("short_title") or title),
+            subtitle=str(entry.get("subtitle") or ""),
+            path=base_dir / str(entry["data"]) if entry.get("data") else fallback_data_path,
+        ))
+    return ElectionRegistry(elections, default_id=data.get("default"))
+
+
+def load_registry(path: Path, fallback_data_path: Path) -> ElectionRegistry:
+    """登録簿を読み込む（ファイルが無ければ fallback_data_path だけの登録簿）"""
+    if not path.exists():
+        return single_election(fallback_data_path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_registry(json.load(f), path.parent, fallback_data_path)
+
+
+class StaticDataset:
+    """読み込み時点のストアを返し続けるデータ（ホットリロードしない場合）"""
+    last_error: Optional[str] = None
+    changes: Tuple[ChangeSet, ...] = ()
+
+    def __init__(self, store: PolicyStore):
+        self.store = store
+
+    def snapshot(self) -> PolicyStore:
+        return self.store
+
+    def stop(self):
+        pass
+
+
+class ResidentDatasets:
+    """
+    読み込み済みの選挙データ（選挙ID → データ）の上限付きLRU（スレッドセーフ）
+    open_dataset は選挙を受け取り、snapshot()・stop()・last_error・changes を持つデータ（StaticDataset・StoreReloader）を返す関数
+    上限を超えると最も長く使われていない選挙を破棄する（表示中のセッションは取得済みのストアを使い続ける）
+    """
+
+    def __init__(self, open_dataset: Callable[[ElectionInfo], Any], max_entries: int = 3):
+        self.max_entries = max(1, max_entries)
+        self._open_dataset = open_dataset
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, election: ElectionInfo) -> Any:
+        """選挙のデータを返す（未読み込みならここで読み込む）"""
+        with self._lock:
+            dataset = self._entries.get(election.id)
+            if dataset is not None:
+                self._entries.move_to_end(election.id)
+                return dataset
+            loading = self._loading.setdefault(election.id, threading.Lock())
+
+        # 読み込みはロック外で行い、同じ選挙を同時に要求したセッションは1回の読み込みを待つ
+        with loading:
+            with self._lock:
+                dataset = self._entries.get(election.id)
+                if dataset is not None:
+                    self._entries.move_to_end(election.id)
+                    return dataset
+            dataset = self._open_dataset(election)
+
+            evicted = []
+            with self._lock:
+                self._entries[election.id] = dataset
+                self.loads += 1
+                while len(self._entries) > self.max_entries:
+                    evicted.append(self._entries.popitem(last=False)[1])
+                    self.evictions += 1
+                self._loading.pop(election.id, None)
+
+        for old in evicted:
+            old.stop()
+        return dataset
+
+    def resident_ids(self) -> List[str]:
+        """読み込み済みの選挙ID（古い順）"""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"resident": len(self._entries), "max_entries": self.max_entries,
+                    "loads": self.loads, "evictions": self.evictions}
@@ -0,0 +1,526 @@
+"""
+election_data.json をコンパイルした読み取り専用の政策ストア
+読み込み時に一度だけ正規化・索引化し、再実行ごとの全走査をなくします
+"""
+
+import unicodedata
+from types import MappingProxyType
+from typing import Callable, Collection, Dict, FrozenSet, List, Any, Mapping, Optional, Sequence, Tuple, Union
+
+from district_search import DistrictSearchIndex
+from explanation_blob import ExplanationRef
+from text_table import SegmentedText, StringTable, count_segments
+
+
+EMPTY_DATA: Dict[str, Any] = {"parties": [], "districts": {}}
+
+# 候補者データの保持方法（memory: すべてメモリ上、shards: 分割ファイルから遅延読み込み、sqlite: SQLiteから都度読み込み）
+BACKEND_MEMORY = "memory"
+BACKEND_SHARDS = "shards"
+BACKEND_SQLITE = "sqlite"
+
+# 候補者データで使われる略称 → 正式な政党名
+# （データ側の政党レコードに "aliases" があればそちらを優先する）
+DEFAULT_PARTY_ALIASES: Dict[str, str] = {
+    "自民": "自由民主党",
+    "立憲": "立憲民主党",
+    "公明": "公明党",
+    "維新": "日本維新の会",
+    "国民": "国民民主党",
+    "共産": "日本共産党",
+    "れいわ": "れいわ新選組",
+    "社民": "社会民主党",
+    "参政": "参政党",
+    "保守": "日本保守党",
+    "中道": "中道改革連合",
+    "未来": "チーム未来",
+}
+
+
+def normalize_explanation(value: Any) -> str:
+    """解説を表示用の文字列に正規化（リストは段落として連結）"""
+    if isinstance(value, list):
+        items = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+        return "\n\n".join(items)
+    if isinstance(value, str):
+        return value.strip()
+    return ""
+
+
+class PolicyItem:
+    """
+    政策1項目（解説は対応付け・正規化済み）
+    コンパイル済み成果物から読み込んだ場合、解説は mmap したブロブへの参照（explanation_blob.ExplanationRef）、
+    JSONからコンパイルした場合は共有の文の列（text_table.SegmentedText）で持ち、explanation を参照した時点で組み立てる
+    """
+    __slots__ = ("text", "_explanation", "bullet")
+
+    def __init__(self, text: str, explanation: Union[str, ExplanationRef, SegmentedText] = "",
+                 bullet: bool = False):
+        self.text = text
+        self._explanation = explanation
+        self.bullet = bullet
+
+    @property
+    def explanation(self) -> str:
+        value = self._explanation
+        return value if value.__class__ is str else value.load()
+
+    @property
+    def has_explanation(self) -> bool:
+        """解説があるか（読み込まずに判定する。参照・文の列は空でない解説にだけ作られる）"""
+        value = self._explanation
+        return value.__class__ is not str or bool(value)
+
+    def explanation_segments(self, decoded: Dict) -> Sequence[str]:
+        """
+        解説を文ごとの列で返す（連結しない。共有の文は同じオブジェクト）
+        ブロブの文は decoded に溜め、同じ文は1回だけデコードする
+        """
+        value = self._explanation
+        if value.__class__ is str:
+            return (value,) if value else ()
+        return value.shared_segments(decoded)
+
+    def explanation_parts(self) -> Sequence[bytes]:
+        """解説のUTF-8のバイト列（文字列にデコード・連結せずに返す。解説が無ければ空）"""
+        value = self._explanation
+        if value.__class__ is str:
+            return (value.encode('utf-8'),) if value else ()
+        return value.encoded_parts()
+
+
+class PartyRecord:
+    """政党1件分のコンパイル済みレコード"""
+    __slots__ = ("id", "name", "personalized", "general")
+
+    def __init__(self, party_id: str, name: str,
+                 personalized: Optional[Mapping[str, Tuple[PolicyItem, ...]]],
+                 general: Optional[Mapping[str, PolicyItem]]):
+        self.id = party_id
+        self.name = name
+        # None は元データにフィールド自体が無いことを表す
+        self.personalized = personalized
+        self.general = general
+
+
+class CandidateRecord:
+    """候補者1名分のレコード"""
+    __slots__ = ("name", "party", "memo", "party_id")
+
+    def __init__(self, name: str, party: str, memo: str, party_id: Optional[str] = None):
+        self.name = name
+        self.party = party
+        self.memo = memo
+        # 政党レコードに対応付けられた場合のみ設定（無所属・未登録の政党は None）
+        self.party_id = party_id
+
+
+class StoreDelta:
+    """
+    差し替えで公開されたストアの、直前に公開されていたバージョン（base_version）からの変更範囲
+    parties は政党名・政策・解説が変わった政党ID、districts は変わった選挙区名、
+    candidate_parties は候補者一覧が変わった政党ID（data_diff.py の差分から求める）
+    """
+    __slots__ = ("base_version", "parties", "districts", "candidate_parties")
+
+    def __init__(self, base_version: str, parties: Collection[str] = (), districts: Collection[str] = (),
+                 candidate_parties: Collection[str] = ()):
+        self.base_version = base_version
+        self.parties: FrozenSet[str] = frozenset(parties)
+        self.districts: FrozenSet[str] = frozenset(districts)
+        self.candidate_parties: FrozenSet[str] = frozenset(candidate_parties)
+
+
+class PolicyStore:
+    """
+    コンパイル済みの選挙データ
+    職種・トピック→政党の索引と選択肢リストを保持する
+    """
+    __slots__ = ("parties", "districts", "district_names", "district_areas", "district_search",
+                 "professions", "topics", "profession_index", "topic_index", "version",
+                 "party_aliases", "candidates_by_party", "candidate_counts", "backend",
+                 "party_revisions", "delta")
+
+    def __init__(self, parties: Tuple[PartyRecord, ...],
+                 districts: Mapping[str, Tuple[CandidateRecord, ...]],
+                 professions: Tuple[str, ...], topics: Tuple[str, ...],
+                 profession_index: Mapping[str, Tuple[int, ...]],
+                 topic_index: Mapping[str, Tuple[int, ...]],
+                 version: str = "",
+                 district_areas: Optional[Mapping[str, Tuple[Tuple[str, str], ...]]] = None,
+                 party_aliases: Optional[Mapping[str, str]] = None,
+                 candidates_by_party: Optional[Mapping[str, Tuple[Tuple[str, CandidateRecord], ...]]] = None,
+                 candidate_counts: Optional[Mapping[str, int]] = None,
+                 district_search: Optional[DistrictSearchIndex] = None,
+                 backend: str = BACKEND_MEMORY,
+                 party_revisions: Optional[Mapping[str, str]] = None,
+                 delta: Optional[StoreDelta] = None):
+        self.parties = parties
+        self.districts = districts
+        # 選挙区セレクトボックス用のソート済み名称
+        self.district_names = tuple(sorted(districts))
+        # 選挙区 → ((市区町村名, よみ), ...)（任意データ）
+        self.district_areas = district_areas or MappingProxyType({})
+        # コンパイル済み成果物から読み込んだ場合は構築済みの索引を渡される
+        self.district_search = district_search or DistrictSearchIndex(self.district_names, self.district_areas)
+        self.professions = professions
+        self.topics = topics
+        self.profession_index = profession_index
+        self.topic_index = topic_index
+        self.version = version
+        self.backend = backend
+        # 正規化した政党名・略称 → 政党ID
+        self.party_aliases = party_aliases or MappingProxyType({})
+        # 差し替えで公開されたストアでは、全政党の政党ID → その政党の内容が最後に変わったバージョン
+        # （描画済みカードのキャッシュキーに使い、変わっていない政党のカードは差し替え後も使い回す）
+        self.party_revisions = party_revisions or MappingProxyType({})
+        self.delta = delta
+
+        # 政党ID → ((選挙区名, 候補者), ...) の逆引き索引（選挙区名順）
+        # 分割形式では選挙区を読み込まずに済むよう、遅延版の索引と件数を渡される
+        if candidates_by_party is None:
+            by_party: Dict[str, List[Tuple[str, CandidateRecord]]] = {}
+            for district_name in self.district_names:
+                for candidate in districts[district_name]:
+                    if candidate.party_id is not None:
+                        by_party.setdefault(candidate.party_id, []).append((district_name, candidate))
+            candidates_by_party = MappingProxyType({k: tuple(v) for k, v in by_party.items()})
+        self.candidates_by_party = candidates_by_party
+        self.candidate_counts = candidate_counts if candidate_counts is not None else MappingProxyType(
+            {k: len(v) for k, v in candidates_by_party.items()})
+
+    @property
+    def lazy_candidates(self) -> bool:
+        """候補者を参照時に読み込むか（全選挙区分の事前描画を避けるべきか）"""
+        return self.backend != BACKEND_MEMORY
+
+    def party_revision(self, party_id: str) -> str:
+        """政党の内容のバージョン（差し替えで変わっていなければ前のデータバージョン）"""
+        return self.party_revisions.get(party_id, self.version)
+
+    def candidates_for_party(self, party_id: str) -> Tuple[Tuple[str, CandidateRecord], ...]:
+        """指定政党の全国の候補者（選挙区名, 候補者）"""
+        return self.candidates_by_party.get(party_id, ())
+
+    def candidate_count(self, party_id: str) -> int:
+        """指定政党の候補者数（候補者データ自体は読み込まない）"""
+        return self.candidate_counts.get(party_id, 0)
+
+    def parties_for_profession(self, profession: str) -> List[PartyRecord]:
+        """指定職種の政策を持つ政党"""
+        return [self.parties[i] for i in self.profession_index.get(profession, ())]
+
+    def parties_for_topic(self, topic: str) -> List[PartyRecord]:
+        """指定トピックの政策を持つ政党"""
+        return [self.parties[i] for i in self.topic_index.get(topic, ())]
+
+
+def _compile_personalized(policies: Any, explanations: Any) -> Optional[Mapping[str, Tuple[PolicyItem, ...]]]:
+    """専門職向け政策を (政策, 解説) の組に整列"""
+    if not isinstance(policies, dict):
+        return None
+    if not isinstance(explanations, dict):
+        explanations = {}
+
+    compiled: Dict[str, Tuple[PolicyItem, ...]] = {}
+    for profession, value in policies.items():
+        raw_explanation = explanations.get(profession)
+
+        if isinstance(value, list):
+            items = []
+            for i, policy in enumerate(value):
+                # リスト形式の解説は同じ位置の政策に、文字列形式は全項目に対応
+                if isinstance(raw_explanation, list):
+                    explanation = normalize_explanation(raw_explanation[i]) if i < len(raw_explanation) else ""
+                else:
+                    explanation = normalize_explanation(raw_explanation)
+                items.append(PolicyItem(str(policy), explanation, bullet=True))
+            compiled[profession] = tuple(items)
+        elif isinstance(value, str):
+            compiled[profession] = (PolicyItem(value, normalize_explanation(raw_explanation)),)
+
+    return MappingProxyType(compiled)
+
+
+def _compile_general(policies: Any, explanations: Any) -> Optional[Mapping[str, PolicyItem]]:
+    """一般政策をトピックごとの項目に整列"""
+    if not isinstance(policies, dict):
+        return None
+    if not isinstance(explanations, dict):
+        explanations = {}
+
+    compiled = {
+        topic: PolicyItem(str(policy), normalize_explanation(explanations.get(topic)))
+        for topic, policy in policies.items()
+    }
+    return MappingProxyType(compiled)
+
+
+def compile_party(party: Dict, index: int) -> PartyRecord:
+    """生の政党データを PartyRecord に変換"""
+    return PartyRecord(
+        party_id=str(party.get("id") or f"party-{index}"),
+        name=str(party.get("name") or "不明な政党"),
+        personalized=_compile_personalized(party.get("personalized_policies"),
+                                           party.get("personalized_explanations")),
+        general=_compile_general(party.get("general_policies"),
+                                 party.get("general_explanations")),
+    )
+
+
+def dedupe_party_ids(parties: Tuple[PartyRecord, ...]):
+    """政党IDはキャッシュキー等に使うため、重複があれば連番で一意にする"""
+    seen_ids = set()
+    for i, record in enumerate(parties):
+        if record.id in seen_ids:
+            record.id = f"{record.id}-{i}"
+        seen_ids.add(record.id)
+
+
+def share_texts(parties: Tuple[PartyRecord, ...], table: Optional[StringTable] = None) -> StringTable:
+    """
+    政策本文は同じ内容のオブジェクトを共有し、解説は文単位で共有の文字列表の参照に置き換える
+    （政党・職種をまたいで繰り返される定型文を1つにまとめる。表示される文字列は変わらない）
+    """
+    table = table if table is not None else StringTable()
+    items = [item for record in parties for items in (record.personalized or {}).values() for item in items]
+    items += [item for record in parties for item in (record.general or {}).values()]
+    # 複数の解説に現れる文だけを共有の単位にする
+    counts = count_segments(item._explanation for item in items if item._explanation.__class__ is str)
+
+    for item in items:
+        item.text = table.share(item.text)
+        explanation = item._explanation
+        if explanation.__class__ is str and explanation:
+            pieces = table.pieces(explanation, counts)
+            item._explanation = pieces[0] if len(pieces) == 1 else SegmentedText(pieces)
+    return table
+
+
+def build_facet_indexes(parties: Tuple[PartyRecord, ...]) -> Tuple[Mapping[str, Tuple[int, ...]],
+                                                                   Mapping[str, Tuple[int, ...]]]:
+    """職種 → 政党の位置、トピック → 政党の位置 の索引"""
+    profession_index: Dict[str, List[int]] = {}
+    topic_index: Dict[str, List[int]] = {}
+    for i, record in enumerate(parties):
+        for profession in record.personalized or ():
+            profession_index.setdefault(profession, []).append(i)
+        for topic in record.general or ():
+            topic_index.setdefault(topic, []).append(i)
+    return (MappingProxyType({k: tuple(v) for k, v in profession_index.items()}),
+            MappingProxyType({k: tuple(v) for k, v in topic_index.items()}))
+
+
+def normalize_party_label(label: str) -> str:
+    """政党名・略称の表記ゆれ（全角半角・空白）を正規化"""
+    return "".join(unicodedata.normalize("NFKC", label).split())
+
+
+def build_party_aliases(parties: Tuple[PartyRecord, ...], raw_parties: List[Dict]) -> Dict[str, str]:
+    """
+    政党名・略称 → 政党ID の対応表
+    優先順位: データ内の "aliases" > ID・正式名 > 既定の略称表
+    """
+    table: Dict[str, str] = {}
+    by_name = {normalize_party_label(record.name): record.id for record in parties}
+
+    for alias, full_name in DEFAULT_PARTY_ALIASES.items():
+        party_id = by_name.get(normalize_party_label(full_name))
+        if party_id is not None:
+            table[normalize_party_label(alias)] = party_id
+
+    for record in parties:
+        table[normalize_party_label(record.id)] = record.id
+        table[normalize_party_label(record.name)] = record.id
+
+    for record, raw in zip(parties, raw_parties):
+        aliases = raw.get("aliases")
+        if isinstance(aliases, list):
+            for alias in aliases:
+                if isinstance(alias, str) and alias.strip():
+                    table[normalize_party_label(alias)] = record.id
+
+    return table
+
+
+def resolve_party_id(label: str, aliases: Dict[str, str], parties: Tuple[PartyRecord, ...]) -> Optional[str]:
+    """
+    候補者の所属政党（略称可）を政党IDに解決
+    対応表に無い場合は、正式名に一意に含まれる略称（例: 「共産」→「日本共産党」）のみ採用する
+    """
+    key = normalize_party_label(label)
+    if not key:
+        return None
+    if key in aliases:
+        return aliases[key]
+    if len(key) < 2:
+        return None
+
+    matches = [record.id for record in parties if key in normalize_party_label(record.name)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def compile_candidates(candidates: Any,
+                       resolve: Optional[Callable[[str], Optional[str]]] = None) -> Tuple[CandidateRecord, ...]:
+    """
+    選挙区の候補者リストを CandidateRecord に変換
+    resolve には所属政党のラベルから政党IDを返す関数を渡す
+    """
+    if not isinstance(candidates, list):
+        return ()
+    records = []
+    for candidate in candidates:
+        if not isinstance(candidate, dict):
+            continue
+        party = str(candidate.get("party", "無所属"))
+        records.append(CandidateRecord(
+            name=str(candidate.get("name", "不明")),
+            party=party,
+            memo=str(candidate.get("memo") or candidate.get("note") or ""),
+            party_id=resolve(party) if resolve is not None else None,
+        ))
+    return tuple(records)
+
+
+def compile_district_areas(raw_areas: Any) -> Mapping[str, Tuple[Tuple[str, str], ...]]:
+    """
+    任意の district_areas（選挙区 → 市区町村の一覧）を正規化
+    市区町村は文字列、または {"name": ..., "reading": ...} のどちらでもよい
+    """
+    if not isinstance(raw_areas, dict):
+        return MappingProxyType({})
+    compiled = {}
+    for district_name, areas in raw_areas.items():
+        if not isinstance(areas, list):
+            continue
+        entries = []
+        for area in areas:
+            if isinstance(area, str) and area:
+                entries.append((area, ""))
+            elif isinstance(area, dict) and area.get("name"):
+                entries.append((str(area["name"]), str(area.get("reading") or "")))
+        compiled[district_name] = tuple(entries)
+    return MappingProxyType(compiled)
+
+
+def compile_election_data(data: Dict[str, Any], version: str = "") -> PolicyStore:
+    """
+    生のJSONデータを PolicyStore にコンパイル
+    ここで一度だけ全体を走査し、以降は索引経由で参照する
+    """
+    raw_parties = data.get("parties", [])
+    if not isinstance(raw_parties, list):
+        raw_parties = []
+    raw_districts = data.get("districts", {})
+    if not isinstance(raw_districts, dict):
+        raw_districts = {}
+
+    raw_parties = [party for party in raw_parties if isinstance(party, dict)]
+    parties = tuple(compile_party(party, i) for i, party in enumerate(raw_parties))
+    dedupe_party_ids(parties)
+    share_texts(parties)
+
+    profession_index, topic_index = build_facet_indexes(parties)
+    aliases = build_party_aliases(parties, raw_parties)
+    resolved: Dict[str, Optional[str]] = {}
+
+    def resolve(label: str) -> Optional[str]:
+        if label not in resolved:
+            resolved[label] = resolve_party_id(label, aliases, parties)
+        return resolved[label]
+
+    districts = {name: compile_candidates(candidates, resolve) for name, candidates in raw_districts.items()}
+
+    return PolicyStore(
+        parties=parties,
+        districts=MappingProxyType(districts),
+        professions=tuple(sorted(profession_index)),
+        topics=tuple(sorted(topic_index)),
+        profession_index=profession_index,
+        topic_index=topic_index,
+        version=version,
+        district_areas=compile_district_areas(data.get("district_areas")),
+        party_aliases=MappingProxyType(aliases),
+    )
+
+
+# 政党のうち、変えると政党IDや候補者の所属政党の対応付けが変わるフィールド
+_PARTY_IDENTITY_FIELDS = ("id", "name", "aliases")
+
+
+def patch_scope(paths: Sequence[Sequence[str]]) -> Optional[Tuple[FrozenSet[int], FrozenSet[str]]]:
+    """
+    JSON Patch で変更されたパスから、作り直す政党（元データの位置）と選挙区の名前を求める
+    政党の追加・削除・並べ替え・ID/名前/略称の変更や、その他の項目（district_areas など）の変更は
+    全体の再構築が必要なため None を返す
+    """
+    party_indexes = set()
+    district_names = set()
+    for tokens in paths:
+        if len(tokens) >= 3 and tokens[0] == "parties" and tokens[1].isdigit() \
+                and tokens[2] not in _PARTY_IDENTITY_FIELDS:
+            party_indexes.add(int(tokens[1]))
+        elif len(tokens) >= 2 and tokens[0] == "districts":
+            district_names.add(tokens[1])
+        else:
+            return None
+    return frozenset(party_indexes), frozenset(district_names)
+
+
+def patch_election_data(store: PolicyStore, data: Dict[str, Any], party_indexes: Collection[int],
+                        district_names: Collection[str], version: str) -> Optional[PolicyStore]:
+    """
+    差分を適用した生データから、変わった政党・選挙区だけを作り直したストアを作る
+    変わっていない政党・選挙区のレコードは元のストアと共有する（元のストアは書き換えない）
+    元のストアとの対応が取れない場合（メモリ保持以外・政党の数や並びが合わない）は None（全体を再構築すること）
+    """
+    raw_parties = data.get("parties")
+    raw_districts = data.get("districts")
+    if store.backend != BACKEND_MEMORY or not isinstance(raw_parties, list) or not isinstance(raw_districts, dict):
+        return None
+    if len(raw_parties) != len(store.parties) or not all(isinstance(party, dict) for party in raw_parties):
+        return None
+
+    parties = list(store.parties)
+    recompiled = []
+    for i in sorted(party_indexes):
+        if i >= len(parties):
+            return None
+        record = compile_party(raw_parties[i], i)
+        # ID・名前は変わっていない（変わる差分は全体の再構築になる）ので、重複除去後のIDを引き継ぐ
+        record.id = parties[i].id
+        parties[i] = record
+        recompiled.append(record)
+    parties = tuple(parties)
+    share_texts(tuple(recompiled))
+
+    profession_index, topic_index = build_facet_indexes(parties)
+    aliases = store.party_aliases
+    resolved: Dict[str, Optional[str]] = {}
+
+    def resolve(label: str) -> Optional[str]:
+        if label not in resolved:
+            resolved[label] = resolve_party_id(label, aliases, parties)
+        return resolved[label]
+
+    districts = dict(store.districts)
+    for name in district_names:
+        if name in raw_districts:
+            districts[name] = compile_candidates(raw_districts[name], resolve)
+        else:
+            districts.pop(name, None)
+
+    return PolicyStore(
+        parties=parties,
+        districts=MappingProxyType(districts),
+        professions=tuple(sorted(profession_index)),
+        topics=tuple(sorted(topic_index)),
+        profession_index=profession_index,
+        topic_index=topic_index,
+        version=version,
+        district_areas=store.district_areas,
+        party_aliases=aliases,
+        # 選挙区の増減が無ければ検索インデックスはそのまま使う
+        district_search=store.district_search if districts.keys() == store.districts.keys() else None,
+    )
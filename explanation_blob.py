@@ -0,0 +1,121 @@
+"""
+解説テキストのブロブ（オフセット表付き）
+長い解説はコンパイル済み成果物（election_data.bin）の末尾にまとめて置き、
+mmap したまま、表示する解説だけをその都度デコードします
+（ストアには政策本文と解説の参照だけを持つため、解説を表示しない限り解説のバイト列には触れない）
+
+解説は文単位で重複を除き（text_table.py）、各解説は文の番号の列として持ちます
+
+形式: 解説の件数・文の件数（uint32 × 2）,
+      各解説の文番号列の開始位置（uint32 × 解説の件数＋1）, 文番号の列（uint32）,
+      各文の開始位置（uint64 × 文の件数＋1、本文の先頭からの相対位置）, UTF-8の本文
+"""
+
+import mmap
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from text_table import StringTable
+
+_COUNTS = struct.Struct("<II")
+_INDEX = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+_INDEX_SPAN = struct.Struct("<II")
+_SPAN = struct.Struct("<QQ")
+
+
+def build_explanation_blob(texts: Sequence[str], table: Optional[StringTable] = None) -> bytes:
+    """
+    解説の列からブロブを作成（i 番目の解説は ExplanationBlob.get(i) で取り出せる）
+    table を渡すと、重複除去の前後のバイト数をそこに数える
+    """
+    table = table if table is not None else StringTable()
+    segment_ids = [table.segment_ids(text) for text in texts]
+
+    starts = [0]
+    for ids in segment_ids:
+        starts.append(starts[-1] + len(ids))
+    encoded = [segment.encode('utf-8') for segment in table.strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    return b"".join([
+        _COUNTS.pack(len(texts), len(encoded)),
+        struct.pack(f"<{len(starts)}I", *starts),
+        struct.pack(f"<{starts[-1]}I", *(i for ids in segment_ids for i in ids)),
+        struct.pack(f"<{len(offsets)}Q", *offsets),
+        *encoded,
+    ])
+
+
+class ExplanationBlob:
+    """
+    ブロブ（mmap またはバイト列の base 以降）から解説を1件ずつ取り出す
+    読み取り専用のため、複数スレッドから同時に使える
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], base: int = 0):
+        if len(buffer) < base + _COUNTS.size:
+            raise ValueError("解説ブロブが不正です")
+        self._buffer = buffer
+        self._count, segment_count = _COUNTS.unpack_from(buffer, base)
+        self._starts = base + _COUNTS.size
+        self._ids = self._starts + (self._count + 1) * _INDEX.size
+        id_count = _INDEX.unpack_from(buffer, self._ids - _INDEX.size)[0] if len(buffer) >= self._ids else 0
+        self._offsets = self._ids + id_count * _INDEX.size
+        self._data = self._offsets + (segment_count + 1) * _OFFSET.size
+        if len(buffer) < self._data:
+            raise ValueError("解説ブロブが不正です")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def segment_ids(self, index: int) -> Tuple[int, ...]:
+        """index 番目の解説の文番号の列"""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        first, last = _INDEX_SPAN.unpack_from(self._buffer, self._starts + index * _INDEX.size)
+        return struct.unpack_from(f"<{last - first}I", self._buffer, self._ids + first * _INDEX.size)
+
+    def encoded_segment(self, segment_id: int) -> bytes:
+        """文1つのUTF-8のバイト列"""
+        start, end = _SPAN.unpack_from(self._buffer, self._offsets + segment_id * _OFFSET.size)
+        return self._buffer[self._data + start:self._data + end]
+
+    def encoded_parts(self, index: int) -> List[bytes]:
+        """index 番目の解説の文ごとのUTF-8のバイト列（デコードせずにハッシュを求める場合に使う）"""
+        return [self.encoded_segment(segment_id) for segment_id in self.segment_ids(index)]
+
+    def get(self, index: int) -> str:
+        """index 番目の解説をデコードして返す（文ごとのバイト列を連結してからデコード）"""
+        return str(b"".join(self.encoded_parts(index)), 'utf-8')
+
+
+class ExplanationRef:
+    """
+    ブロブ内の解説1件への参照（PolicyItem.explanation を参照した時点で読み込む）
+    参照が作られるのは空でない解説だけ
+    """
+    __slots__ = ("blob", "index")
+
+    def __init__(self, blob: ExplanationBlob, index: int):
+        self.blob = blob
+        self.index = index
+
+    def load(self) -> str:
+        return self.blob.get(self.index)
+
+    def encoded_parts(self) -> List[bytes]:
+        return self.blob.encoded_parts(self.index)
+
+    def shared_segments(self, decoded: Dict[Tuple["ExplanationBlob", int], str]) -> List[str]:
+        """文ごとにデコードした列（decoded にデコード済みの文を溜め、同じ文は1回だけデコードする）"""
+        segments = []
+        for segment_id in self.blob.segment_ids(self.index):
+            key = (self.blob, segment_id)
+            segment = decoded.get(key)
+            if segment is None:
+                segment = decoded[key] = str(self.blob.encoded_segment(segment_id), 'utf-8')
+            segments.append(segment)
+        return segments
@@ -0,0 +1,127 @@
+"""
+描画済みHTML断片のプロセス共有キャッシュ
+（政党ID, 選択内容, 解説フラグ, 政党のレコードのバージョン）をキーに、サイズ上限付きLRUで保持します
+選挙区・政党ごとのパネルHTMLの集合は、データバージョンごとに VersionedPanels で保持します
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+
+def normalize_selection(items: Iterable[str]) -> Tuple[str, ...]:
+    """選択項目を重複なし・ソート済みのタプルに正規化（キャッシュキーと表示順を一致させる）"""
+    return tuple(sorted(set(items)))
+
+
+class FragmentCache:
+    """
+    バイト数で上限を管理するスレッドセーフなLRUキャッシュ
+    全セッション（スクリプト実行スレッド）から共有される
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        """キャッシュにあれば返し、なければ描画して保存する"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # 描画はロック外で行う（同時ミス時の二重描画は許容）
+        html = render()
+        self.put(key, html)
+        return html
+
+    def put(self, key: Hashable, html: str):
+        """断片を保存し、上限を超えた分を古い順に破棄"""
+        size = sys.getsizeof(html)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (html, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """全エントリを破棄（カウンターは維持）"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """キーが条件に合うエントリだけを破棄し、破棄した数を返す（差し替えで内容が変わった政党のカードなど）"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self.current_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス・破棄数などの統計"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class VersionedPanels:
+    """
+    データバージョンごとのパネルHTMLの集合（選挙区名・政党ID → HTML）の上限付きLRU（スレッドセーフ）
+    差し替えで公開されたバージョンは、直前のバージョンの集合が残っていればそれを引き継いで変更分だけ描画し直す
+    """
+
+    def __init__(self, max_versions: int = 4):
+        self.max_versions = max(1, max_versions)
+        self._entries: "OrderedDict[str, Mapping[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: str, build: Callable[[Optional[Mapping[str, str]]], Mapping[str, str]],
+            base_version: Optional[str] = None) -> Mapping[str, str]:
+        """
+        version の集合を返す（無ければ build で作る）
+        build には base_version の集合（無ければ None。その場合は全体を描画すること）を渡す
+        """
+        with self._lock:
+            panels = self._entries.get(version)
+            if panels is not None:
+                self._entries.move_to_end(version)
+                return panels
+            previous = self._entries.get(base_version) if base_version is not None else None
+
+        # 描画はロック外で行う（同時ミス時の二重描画は許容）
+        panels = build(previous)
+        with self._lock:
+            self._entries[version] = panels
+            while len(self._entries) > self.max_versions:
+                self._entries.popitem(last=False)
+        return panels
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
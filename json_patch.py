@@ -0,0 +1,171 @@
+"""
+JSON Patch（RFC 6902）の適用
+差分ファイル（election_data.inbox/*.json）の操作を、元の文書を書き換えずに適用します
+変更する経路上の配列・辞書だけを複製し、それ以外の部分は元の文書と共有するため、
+適用中に失敗しても元の文書はそのまま残り、適用前の文書を読んでいる側にも影響しません
+
+差分ファイル:
+    [
+        {"op": "replace", "path": "/districts/千葉8区/0/memo", "value": "現職・3期目"},
+        {"op": "add", "path": "/parties/2/general_policies/子育て", "value": "..."},
+        {"op": "remove", "path": "/districts/千葉8区/2"}
+    ]
+
+op は add・remove・replace・move・copy・test に対応します（test が一致しなければ、その差分ファイル全体を適用しない）
+"""
+
+import copy
+from typing import Any, List, Sequence, Tuple
+
+
+class JsonPatchError(ValueError):
+    """差分を適用できない（形式の誤り・存在しないパス・test の不一致）"""
+
+
+def parse_pointer(pointer: Any) -> List[str]:
+    """JSON Pointer（RFC 6901）をトークンの列に分解（"" は文書全体）"""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"パスが文字列ではありません: {pointer!r}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"パスは / で始めてください: {pointer}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, pointer: str, allow_end: bool = False) -> int:
+    """配列の位置（add では末尾の次 "-"・len も可）"""
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"配列の位置が正しくありません: {pointer}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"配列の範囲外です: {pointer}")
+    return index
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """
+    test 操作の比較（型も一致すること。Python の == と違い、1 と true・1 と 1.0 は一致しない）
+    配列は同じ順・同じ長さ、オブジェクトは同じキーの集合で、要素ごとに再帰的に比べる
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_json_equal(value, b[key]) for key, value in a.items())
+    return a == b
+
+
+class _Patcher:
+    """1つの差分ファイルの適用（複製した配列・辞書は同じ差分の中では複製し直さない）"""
+
+    def __init__(self, document: Any):
+        self.root = document
+        self._owned = set()
+
+    def _own(self, container):
+        if id(container) in self._owned:
+            return container
+        container = list(container) if isinstance(container, list) else dict(container)
+        self._owned.add(id(container))
+        return container
+
+    def _child(self, node: Any, token: str, pointer: str):
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"パスが存在しません: {pointer}")
+            return token
+        if isinstance(node, list):
+            return _list_index(node, token, pointer)
+        raise JsonPatchError(f"パスが存在しません: {pointer}")
+
+    def get(self, tokens: Sequence[str], pointer: str) -> Any:
+        node = self.root
+        for token in tokens:
+            node = node[self._child(node, token, pointer)]
+        return node
+
+    def _parent(self, tokens: Sequence[str], pointer: str):
+        """変更する値の親（根からの経路を複製して付け替えたもの）"""
+        if not isinstance(self.root, (dict, list)):
+            raise JsonPatchError(f"パスが存在しません: {pointer}")
+        self.root = node = self._own(self.root)
+        for token in tokens[:-1]:
+            key = self._child(node, token, pointer)
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise JsonPatchError(f"パスが存在しません: {pointer}")
+            node[key] = node = self._own(child)
+        return node
+
+    def add(self, tokens: Sequence[str], value: Any, pointer: str):
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens, pointer)
+        if isinstance(parent, list):
+            parent.insert(_list_index(parent, tokens[-1], pointer, allow_end=True), value)
+        else:
+            parent[tokens[-1]] = value
+
+    def remove(self, tokens: Sequence[str], pointer: str) -> Any:
+        if not tokens:
+            raise JsonPatchError("文書全体は削除できません")
+        parent = self._parent(tokens, pointer)
+        return parent.pop(self._child(parent, tokens[-1], pointer))
+
+    def replace(self, tokens: Sequence[str], value: Any, pointer: str):
+        if not tokens:
+            self.root = value
+            return
+        parent = self._parent(tokens, pointer)
+        parent[self._child(parent, tokens[-1], pointer)] = value
+
+
+def apply_patch(document: Any, operations: Any) -> Tuple[Any, List[List[str]]]:
+    """
+    差分を適用した新しい文書と、変更されたパス（トークンの列。move は移動元も含む）を返す
+    元の文書は書き換えない。1つでも適用できない操作があれば JsonPatchError を送出する
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("差分は操作の配列にしてください")
+
+    patcher = _Patcher(document)
+    changed: List[List[str]] = []
+    for i, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise JsonPatchError(f"{i}番目の操作がオブジェクトではありません")
+        op = operation.get("op")
+        pointer = operation.get("path")
+        tokens = parse_pointer(pointer)
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"{i}番目の操作（{op}）に value がありません")
+        if op == "add":
+            patcher.add(tokens, operation["value"], pointer)
+        elif op == "remove":
+            patcher.remove(tokens, pointer)
+        elif op == "replace":
+            patcher.replace(tokens, operation["value"], pointer)
+        elif op in ("move", "copy"):
+            source = operation.get("from")
+            source_tokens = parse_pointer(source)
+            if op == "move":
+                if tokens[:len(source_tokens)] == source_tokens and tokens != source_tokens:
+                    raise JsonPatchError(f"移動先が移動元の内側です: {source} → {pointer}")
+                value = patcher.remove(source_tokens, source)
+                changed.append(source_tokens)
+            else:
+                value = copy.deepcopy(patcher.get(source_tokens, source))
+            patcher.add(tokens, value, pointer)
+        elif op == "test":
+            if not _json_equal(patcher.get(tokens, pointer), operation["value"]):
+                raise JsonPatchError(f"test が一致しません: {pointer}")
+            continue
+        else:
+            raise JsonPatchError(f"{i}番目の操作の op が正しくありません: {op!r}")
+        changed.append(tokens)
+    return patcher.root, changed
@@ -0,0 +1,161 @@
+"""
+JSONの逐次読み込み
+トップレベルのオブジェクトを先頭から一度だけ解析し、指定したキーの配列・辞書は要素1件ずつ返します
+（ファイル全体を読み込まないため、メモリ使用量は最も大きい要素1件ぶん＋読み込みバッファ程度に収まる）
+
+イベント（kind, key, name, value）:
+    ("member", key, None, value)  … 逐次読み込みしないメンバー（値全体）
+    ("start", key, None, [] / {}) … 逐次読み込みする配列・辞書の開始（空の値で型を示す）
+    ("item", key, name, value)    … 要素1件（name は配列なら位置、辞書ならキー）
+    ("end", key, None, None)      … 配列・辞書の終了
+
+sources=True を指定すると、各イベントの末尾に要素の元のテキスト（"item" 以外は None）を加えた
+(kind, key, name, value, source) を返します（要素ごとの内容ハッシュを、解析し直さずに計算するため）
+"""
+
+import json
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamError(ValueError):
+    """構文エラー（行番号はファイル全体での位置）"""
+
+    def __init__(self, msg: str, lineno: int):
+        super().__init__(f"{msg}: line {lineno}")
+        self.msg = msg
+        self.lineno = lineno
+
+
+class _Reader:
+    """読み込みバッファ（解析済みの部分は捨て、捨てた行数を数えておく）"""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.start = 0
+        self._lines_before = 0
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self._f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # 解析済みの部分を捨ててから継ぎ足す
+        self._lines_before += self.buf.count("\n", 0, self.pos)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, msg: str, pos: int) -> JsonStreamError:
+        return JsonStreamError(msg, self._lines_before + self.buf.count("\n", 0, pos) + 1)
+
+    def peek(self) -> str:
+        """空白を読み飛ばして次の1文字を返す（終端なら空文字）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'", self.pos)
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """値を1つ解析する（途中で切れている場合は読み足して解析し直す。解析した範囲は start・pos）"""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # 読み足す量を倍々にして、大きな要素でも解析し直しの回数を抑える
+                if self._fill(size):
+                    size *= 2
+                    continue
+                raise self.error(e.msg, e.pos) from None
+            # 数値・リテラルがバッファの末尾で切れている可能性があるため、続きがあれば読み足して確かめる
+            if end == len(self.buf) and not isinstance(value, (dict, list, str)) and self._fill(size):
+                continue
+            self.start = self.pos
+            self.pos = end
+            return value
+
+
+def iter_events(f: TextIO, streamed: Iterable[str] = (), chunk_size: int = DEFAULT_CHUNK_SIZE,
+                sources: bool = False) -> Iterator[Tuple[Any, ...]]:
+    """
+    トップレベルのオブジェクトのメンバーを先頭から順にイベントとして返す
+    streamed に含まれるキーの値が配列・辞書なら、要素ごとに ("item", ...) を返す
+    sources が真なら、イベントの末尾に "item" の要素の元のテキストを加える
+    """
+    tail: Tuple[Any, ...] = (None,) if sources else ()
+    streamed = frozenset(streamed)
+    reader = _Reader(f, chunk_size)
+    decoder = json.JSONDecoder()
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            if reader.peek() != '"':
+                raise reader.error("Expecting property name enclosed in double quotes", reader.pos)
+            key = reader.value(decoder)
+            reader.expect(":")
+            opener = reader.peek()
+
+            if key in streamed and opener in ("[", "{"):
+                reader.pos += 1
+                yield ("start", key, None, [] if opener == "[" else {}) + tail
+                closer = "]" if opener == "[" else "}"
+                index = 0
+                if reader.peek() == closer:
+                    reader.pos += 1
+                else:
+                    while True:
+                        if opener == "[":
+                            name: Any = index
+                        else:
+                            if reader.peek() != '"':
+                                raise reader.error("Expecting property name enclosed in double quotes", reader.pos)
+                            name = reader.value(decoder)
+                            reader.expect(":")
+                        value = reader.value(decoder)
+                        if sources:
+                            yield ("item", key, name, value, reader.buf[reader.start:reader.pos])
+                        else:
+                            yield ("item", key, name, value)
+                        index += 1
+                        separator = reader.peek()
+                        reader.pos += 1
+                        if separator == closer:
+                            break
+                        if separator != ",":
+                            raise reader.error("Expecting ',' delimiter", reader.pos - 1)
+                yield ("end", key, None, None) + tail
+            else:
+                yield ("member", key, None, reader.value(decoder)) + tail
+
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise reader.error("Expecting ',' delimiter", reader.pos - 1)
+
+    if reader.peek():
+        raise reader.error("Extra data", reader.pos)
@@ -0,0 +1,96 @@
+"""
+政党×政策項目の比較表
+全職種・全トピック × 全政党の政策テキストと「記載あり」フラグを、データバージョンごとに1回だけ
+NumPy配列として構築し、再実行ごとは選択された行を取り出して pandas.DataFrame にするだけにします
+（st.dataframe 1つで表示できるため、政党数×項目数ぶんの st.markdown 呼び出しが不要）
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from election_store import PartyRecord, PolicyStore
+from policy_search import KIND_GENERAL, KIND_PERSONALIZED
+
+
+COVERAGE_COLUMN = "記載あり"
+
+# 複数項目の政策を1つのセルにまとめるときの区切り
+ITEM_SEPARATOR = " ／ "
+
+
+def _personalized_text(party: PartyRecord, profession: str):
+    items = party.personalized.get(profession) if party.personalized is not None else None
+    if not items:
+        return None
+    return ITEM_SEPARATOR.join(item.text for item in items)
+
+
+def _general_text(party: PartyRecord, topic: str):
+    item = party.general.get(topic) if party.general is not None else None
+    return item.text if item is not None else None
+
+
+def _party_labels(parties: Sequence[PartyRecord]) -> Tuple[str, ...]:
+    """列名（政党名が重複する場合は政党IDを付けて区別する）"""
+    counts: Dict[str, int] = {}
+    for party in parties:
+        counts[party.name] = counts.get(party.name, 0) + 1
+    return tuple(party.name if counts[party.name] == 1 else f"{party.name}（{party.id}）" for party in parties)
+
+
+class PolicyMatrix:
+    """
+    行 = 全職種＋全トピック、列 = 全政党の比較表
+    texts は政策テキスト（記載が無いセルは None）、coverage は記載の有無
+    """
+    __slots__ = ("row_labels", "row_index", "party_labels", "texts", "coverage", "row_coverage")
+
+    def __init__(self, row_keys: Sequence[Tuple[str, str]], row_labels: Sequence[str],
+                 party_labels: Sequence[str], texts: np.ndarray):
+        self.row_labels = np.array(row_labels, dtype=object)
+        # (種類, 職種名またはトピック名) → 行番号
+        self.row_index = {key: i for i, key in enumerate(row_keys)}
+        self.party_labels = pd.Index(party_labels)
+        self.texts = texts
+        self.coverage = np.not_equal(texts, None)
+        # 行ごとの記載のある政党数
+        self.row_coverage = self.coverage.sum(axis=1)
+
+    @classmethod
+    def from_store(cls, store: PolicyStore) -> "PolicyMatrix":
+        parties = store.parties
+        row_keys = ([(KIND_PERSONALIZED, p) for p in store.professions]
+                    + [(KIND_GENERAL, t) for t in store.topics])
+        row_labels = [f"🏥 {p}" for p in store.professions] + [f"📋 {t}" for t in store.topics]
+
+        texts = np.full((len(row_keys), len(parties)), None, dtype=object)
+        for i, profession in enumerate(store.professions):
+            for j in store.profession_index.get(profession, ()):
+                texts[i, j] = _personalized_text(parties[j], profession)
+        offset = len(store.professions)
+        for i, topic in enumerate(store.topics):
+            for j in store.topic_index.get(topic, ()):
+                texts[offset + i, j] = _general_text(parties[j], topic)
+        return cls(row_keys, row_labels, _party_labels(parties), texts)
+
+    @property
+    def party_count(self) -> int:
+        return len(self.party_labels)
+
+    def rows_for(self, professions: Sequence[str], topics: Sequence[str]) -> np.ndarray:
+        """選択された職種・トピックの行番号（データに無い項目は除く）"""
+        keys = [(KIND_PERSONALIZED, p) for p in professions] + [(KIND_GENERAL, t) for t in topics]
+        return np.array([self.row_index[key] for key in keys if key in self.row_index], dtype=np.intp)
+
+    def missing_count(self, rows: np.ndarray) -> int:
+        """選択範囲のうち記載の無いセルの数"""
+        return int(rows.size * self.party_count - self.row_coverage[rows].sum())
+
+    def frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """選択された行の DataFrame（先頭列は記載のある政党数、記載の無いセルは None）"""
+        df = pd.DataFrame(self.texts[rows], index=pd.Index(self.row_labels[rows], name="項目"),
+                          columns=self.party_labels)
+        df.insert(0, COVERAGE_COLUMN, self.row_coverage[rows])
+        return df
@@ -0,0 +1,213 @@
+"""
+政策・解説の全文検索
+文字バイグラムの転置インデックスをデータバージョンごとに1回だけ構築し、
+キーワード（例: 奨学金、タスクシフト、消費税）を含む政策・解説を探します
+"""
+
+import unicodedata
+from html import escape
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Sequence, Tuple
+
+from election_store import PolicyItem, PolicyStore
+
+
+KIND_PERSONALIZED = "personalized"
+KIND_GENERAL = "general"
+FIELD_POLICY = "policy"
+FIELD_EXPLANATION = "explanation"
+
+# スニペットとして一致箇所の前後に表示する文字数
+SNIPPET_CONTEXT = 30
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(ord("ァ"), ord("ヶ") + 1)}
+
+
+def normalize_for_search(text: str) -> str:
+    """
+    検索用の正規化（全角半角の統一・小文字化・カタカナ→ひらがな）
+    スニペット位置を元の文字列と対応させるため、1文字ずつ変換して長さを変えない
+    """
+    chars = []
+    for ch in text:
+        normalized = unicodedata.normalize("NFKC", ch).lower()
+        chars.append(normalized if len(normalized) == 1 else ch)
+    return "".join(chars).translate(_KATAKANA_TO_HIRAGANA)
+
+
+def ngrams(text: str) -> set:
+    """1文字と2文字のn-gram（1文字の検索語にも対応するため）"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class PolicyDocument(NamedTuple):
+    """
+    検索対象の1文書（政策1項目の本文または解説）
+    本文・解説の文字列は持たず、政策項目への参照だけを持つ（解説は text を参照した時点で読み込む）
+    """
+    party_id: str
+    party_name: str
+    kind: str
+    key: str
+    field: str
+    item: PolicyItem
+
+    @property
+    def text(self) -> str:
+        """検索・表示用のテキスト（**太字** 記法は除去）"""
+        text = self.item.text if self.field == FIELD_POLICY else self.item.explanation
+        return text.replace("**", "")
+
+    def segments(self, decoded: Dict) -> Sequence[str]:
+        """インデックス構築用に、共有の文の列のまま返す（decoded は PolicyItem.explanation_segments を参照）"""
+        return (self.item.text,) if self.field == FIELD_POLICY else self.item.explanation_segments(decoded)
+
+
+class SearchHit(NamedTuple):
+    """検索結果1件"""
+    document: PolicyDocument
+    count: int
+    snippet_html: str
+
+
+def collect_documents(store: PolicyStore) -> List[PolicyDocument]:
+    """ストアの全政党から検索対象の文書を集める（解説の無い項目は政策本文だけ）"""
+    documents = []
+    for party in store.parties:
+        for profession, items in (party.personalized or {}).items():
+            for item in items:
+                documents.append(PolicyDocument(party.id, party.name, KIND_PERSONALIZED, profession,
+                                                FIELD_POLICY, item))
+                if item.has_explanation:
+                    documents.append(PolicyDocument(party.id, party.name, KIND_PERSONALIZED, profession,
+                                                    FIELD_EXPLANATION, item))
+        for topic, item in (party.general or {}).items():
+            documents.append(PolicyDocument(party.id, party.name, KIND_GENERAL, topic, FIELD_POLICY, item))
+            if item.has_explanation:
+                documents.append(PolicyDocument(party.id, party.name, KIND_GENERAL, topic,
+                                                FIELD_EXPLANATION, item))
+    return documents
+
+
+def render_snippet(text: str, normalized: str, terms: Sequence[str]) -> str:
+    """最初の一致箇所の前後を切り出し、検索語を <mark> で強調したHTML"""
+    first = min((normalized.find(term) for term in terms if term in normalized), default=0)
+    start = max(0, first - SNIPPET_CONTEXT)
+    end = min(len(text), first + max(len(t) for t in terms) + SNIPPET_CONTEXT)
+
+    # 強調する範囲（重なりは結合）
+    window = normalized[start:end]
+    spans: List[Tuple[int, int]] = []
+    for term in terms:
+        pos = window.find(term)
+        while pos != -1:
+            spans.append((pos, pos + len(term)))
+            pos = window.find(term, pos + 1)
+    spans.sort()
+
+    parts = ["…" if start > 0 else ""]
+    cursor = 0
+    for span_start, span_end in spans:
+        if span_start < cursor:
+            span_start = cursor
+        if span_start >= span_end:
+            continue
+        parts.append(escape(text[start + cursor:start + span_start]))
+        parts.append(f"<mark>{escape(text[start + span_start:start + span_end])}</mark>")
+        cursor = span_end
+    parts.append(escape(text[start + cursor:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
+
+
+class PolicySearchIndex:
+    """
+    文字バイグラム（＋1文字）の転置インデックス
+    検索語のn-gramの転置リストを積集合で絞り込み、最後に部分文字列として確認する
+    インデックスは転置リストだけを持ち、テキストは確認・スニペットの対象になった文書だけその都度読み込む
+    構築時は共有の文ごとに1回だけ正規化し（文書ごとの正規化済みの文字列は作らない）、
+    文どうしの境目のバイグラムを補って、文書全体を正規化した場合と同じn-gramにする
+    """
+
+    def __init__(self, documents: Sequence[PolicyDocument]):
+        self.documents = tuple(documents)
+
+        postings: Dict[str, List[int]] = {}
+        # 文 → (正規化後の先頭の文字, 末尾の文字, n-gram)。構築が終われば破棄する
+        segment_grams: Dict[str, Tuple[str, str, FrozenSet[str]]] = {}
+        decoded: Dict = {}
+        for doc_id, document in enumerate(self.documents):
+            grams = set()
+            last = ""
+            for segment in document.segments(decoded):
+                entry = segment_grams.get(segment)
+                if entry is None:
+                    normalized = normalize_for_search(segment.replace("**", ""))
+                    entry = segment_grams[segment] = (normalized[:1], normalized[-1:], frozenset(ngrams(normalized)))
+                first, end, segment_ngrams = entry
+                if not first:
+                    continue
+                grams.update(segment_ngrams)
+                if last:
+                    grams.add(last + first)
+                last = end
+            for gram in grams:
+                postings.setdefault(gram, []).append(doc_id)
+        self._postings: Mapping[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    @classmethod
+    def from_store(cls, store: PolicyStore) -> "PolicySearchIndex":
+        return cls(collect_documents(store))
+
+    def _candidates(self, term: str) -> List[int]:
+        grams = [term] if len(term) == 1 else [term[i:i + 2] for i in range(len(term) - 1)]
+        lists = sorted((self._postings.get(gram, ()) for gram in set(grams)), key=len)
+        if not lists or not lists[0]:
+            return []
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return sorted(result)
+
+    def search(self, query: str, limit: int = 30) -> List[SearchHit]:
+        """
+        空白区切りの全キーワードを含む文書を返す
+        政策本文の一致を解説より優先し、出現回数の多い順に並べる
+        """
+        terms = [term for term in normalize_for_search(query).split() if term]
+        if not terms:
+            return []
+
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._candidates(term)
+            if candidates is None:
+                candidates = ids
+            else:
+                id_set = set(ids)
+                candidates = [i for i in candidates if i in id_set]
+            if not candidates:
+                return []
+
+        scored = []
+        for doc_id in candidates:
+            document = self.documents[doc_id]
+            text = document.text
+            normalized = normalize_for_search(text)
+            if not all(term in normalized for term in terms):
+                continue
+            count = sum(normalized.count(term) for term in terms)
+            scored.append((document.field != FIELD_POLICY, -count, doc_id, count, text, normalized))
+
+        scored.sort(key=lambda entry: entry[:3])
+        return [
+            SearchHit(
+                document=self.documents[doc_id],
+                count=count,
+                snippet_html=render_snippet(text, normalized, terms),
+            )
+            for _, _, doc_id, count, text, normalized in scored[:limit]
+        ]
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+郵便番号・市区町村名 → 選挙区の解決
+同梱のCSV（postal_districts.csv）からソート済みのバイナリ表を作成し、
+mmap したまま二分探索で引きます（12万行規模でもプロセスごとに辞書を持たないため）
+
+表は検証・デプロイ時（validate_data.py または下記のコマンド）に作成し、アプリは読み込むだけです
+表が無い・CSVより古い・1件も登録が無い場合、郵便番号・市区町村検索は無効になります
+（同梱のCSVはヘッダー行だけのため、対応表を用意するまでは無効）
+
+使い方:
+    python postal_resolver.py [CSVファイル] [出力ファイル]
+"""
+
+import csv
+import logging
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = Path(__file__).parent / "postal_districts.csv"
+TABLE_PATH = Path(__file__).parent / "postal_districts.bin"
+
+# ヘッダー: マジック, 選挙区数, 郵便番号レコード数, 市区町村レコード数
+MAGIC = b"EPC1"
+_HEADER = struct.Struct("<4sIII")
+# 選挙区: (文字列オフセット, バイト長)
+_DISTRICT = struct.Struct("<IH")
+# 郵便番号: (7桁の番号, 選挙区ID)
+_POSTAL = struct.Struct("<IH")
+# 市区町村: (文字列オフセット, バイト長, 選挙区ID)
+_MUNICIPALITY = struct.Struct("<IHH")
+
+
+def normalize_postal_code(value: str) -> Optional[int]:
+    """「〒277-0005」「２７７００５」等を7桁の整数に変換（不正なら None）"""
+    digits = "".join(ch for ch in unicodedata.normalize("NFKC", value) if ch.isdigit())
+    if len(digits) != 7:
+        return None
+    return int(digits)
+
+
+def normalize_municipality(value: str) -> str:
+    """市区町村名の表記ゆれ（全角半角・空白）を正規化"""
+    return "".join(unicodedata.normalize("NFKC", value).split())
+
+
+def build_postal_table(csv_path: Path = CSV_PATH, out_path: Path = TABLE_PATH) -> int:
+    """
+    CSV（郵便番号, 市区町村, 選挙区）からバイナリ表を作成し、レコード数を返す
+    1つの郵便番号・市区町村が複数の選挙区にまたがる場合は複数行で表す
+    """
+    district_ids: Dict[str, int] = {}
+    postal_rows = set()
+    municipality_rows = set()
+
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            district = (row.get("district") or "").strip()
+            if not district:
+                continue
+            district_id = district_ids.setdefault(district, len(district_ids))
+
+            code = normalize_postal_code(row.get("postal_code") or "")
+            if code is not None:
+                postal_rows.add((code, district_id))
+
+            municipality = normalize_municipality(row.get("municipality") or "")
+            if municipality:
+                municipality_rows.add((municipality.encode('utf-8'), district_id))
+
+    # 文字列はまとめて末尾のブロブに置く
+    blob = bytearray()
+    offsets: Dict[bytes, int] = {}
+
+    def intern(value: bytes) -> Tuple[int, int]:
+        if value not in offsets:
+            offsets[value] = len(blob)
+            blob.extend(value)
+        return offsets[value], len(value)
+
+    districts_by_id = sorted(district_ids, key=district_ids.get)
+    district_section = b"".join(_DISTRICT.pack(*intern(name.encode('utf-8'))) for name in districts_by_id)
+    postal_section = b"".join(_POSTAL.pack(code, district_id) for code, district_id in sorted(postal_rows))
+    municipality_section = b"".join(
+        _MUNICIPALITY.pack(*intern(name), district_id)
+        for name, district_id in sorted(municipality_rows)
+    )
+
+    header = _HEADER.pack(MAGIC, len(districts_by_id), len(postal_rows), len(municipality_rows))
+    # 一時ファイル名にプロセスIDを含め、同時に作成しても互いの書きかけを差し替えないようにする
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(header + district_section + postal_section + municipality_section + bytes(blob))
+    tmp_path.replace(out_path)
+    return len(postal_rows) + len(municipality_rows)
+
+
+class PostalResolver:
+    """
+    バイナリ表を mmap して郵便番号・市区町村名から選挙区を引く
+    表はOSのページキャッシュで全プロセスに共有される
+    """
+
+    def __init__(self, table_path: Path = TABLE_PATH):
+        self.table_path = table_path
+        self._file = open(table_path, 'rb')
+        size = self._file.seek(0, 2)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"郵便番号テーブルが不正です: {table_path}")
+        magic, self._n_districts, self._n_postal, self._n_municipality = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"郵便番号テーブルの形式が違います: {table_path}")
+
+        self._district_base = _HEADER.size
+        self._postal_base = self._district_base + self._n_districts * _DISTRICT.size
+        self._municipality_base = self._postal_base + self._n_postal * _POSTAL.size
+        self._blob_base = self._municipality_base + self._n_municipality * _MUNICIPALITY.size
+
+    def __len__(self) -> int:
+        return self._n_postal + self._n_municipality
+
+    @property
+    def has_postal_codes(self) -> bool:
+        return self._n_postal > 0
+
+    @property
+    def has_municipalities(self) -> bool:
+        return self._n_municipality > 0
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._blob_base + offset
+        return bytes(self._mm[start:start + length])
+
+    def _district_name(self, district_id: int) -> str:
+        offset, length = _DISTRICT.unpack_from(self._mm, self._district_base + district_id * _DISTRICT.size)
+        return self._string(offset, length).decode('utf-8')
+
+    def districts_for_postal(self, postal_code: str) -> List[str]:
+        """郵便番号（ハイフン・全角可）に対応する選挙区"""
+        code = normalize_postal_code(postal_code)
+        if code is None:
+            return []
+
+        lo, hi = 0, self._n_postal
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _POSTAL.unpack_from(self._mm, self._postal_base + mid * _POSTAL.size)[0] < code:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        results = []
+        for pos in range(lo, self._n_postal):
+            found, district_id = _POSTAL.unpack_from(self._mm, self._postal_base + pos * _POSTAL.size)
+            if found != code:
+                break
+            results.append(self._district_name(district_id))
+        return results
+
+    def districts_for_municipality(self, municipality: str) -> List[str]:
+        """市区町村名（完全一致）に対応する選挙区"""
+        key = normalize_municipality(municipality).encode('utf-8')
+        if not key:
+            return []
+
+        def name_at(pos: int) -> Tuple[bytes, int]:
+            offset, length, district_id = _MUNICIPALITY.unpack_from(
+                self._mm, self._municipality_base + pos * _MUNICIPALITY.size)
+            return self._string(offset, length), district_id
+
+        lo, hi = 0, self._n_municipality
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if name_at(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        results = []
+        for pos in range(lo, self._n_municipality):
+            name, district_id = name_at(pos)
+            if name != key:
+                break
+            results.append(self._district_name(district_id))
+        return results
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+
+def postal_table_is_stale(csv_path: Path = CSV_PATH, table_path: Path = TABLE_PATH) -> bool:
+    """バイナリ表が無い、またはCSVの方が新しい（CSVが無い場合は False）"""
+    if not csv_path.exists():
+        return False
+    return not table_path.exists() or table_path.stat().st_mtime < csv_path.stat().st_mtime
+
+
+def load_postal_resolver(csv_path: Path = CSV_PATH, table_path: Path = TABLE_PATH) -> Optional[PostalResolver]:
+    """
+    作成済みのバイナリ表を開く（アプリからは作成しない。複数のプロセスが同時に作り直さないように）
+    表が無い・CSVより古い・1件も登録が無い場合は None（郵便番号・市区町村検索を無効にする）
+    """
+    if not table_path.exists():
+        return None
+    if postal_table_is_stale(csv_path, table_path):
+        logger.warning("%s が %s より古いため、郵便番号・市区町村検索を無効にします"
+                       "（python postal_resolver.py で作り直してください）", table_path.name, csv_path.name)
+        return None
+    resolver = PostalResolver(table_path)
+    if len(resolver) == 0:
+        resolver.close()
+        return None
+    return resolver
+
+
+def main():
+    """CSVからバイナリ表を作成"""
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else CSV_PATH
+    out_path = Path(sys.argv[2]) if len(sys.argv) > 2 else TABLE_PATH
+
+    if not csv_path.exists():
+        print(f"❌ ファイルが見つかりません: {csv_path}")
+        sys.exit(1)
+
+    count = build_postal_table(csv_path, out_path)
+    print(f"✅ {out_path} を作成しました（{count}件, {out_path.stat().st_size:,} バイト）")
+    if count == 0:
+        print(f"ℹ️  {csv_path.name} に登録が無いため、郵便番号・市区町村検索は無効のままです")
+
+
+if __name__ == "__main__":
+    main()
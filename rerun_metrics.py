@@ -0,0 +1,198 @@
+"""
+再実行ごとの計測（main() の各段階の所要時間、st.markdown の呼び出し回数・送信バイト数）
+段階は phase(名前) で区切り、次の phase() または finish() までの時間をその段階の時間とします
+集計はプロセス単位で行い、Prometheus のテキスト形式でファイルまたはHTTPで公開します
+
+計測しない再実行では NULL_METRICS（何もしない実装）を使うため、無効時のコストは
+メソッド呼び出し1回ぶんだけです
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# 所要時間のヒストグラムの区切り（秒）
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRIC_PREFIX = "election_app"
+
+
+class RerunMetrics:
+    """1回の再実行の計測値（スクリプト実行スレッドからのみ使う）"""
+    enabled = True
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.markdown_calls = 0
+        self.html_bytes = 0
+        self._start = time.perf_counter()
+        self._phase: Optional[str] = None
+        self._phase_start = self._start
+        self.total_seconds = 0.0
+
+    def phase(self, name: Optional[str]):
+        """直前の段階を閉じて、新しい段階を始める（None なら閉じるだけ）"""
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.spans.append((self._phase, now - self._phase_start))
+        self._phase = name
+        self._phase_start = now
+
+    def count_markdown(self, body: str):
+        self.markdown_calls += 1
+        self.html_bytes += len(body.encode('utf-8'))
+
+    def finish(self) -> "RerunMetrics":
+        self.phase(None)
+        self.total_seconds = time.perf_counter() - self._start
+        return self
+
+    def phase_seconds(self) -> Dict[str, float]:
+        """段階ごとの合計時間（記録順）"""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+class _NullMetrics:
+    """計測しない再実行用（何も記録しない）"""
+    enabled = False
+
+    def phase(self, name: Optional[str]):
+        pass
+
+    def count_markdown(self, body: str):
+        pass
+
+    def finish(self) -> "_NullMetrics":
+        return self
+
+
+NULL_METRICS = _NullMetrics()
+
+
+class _Histogram:
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.total += value
+        self.count += 1
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    プロセス内の全セッションの計測値を集計する（スレッドセーフ）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = 0
+        self.markdown_calls = 0
+        self.html_bytes = 0
+        self._rerun_seconds = _Histogram()
+        self._phase_seconds: Dict[str, _Histogram] = {}
+        self._last_write = 0.0
+
+    def record(self, metrics: RerunMetrics):
+        with self._lock:
+            self.reruns += 1
+            self.markdown_calls += metrics.markdown_calls
+            self.html_bytes += metrics.html_bytes
+            self._rerun_seconds.observe(metrics.total_seconds)
+            for name, seconds in metrics.phase_seconds().items():
+                self._phase_seconds.setdefault(name, _Histogram()).observe(seconds)
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus のテキスト形式（gauges は追加で出力する値: 名前 → 値）"""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: List[Tuple[Dict[str, str], _Histogram]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                for bound, count in zip(DURATION_BUCKETS, hist.buckets):
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': repr(bound)})} {count}")
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {hist.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {hist.total:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+        def counter(name: str, help_text: str, value: int):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        with self._lock:
+            counter(f"{METRIC_PREFIX}_reruns_total", "Completed script reruns.", self.reruns)
+            counter(f"{METRIC_PREFIX}_markdown_calls_total", "st.markdown calls.", self.markdown_calls)
+            counter(f"{METRIC_PREFIX}_html_bytes_total", "UTF-8 bytes sent through st.markdown.", self.html_bytes)
+            histogram(f"{METRIC_PREFIX}_rerun_seconds", "Wall time of one rerun of main().",
+                      [({}, self._rerun_seconds)])
+            histogram(f"{METRIC_PREFIX}_phase_seconds", "Wall time per phase of main().",
+                      [({"phase": name}, hist) for name, hist in sorted(self._phase_seconds.items())])
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path, gauges: Optional[Dict[str, float]] = None, min_interval: float = 1.0):
+        """
+        ファイルに書き出す（node_exporter の textfile collector 向け）
+        再実行のたびに書かないよう、前回から min_interval 秒以上経った場合だけ書く
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_write < min_interval:
+                return
+            self._last_write = now
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render_prometheus(gauges), encoding='utf-8')
+        tmp_path.replace(path)
+
+
+def serve_metrics(registry: MetricsRegistry, port: int, host: str = "127.0.0.1",
+                  gauges: Optional[Callable[[], Dict[str, float]]] = None) -> ThreadingHTTPServer:
+    """
+    /metrics を返すHTTPサーバーをバックグラウンドスレッドで起動する
+    gauges は呼び出すと追加の値（名前 → 値）を返す関数
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus(gauges() if gauges else None).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,236 @@
+"""
+SQLiteバックエンド（任意）
+選挙区・候補者・政党をローカルのSQLiteファイルに置き、候補者は表示のたびにSQLiteから読み込みます
+（比例代表名簿や過去の結果、長いメモを追加しても各プロセスのメモリ使用量が増えないようにするため）
+
+- 接続はスレッドごとに1本（読み取り専用）。Streamlitの各セッションスレッドが自分の接続を使う
+- 候補者の名前・所属・メモには FTS5 の全文検索インデックスを張る
+- データベースは election_data.json の内容ハッシュと一致しなければ作り直す
+
+有効にするには環境変数 ELECTION_DATA_BACKEND=sqlite を指定します
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from election_store import (
+    BACKEND_SQLITE,
+    CandidateRecord,
+    PolicyStore,
+    compile_election_data,
+)
+
+
+# スキーマを変えたら上げる（PRAGMA user_version に記録）
+DATABASE_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE parties (id TEXT PRIMARY KEY, name TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE party_aliases (alias TEXT PRIMARY KEY, party_id TEXT NOT NULL REFERENCES parties (id));
+CREATE TABLE districts (name TEXT PRIMARY KEY, position INTEGER NOT NULL);
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY,
+    district TEXT NOT NULL REFERENCES districts (name),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    party TEXT NOT NULL,
+    memo TEXT NOT NULL,
+    party_id TEXT REFERENCES parties (id)
+);
+CREATE INDEX candidates_by_district ON candidates (district, position);
+CREATE INDEX candidates_by_party ON candidates (party_id, district, position);
+"""
+
+# 日本語は空白で区切られないため trigram トークナイザを使う（古いSQLiteでは unicode61）
+_FTS_TOKENIZERS = ("trigram", "unicode61")
+
+
+def database_path(json_path: Path) -> Path:
+    """JSONファイルに対応するデータベースのパス（election_data.json → election_data.sqlite）"""
+    return json_path.with_suffix(".sqlite")
+
+
+def read_database_version(path: Path) -> Optional[str]:
+    """データベースに記録された元データのバージョン（無い・形式が違う場合は None）"""
+    if not path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != DATABASE_FORMAT_VERSION:
+                return None
+            row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def write_database(store: PolicyStore, out_path: Path) -> Path:
+    """
+    コンパイル済みストアの選挙区・候補者・政党をデータベースに書き出す
+    一時ファイルに書いてから差し替えるため、開いている接続は古い内容を読み続けられる
+    """
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript(_SCHEMA)
+        for tokenizer in _FTS_TOKENIZERS:
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE candidate_search USING fts5("
+                    f"name, party, memo, content='candidates', content_rowid='id', tokenize='{tokenizer}')")
+                break
+            except sqlite3.OperationalError:
+                continue
+        conn.execute(f"PRAGMA user_version = {DATABASE_FORMAT_VERSION}")
+        conn.execute("INSERT INTO meta VALUES ('data_version', ?)", (store.version,))
+
+        conn.executemany("INSERT INTO parties VALUES (?, ?, ?)",
+                         [(party.id, party.name, i) for i, party in enumerate(store.parties)])
+        conn.executemany("INSERT INTO party_aliases VALUES (?, ?)", list(store.party_aliases.items()))
+        conn.executemany("INSERT INTO districts VALUES (?, ?)",
+                         [(name, i) for i, name in enumerate(store.districts)])
+        conn.executemany(
+            "INSERT INTO candidates (district, position, name, party, memo, party_id) VALUES (?, ?, ?, ?, ?, ?)",
+            [(district, position, c.name, c.party, c.memo, c.party_id)
+             for district, candidates in store.districts.items()
+             for position, c in enumerate(candidates)])
+        conn.execute("INSERT INTO candidate_search (candidate_search) VALUES ('rebuild')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    tmp_path.replace(out_path)
+    return out_path
+
+
+class ConnectionPool:
+    """
+    スレッドごとに1本の読み取り専用接続を持つプール
+    sqlite3 の接続はスレッド間で共有できないため、初回利用時にそのスレッド用の接続を開く
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        return self.connection().execute(sql, params).fetchall()
+
+
+class SqliteDistricts(Mapping):
+    """
+    選挙区名 → 候補者のマッピング（候補者は参照のたびにSQLiteから読み込む）
+    選挙区名の一覧だけはセレクトボックス用にメモリに持つ
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        self._names = tuple(name for name, in pool.execute("SELECT name FROM districts ORDER BY position"))
+        self._name_set = frozenset(self._names)
+
+    def __getitem__(self, name: str) -> Tuple[CandidateRecord, ...]:
+        if name not in self._name_set:
+            raise KeyError(name)
+        rows = self._pool.execute(
+            "SELECT name, party, memo, party_id FROM candidates WHERE district = ? ORDER BY position", (name,))
+        return tuple(CandidateRecord(*row) for row in rows)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._name_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search_candidates(self, query: str, limit: int = 20) -> List[str]:
+        """候補者の名前・所属・メモに検索語を含む選挙区（FTS5。3文字未満は部分一致）"""
+        query = query.strip()
+        if not query:
+            return []
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self._pool.execute(
+                "SELECT DISTINCT c.district FROM candidate_search s JOIN candidates c ON c.id = s.rowid "
+                "WHERE candidate_search MATCH ? LIMIT ?", (phrase, limit))
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self._pool.execute(
+                "SELECT DISTINCT district FROM candidates "
+                "WHERE name LIKE ? ESCAPE '\\' OR memo LIKE ? ESCAPE '\\' LIMIT ?", (pattern, pattern, limit))
+        return [district for district, in rows]
+
+
+class SqliteCandidatesByParty(Mapping):
+    """政党ID → ((選挙区名, 候補者), ...)（参照のたびにSQLiteから読み込む）"""
+
+    def __init__(self, pool: ConnectionPool, party_ids: Tuple[str, ...]):
+        self._pool = pool
+        self._party_ids = party_ids
+
+    def __getitem__(self, party_id: str) -> Tuple[Tuple[str, CandidateRecord], ...]:
+        if party_id not in self._party_ids:
+            raise KeyError(party_id)
+        rows = self._pool.execute(
+            "SELECT district, name, party, memo, party_id FROM candidates WHERE party_id = ? "
+            "ORDER BY district, position", (party_id,))
+        return tuple((district, CandidateRecord(*candidate)) for district, *candidate in rows)
+
+    def __contains__(self, party_id: object) -> bool:
+        return party_id in self._party_ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._party_ids)
+
+    def __len__(self) -> int:
+        return len(self._party_ids)
+
+
+def compile_sqlite_store(data: Dict[str, Any], db_path: Path, version: str = "") -> PolicyStore:
+    """
+    政策はメモリ上にコンパイルし、選挙区・候補者はSQLiteから読むストアを組み立てる
+    データベースが無い・古い場合はここで作り直す
+    """
+    if read_database_version(db_path) != version:
+        write_database(compile_election_data(data, version=version), db_path)
+
+    # 候補者を除いた部分（政党・索引・選挙区の市区町村）だけをメモリ上にコンパイルする
+    base = compile_election_data({key: value for key, value in data.items() if key != "districts"},
+                                 version=version)
+    pool = ConnectionPool(db_path)
+    counts = dict(pool.execute(
+        "SELECT party_id, COUNT(*) FROM candidates WHERE party_id IS NOT NULL GROUP BY party_id"))
+
+    return PolicyStore(
+        parties=base.parties,
+        districts=SqliteDistricts(pool),
+        professions=base.professions,
+        topics=base.topics,
+        profession_index=base.profession_index,
+        topic_index=base.topic_index,
+        version=version,
+        district_areas=base.district_areas,
+        party_aliases=base.party_aliases,
+        candidates_by_party=SqliteCandidatesByParty(pool, tuple(counts)),
+        candidate_counts=MappingProxyType(counts),
+        backend=BACKEND_SQLITE,
+    )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+静的サイトの書き出し
+政党カードの各部分（職種ごと・トピックごと、解説あり/なし）、全選挙区の候補者パネル、選択肢の一覧を
+描画済みのHTML断片とJSONとして書き出し、ブラウザ側のスクリプト（static_site/compose.js）が
+利用者の選択に合わせて組み立てます。CDNやnginxから配信でき、リクエストごとのPythonの処理は不要です
+（キーワード検索・郵便番号検索などはStreamlit版で提供）
+
+レイアウト:
+    site/index.html, site/compose.js, site/styles.css
+    site/data/site.json           … 選択肢・政党・ファイルの対応表
+    site/data/p/<内容ハッシュ>.json … 職種1つぶん {"plain": {政党ID: HTML}, "explained": {政党ID: HTML}}
+    site/data/t/<内容ハッシュ>.json … トピック1つぶん（同上）
+    site/data/d/<内容ハッシュ>.html … 選挙区1つぶんの候補者パネル
+
+断片のファイル名は内容ハッシュなので、同じ名前の中身が書き換わることはありません
+対応表（site.json）は断片をすべて書き出した後に差し替え、1つ前の対応表が参照する断片も残すため、
+古い対応表を読んだブラウザも書き出し後しばらくは古い断片を読めます
+
+使い方:
+    python static_export.py [election_data.json または分割形式のディレクトリ] [出力ディレクトリ]
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from card_renderer import (
+    GENERAL_SECTION_TITLE,
+    STYLESHEET_PATH,
+    minify_css,
+    render_card_header,
+    render_district_panel,
+    render_profession_section,
+    render_section_title,
+    render_topic_item,
+)
+from data_loader import read_store
+from election_store import PartyRecord, PolicyStore
+
+
+STATIC_SITE_DIR = Path(__file__).parent / "static_site"
+STATIC_FORMAT = "election-static-v1"
+
+
+def _write(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(content, encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def _fragment_name(directory: str, content: str, suffix: str) -> str:
+    """断片の内容ハッシュによるファイル名（data/p/0123456789abcdef.json など）"""
+    return f"data/{directory}/{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}{suffix}"
+
+
+def _referenced_files(site_path: Path) -> List[str]:
+    """既存の対応表が参照している断片（無い・読めない場合は空）"""
+    try:
+        with open(site_path, 'r', encoding='utf-8') as f:
+            site = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(site, dict):
+        return []
+    return [entry["file"] for key in ("professions", "topics", "districts")
+            for entry in site.get(key) or [] if isinstance(entry, dict) and isinstance(entry.get("file"), str)]
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def render_facet_fragments(parties: List[PartyRecord], render: Callable[[PartyRecord, bool], str]) -> Dict[str, Dict[str, str]]:
+    """
+    職種・トピック1つぶんの断片（政党ID → HTML）
+    解説ありの断片は、解説なしと異なる場合だけ持つ（ブラウザ側は無ければ解説なしを使う）
+    """
+    plain: Dict[str, str] = {}
+    explained: Dict[str, str] = {}
+    for party in parties:
+        html = render(party, False)
+        if not html:
+            continue
+        plain[party.id] = html
+        with_explanations = render(party, True)
+        if with_explanations != html:
+            explained[party.id] = with_explanations
+    return {"plain": plain, "explained": explained}
+
+
+def export_static_site(store: PolicyStore, out_dir: Path) -> Dict[str, int]:
+    """ストアの内容を静的サイトとして書き出し、書き出したファイル数などを返す"""
+    data_dir = out_dir / "data"
+    site_path = data_dir / "site.json"
+    previous_files = _referenced_files(site_path)
+    written = set()
+    total_bytes = 0
+
+    def write(relative: str, content: str):
+        nonlocal total_bytes
+        _write(out_dir / relative, content)
+        written.add(relative)
+        total_bytes += len(content.encode('utf-8'))
+
+    def write_fragment(directory: str, content: str, suffix: str) -> str:
+        nonlocal total_bytes
+        relative = _fragment_name(directory, content, suffix)
+        # 同じ名前なら中身も同じなので、前回書き出したものはそのまま使う
+        if not (out_dir / relative).exists():
+            _write(out_dir / relative, content)
+        written.add(relative)
+        total_bytes += len(content.encode('utf-8'))
+        return relative
+
+    # 選択肢はソート済みの順で書き出す（ブラウザ側はこの順に並べて、normalize_selection と同じ表示順にする）
+    professions = []
+    for profession in store.professions:
+        relative = write_fragment("p", _dump(render_facet_fragments(
+            store.parties_for_profession(profession), lambda party, show: render_profession_section(party, profession, show))),
+            ".json")
+        professions.append({"name": profession, "file": relative})
+
+    topics = []
+    for topic in store.topics:
+        relative = write_fragment("t", _dump(render_facet_fragments(
+            store.parties_for_topic(topic), lambda party, show: render_topic_item(party, topic, show))), ".json")
+        topics.append({"name": topic, "file": relative})
+
+    districts = []
+    for name in store.district_names:
+        relative = write_fragment("d", render_district_panel(name, store.districts[name]), ".html")
+        districts.append({"name": name, "file": relative})
+
+    write("styles.css", minify_css(STYLESHEET_PATH.read_text(encoding='utf-8')))
+    for asset in ("index.html", "compose.js"):
+        shutil.copyfile(STATIC_SITE_DIR / asset, out_dir / asset)
+        written.add(asset)
+
+    # 対応表は断片をすべて書き出した後に差し替える（新しい対応表が、まだ無い断片を指すことはない）
+    site = {
+        "format": STATIC_FORMAT,
+        "version": store.version,
+        "parties": [
+            {
+                "id": party.id,
+                "header": render_card_header(party),
+                "personalized": party.personalized is not None,
+                "general": party.general is not None,
+            }
+            for party in store.parties
+        ],
+        "general_title": render_section_title(GENERAL_SECTION_TITLE),
+        "professions": professions,
+        "topics": topics,
+        "districts": districts,
+    }
+    write("data/site.json", _dump(site))
+
+    # 今回と1つ前の対応表のどちらからも参照されない断片を削除
+    # （1つ前の対応表を読み込み済みのブラウザが、書き出し直後に断片を読めなくならないように）
+    keep = written.union(previous_files)
+    for stale in data_dir.glob("*/*"):
+        if stale.relative_to(out_dir).as_posix() not in keep:
+            stale.unlink()
+
+    return {"files": len(written), "bytes": total_bytes}
+
+
+def main():
+    """データを読み込んで静的サイトを書き出す"""
+    script_dir = Path(__file__).parent
+    data_path = Path(sys.argv[1]) if len(sys.argv) > 1 else script_dir / "election_data.json"
+    out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else script_dir / "site"
+
+    if not data_path.exists():
+        print(f"❌ ファイルが見つかりません: {data_path}")
+        sys.exit(1)
+
+    store = read_store(data_path)
+    result = export_static_site(store, out_dir)
+    print(f"✅ {out_dir} に静的サイトを書き出しました（{result['files']}ファイル, {result['bytes']:,} バイト）")
+    print(f"   確認: python -m http.server -d {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
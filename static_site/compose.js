@@ -0,0 +1,207 @@
+/*
+ * 静的版の組み立て（static_export.py が書き出した断片を選択に合わせて結合する）
+ * カードの組み立て順は card_renderer.render_party_card と同じにすること
+ *
+ * 選択内容は URL の # 以降に保存する（例: #p=看護師&t=年金&e=1&d=東京1区）
+ */
+(function () {
+    "use strict";
+
+    var EMPTY_STATE =
+        '<div class="empty-state">' +
+        '<div class="empty-state-icon">👈</div>' +
+        '<p>左のサイドバーから、あなたの属性や関心のある政策を選択してください</p>' +
+        '</div>';
+
+    var site = null;
+    var fragments = {};  // ファイル名 → 読み込み中/読み込み済みの Promise
+    var renderToken = 0;
+
+    function load(file, type) {
+        if (!fragments[file]) {
+            // 断片のファイル名は内容ハッシュで中身が変わらないため、CDNやブラウザに長期キャッシュさせてよい
+            fragments[file] = fetch(file).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(file + ": " + response.status);
+                }
+                return type === "json" ? response.json() : response.text();
+            });
+            fragments[file].catch(function () {
+                delete fragments[file];
+            });
+        }
+        return fragments[file];
+    }
+
+    function escapeHtml(text) {
+        return text.replace(/[&<>"']/g, function (c) {
+            return { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;" }[c];
+        });
+    }
+
+    function readState() {
+        var params = new URLSearchParams(location.hash.slice(1));
+        return {
+            professions: params.getAll("p"),
+            topics: params.getAll("t"),
+            explanations: params.get("e") === "1",
+            district: params.get("d") || ""
+        };
+    }
+
+    function writeState() {
+        var params = new URLSearchParams();
+        document.querySelectorAll("#professions input:checked").forEach(function (input) {
+            params.append("p", input.value);
+        });
+        document.querySelectorAll("#topics input:checked").forEach(function (input) {
+            params.append("t", input.value);
+        });
+        if (document.getElementById("explanations").checked) {
+            params.set("e", "1");
+        }
+        var district = document.getElementById("district").value;
+        if (district) {
+            params.set("d", district);
+        }
+        history.replaceState(null, "", "#" + params.toString());
+        render();
+    }
+
+    // 選択肢は site.json の順（ソート済み）に並べ、存在しないものは除く
+    function selected(facets, names) {
+        var wanted = new Set(names);
+        return facets.filter(function (facet) { return wanted.has(facet.name); });
+    }
+
+    function pick(fragment, partyId, explanations) {
+        if (explanations && fragment.explained[partyId] !== undefined) {
+            return fragment.explained[partyId];
+        }
+        return fragment.plain[partyId] || "";
+    }
+
+    function composeCard(party, professionFragments, topicFragments, explanations) {
+        var parts = [party.header];
+        var showPersonalized = professionFragments.length > 0 && party.personalized;
+        var showGeneral = topicFragments.length > 0 && party.general;
+
+        if (showPersonalized || showGeneral) {
+            parts.push('<div class="party-card-content">');
+            if (showPersonalized) {
+                professionFragments.forEach(function (fragment) {
+                    parts.push(pick(fragment, party.id, explanations));
+                });
+            }
+            if (showGeneral) {
+                parts.push(site.general_title);
+                topicFragments.forEach(function (fragment) {
+                    parts.push(pick(fragment, party.id, explanations));
+                });
+            }
+            parts.push("</div>");
+        }
+        parts.push("</div>");
+        return parts.join("");
+    }
+
+    function renderCards(state, token) {
+        var content = document.getElementById("content");
+        var professions = selected(site.professions, state.professions);
+        var topics = selected(site.topics, state.topics);
+
+        if (professions.length === 0 && topics.length === 0) {
+            content.innerHTML = EMPTY_STATE;
+            return Promise.resolve();
+        }
+
+        var files = professions.concat(topics).map(function (facet) { return load(facet.file, "json"); });
+        return Promise.all(files).then(function (loaded) {
+            if (token !== renderToken) {
+                return;
+            }
+            var professionFragments = loaded.slice(0, professions.length);
+            var topicFragments = loaded.slice(professions.length);
+            var html = ['<div class="section-header">🎯 政党別政策比較</div>', '<div class="cards">'];
+            site.parties.forEach(function (party) {
+                html.push("<div>" + composeCard(party, professionFragments, topicFragments, state.explanations) +
+                          "</div>");
+            });
+            html.push("</div>");
+            content.innerHTML = html.join("");
+        });
+    }
+
+    function renderDistrict(state, token) {
+        var panel = document.getElementById("district-panel");
+        var district = site.districts.find(function (d) { return d.name === state.district; });
+        if (!district) {
+            panel.innerHTML = "";
+            return Promise.resolve();
+        }
+        return load(district.file, "text").then(function (html) {
+            if (token === renderToken) {
+                panel.innerHTML = html;
+            }
+        });
+    }
+
+    function render() {
+        var state = readState();
+        var token = ++renderToken;
+        Promise.all([renderCards(state, token), renderDistrict(state, token)]).catch(function (error) {
+            document.getElementById("content").innerHTML =
+                '<div class="empty-state"><p>❌ データの読み込みに失敗しました: ' +
+                escapeHtml(String(error.message || error)) + "</p></div>";
+        });
+    }
+
+    function buildCheckboxes(containerId, facets, checked) {
+        var container = document.getElementById(containerId);
+        var wanted = new Set(checked);
+        facets.forEach(function (facet) {
+            var label = document.createElement("label");
+            var input = document.createElement("input");
+            input.type = "checkbox";
+            input.value = facet.name;
+            input.checked = wanted.has(facet.name);
+            input.addEventListener("change", writeState);
+            label.appendChild(input);
+            label.appendChild(document.createTextNode(" " + facet.name));
+            container.appendChild(label);
+        });
+    }
+
+    function buildControls() {
+        var state = readState();
+        buildCheckboxes("professions", site.professions, state.professions);
+        buildCheckboxes("topics", site.topics, state.topics);
+
+        var explanations = document.getElementById("explanations");
+        explanations.checked = state.explanations;
+        explanations.addEventListener("change", writeState);
+
+        var select = document.getElementById("district");
+        site.districts.forEach(function (district) {
+            var option = document.createElement("option");
+            option.value = district.name;
+            option.textContent = district.name;
+            select.appendChild(option);
+        });
+        select.value = state.district;
+        select.addEventListener("change", writeState);
+    }
+
+    fetch("data/site.json", { cache: "no-cache" })
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+            site = data;
+            buildControls();
+            render();
+        })
+        .catch(function (error) {
+            document.getElementById("content").innerHTML =
+                '<div class="empty-state"><p>❌ データの読み込みに失敗しました: ' +
+                escapeHtml(String(error.message || error)) + "</p></div>";
+        });
+})();
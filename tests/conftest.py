@@ -0,0 +1,72 @@
+"""
+テスト共通のデータ
+election_data.json と同じ形式の小さなデータ（略称・解説の形式・ID無しの政党などを含む）
+"""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+
+SAMPLE_DATA = {
+    "parties": [
+        {
+            "id": "ldp",
+            "name": "自由民主党",
+            "personalized_policies": {
+                "医師": ["地域医療を支える。", "研修制度を見直す。"],
+                "看護師": "処遇を改善する。",
+            },
+            "personalized_explanations": {
+                "医師": ["地方の病院を支援します。財源は予算措置で決まります。",
+                         "研修先を選びやすくします。財源は予算措置で決まります。"],
+                "看護師": "夜勤手当を見直します。",
+            },
+            "general_policies": {"消費税": "税率を維持する。", "年金": "制度を持続させる。"},
+            "general_explanations": {"消費税": ["社会保障の財源です。", "  ", "軽減税率も維持します。"]},
+        },
+        {
+            "id": "cdp",
+            "name": "立憲民主党",
+            "aliases": ["立民"],
+            "general_policies": {"消費税": "食料品の税率を下げる。"},
+        },
+        {
+            "name": "日本共産党",
+            "personalized_policies": {"看護師": "人員を増やす。"},
+        },
+    ],
+    "districts": {
+        "千葉8区": [
+            {"name": "山田太郎", "party": "自民", "memo": "現職"},
+            {"name": "佐藤花子", "party": "立民"},
+            {"name": "鈴木一郎", "party": "共産", "note": "新人"},
+        ],
+        "岡山2区": [
+            {"name": "田中次郎", "party": "無所属"},
+        ],
+    },
+    "district_areas": {
+        "千葉8区": [{"name": "柏市", "reading": "かしわし"}, "我孫子市"],
+    },
+}
+
+
+@pytest.fixture
+def election_data():
+    """書き換えてよいサンプルデータ"""
+    return copy.deepcopy(SAMPLE_DATA)
+
+
+@pytest.fixture
+def write_json(tmp_path):
+    """データを tmp_path 以下のJSONファイルに書き出す関数"""
+
+    def write(data, name: str = "election_data.json", indent=None) -> Path:
+        path = tmp_path / name
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding='utf-8')
+        return path
+
+    return write
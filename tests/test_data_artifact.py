@@ -0,0 +1,80 @@
+"""data_artifact.py: コンパイル済みデータの書き出しと読み込み（JSONからのコンパイルと同じ内容になること）"""
+
+import pytest
+
+from data_artifact import artifact_path, compile_artifact, read_artifact, read_artifact_version, write_artifact
+from election_store import compile_election_data
+
+
+def dump_store(store):
+    """比較用に、ストアの内容を値だけの形にする"""
+
+    def items(policy_items):
+        return [(item.text, item.explanation, item.bullet) for item in policy_items]
+
+    return {
+        "parties": [
+            (party.id, party.name,
+             None if party.personalized is None else {k: items(v) for k, v in party.personalized.items()},
+             None if party.general is None else {k: items([v]) for k, v in party.general.items()})
+            for party in store.parties
+        ],
+        "districts": {name: [(c.name, c.party, c.memo, c.party_id) for c in candidates]
+                      for name, candidates in store.districts.items()},
+        "professions": store.professions,
+        "topics": store.topics,
+        "areas": dict(store.district_areas),
+        "aliases": dict(store.party_aliases),
+        "candidates": {party.id: [(d, c.name) for d, c in store.candidates_for_party(party.id)]
+                       for party in store.parties},
+    }
+
+
+@pytest.fixture
+def compiled(election_data, tmp_path):
+    store = compile_election_data(election_data, version="0123456789abcdef")
+    return store, write_artifact(store, tmp_path / "election_data.bin")
+
+
+def test_artifact_path(tmp_path):
+    assert artifact_path(tmp_path / "election_data.json") == tmp_path / "election_data.bin"
+
+
+def test_round_trip(compiled):
+    store, path = compiled
+    loaded = read_artifact(path, expected_version=store.version)
+    assert loaded is not None
+    assert loaded.version == store.version
+    assert dump_store(loaded) == dump_store(store)
+    assert loaded.district_search.search("かしわし") == ["千葉8区"]
+    assert read_artifact_version(path) == store.version
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_compile_artifact_from_json(election_data, write_json, tmp_path):
+    raw = write_json(election_data).read_bytes()
+    path = compile_artifact(raw, tmp_path / "election_data.bin", "fedcba9876543210")
+    assert dump_store(read_artifact(path)) == dump_store(compile_election_data(election_data))
+
+
+def test_version_mismatch_falls_back(compiled):
+    _, path = compiled
+    assert read_artifact(path, expected_version="ffffffffffffffff") is None
+
+
+@pytest.mark.parametrize("content", [b"", b"EDC1", b"XXXX" + bytes(100)])
+def test_invalid_artifact_falls_back(tmp_path, content):
+    path = tmp_path / "election_data.bin"
+    path.write_bytes(content)
+    assert read_artifact(path) is None
+    assert read_artifact_version(path) is None
+
+
+def test_truncated_body_falls_back(compiled):
+    _, path = compiled
+    path.write_bytes(path.read_bytes()[:40])
+    assert read_artifact(path) is None
+
+
+def test_missing_artifact(tmp_path):
+    assert read_artifact(tmp_path / "missing.bin") is None
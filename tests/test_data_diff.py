@@ -0,0 +1,195 @@
+"""data_diff.py: 葉のハッシュによる差分・バージョンの引き継ぎ・CLI"""
+
+import json
+import sys
+
+import pytest
+
+import data_diff
+from data_diff import (
+    CHANGE_ADDED,
+    CHANGE_CHANGED,
+    CHANGE_REMOVED,
+    FIELD_CANDIDATE,
+    FIELD_CANDIDATE_MEMO,
+    FIELD_EXPLANATION,
+    FIELD_FORMAT,
+    FIELD_POLICY,
+    FIELD_SECTION,
+    PERSONALIZED_SECTION_LABEL,
+    SCOPE_DISTRICT,
+    SCOPE_PARTY,
+    StoreFingerprint,
+    diff_stores,
+    mark_changes,
+)
+from card_renderer import GENERAL_SECTION_TITLE
+from election_store import compile_election_data, patch_election_data
+
+
+def _changes(change_set):
+    return [(c.kind, c.scope, c.target, c.item, c.field, c.old, c.new) for c in change_set.changes]
+
+
+def test_identical_content_has_no_changes(election_data):
+    old = compile_election_data(election_data, version="v1")
+    new = compile_election_data(election_data, version="v2")
+    changes = diff_stores(old, new)
+    assert len(changes) == 0
+    assert (changes.base_version, changes.version) == ("v1", "v2")
+    assert not changes.parties and not changes.districts and not changes.candidate_parties
+
+
+def test_policy_and_explanation_changes(election_data):
+    old = compile_election_data(election_data, version="v1")
+    election_data["parties"][0]["general_policies"]["消費税"] = "税率を引き下げる。"
+    election_data["parties"][0]["general_explanations"]["年金"] = "受給開始年齢は変えません。"
+    del election_data["parties"][1]["general_policies"]["消費税"]
+    new = compile_election_data(election_data, version="v2")
+
+    changes = diff_stores(old, new)
+    assert _changes(changes) == [
+        (CHANGE_CHANGED, SCOPE_PARTY, "ldp", "📋 消費税", FIELD_POLICY, "税率を維持する。", "税率を引き下げる。"),
+        (CHANGE_ADDED, SCOPE_PARTY, "ldp", "📋 年金", FIELD_EXPLANATION, "", "受給開始年齢は変えません。"),
+        (CHANGE_REMOVED, SCOPE_PARTY, "cdp", "📋 消費税", FIELD_POLICY, "食料品の税率を下げる。", ""),
+    ]
+    assert changes.parties == {"ldp", "cdp"}
+    assert changes.counts() == {CHANGE_ADDED: 1, CHANGE_REMOVED: 1, CHANGE_CHANGED: 1}
+    # 政策の変更だけでは候補者一覧は作り直さない
+    assert not changes.candidate_parties
+
+
+def test_party_added_and_removed_are_summarized(election_data):
+    old = compile_election_data(election_data)
+    election_data["parties"][1] = {"id": "dpfp", "name": "国民民主党", "general_policies": {"年金": "a", "税": "b"}}
+    new = compile_election_data(election_data)
+
+    changes = diff_stores(old, new)
+    assert [(c.kind, c.target, c.old, c.new) for c in changes.changes] == [
+        (CHANGE_REMOVED, "cdp", "1項目", ""),
+        (CHANGE_ADDED, "dpfp", "", "2項目"),
+    ]
+    assert changes.candidate_parties == {"cdp", "dpfp"}
+
+
+def test_candidate_changes(election_data):
+    old = compile_election_data(election_data)
+    district = election_data["districts"]["千葉8区"]
+    district[0]["memo"] = "元職"
+    district[1]["party"] = "自民"
+    district.append({"name": "高橋三郎", "party": "無所属", "memo": "新人"})
+    new = compile_election_data(election_data)
+
+    changes = diff_stores(old, new)
+    assert [(c.kind, c.scope, c.item, c.field, c.old, c.new) for c in changes.changes] == [
+        (CHANGE_CHANGED, SCOPE_DISTRICT, "山田太郎", FIELD_CANDIDATE_MEMO, "現職", "元職"),
+        (CHANGE_CHANGED, SCOPE_DISTRICT, "佐藤花子", "所属政党", "立民", "自民"),
+        (CHANGE_ADDED, SCOPE_DISTRICT, "高橋三郎", FIELD_CANDIDATE, "", "無所属 ／ 新人"),
+    ]
+    assert changes.districts == {"千葉8区"}
+    # 所属が変わった候補者の変更前後の政党（と変わった候補者の政党）の一覧を作り直す
+    assert changes.candidate_parties == {"ldp", "cdp"}
+    assert not changes.parties
+
+
+def test_delta_and_revisions(election_data):
+    old = compile_election_data(election_data, version="v1")
+    election_data["parties"][0]["name"] = "自由民主党（新）"
+    new = compile_election_data(election_data, version="v2")
+
+    changes = diff_stores(old, new)
+    mark_changes(old, new, changes)
+    # 変わっていない政党は前のバージョンを引き継ぐ（描画済みのカードを使い回す）
+    assert new.party_revision("ldp") == "v2"
+    assert new.party_revision("cdp") == "v1"
+    assert new.delta.base_version == "v1"
+    assert new.delta.parties == {"ldp"}
+    assert new.delta.candidate_parties == {"ldp"}
+
+    newer = compile_election_data(election_data, version="v3")
+    mark_changes(new, newer, diff_stores(new, newer))
+    assert newer.party_revision("ldp") == "v2"
+    assert newer.party_revision("cdp") == "v1"
+
+
+def test_bullet_format_change_bumps_revision(election_data):
+    # 文字列 → 1要素の配列は本文が同じでも箇条書きの表示になる
+    old = compile_election_data(election_data, version="v1")
+    election_data["parties"][0]["personalized_policies"]["看護師"] = ["処遇を改善する。"]
+    election_data["parties"][0]["personalized_explanations"]["看護師"] = ["夜勤手当を見直します。"]
+    new = compile_election_data(election_data, version="v2")
+
+    changes = diff_stores(old, new)
+    assert _changes(changes) == [
+        (CHANGE_ADDED, SCOPE_PARTY, "ldp", "🏥 看護師", FIELD_FORMAT, "", "箇条書き"),
+    ]
+    mark_changes(old, new, changes)
+    assert new.party_revision("ldp") == "v2"
+    assert new.party_revision("cdp") == "v1"
+
+
+@pytest.mark.parametrize("index, field, label", [
+    (1, "personalized_policies", PERSONALIZED_SECTION_LABEL),
+    (2, "general_policies", GENERAL_SECTION_TITLE),
+])
+def test_empty_section_added_and_removed(election_data, index, field, label):
+    # フィールドが無い（None）のと空（{}）とではカードの表示が違う
+    old = compile_election_data(election_data, version="v1")
+    election_data["parties"][index][field] = {}
+    new = compile_election_data(election_data, version="v2")
+    party_id = new.parties[index].id
+
+    changes = diff_stores(old, new)
+    assert _changes(changes) == [(CHANGE_ADDED, SCOPE_PARTY, party_id, label, FIELD_SECTION, "", "あり")]
+    mark_changes(old, new, changes)
+    assert new.party_revision(party_id) == "v2"
+
+    del election_data["parties"][index][field]
+    newer = compile_election_data(election_data, version="v3")
+    changes = diff_stores(new, newer)
+    assert _changes(changes) == [(CHANGE_REMOVED, SCOPE_PARTY, party_id, label, FIELD_SECTION, "あり", "")]
+    mark_changes(new, newer, changes)
+    assert newer.party_revision(party_id) == "v3"
+
+
+def test_fingerprint_reuses_shared_records(election_data):
+    old = compile_election_data(election_data, version="v1")
+    election_data["parties"][0]["general_policies"]["年金"] = "見直す。"
+    patched = patch_election_data(old, election_data, {0}, (), "v2")
+
+    before = StoreFingerprint.from_store(old)
+    after = StoreFingerprint.from_store(patched, previous=before)
+    assert after.parties["cdp"] is before.parties["cdp"]
+    assert after.districts["千葉8区"] is before.districts["千葉8区"]
+    assert after.parties["ldp"] is not before.parties["ldp"]
+    assert diff_stores(old, patched, before, after).parties == {"ldp"}
+
+
+def test_formatting_only_changes_are_ignored(election_data, write_json, monkeypatch, capsys):
+    old_path = write_json(election_data, "old.json")
+    new_path = write_json(election_data, "new.json", indent=2)
+    monkeypatch.setattr(sys, "argv", ["data_diff.py", str(old_path), str(new_path)])
+    with pytest.raises(SystemExit) as exit_info:
+        data_diff.main()
+    assert exit_info.value.code == 0
+    assert "変更はありません" in capsys.readouterr().out
+
+
+def test_cli_reports_changes_as_json(election_data, write_json, monkeypatch, capsys):
+    old_path = write_json(election_data, "old.json")
+    election_data["districts"]["岡山2区"][0]["memo"] = "元職"
+    new_path = write_json(election_data, "new.json")
+    monkeypatch.setattr(sys, "argv", ["data_diff.py", str(old_path), str(new_path), "--json"])
+    with pytest.raises(SystemExit) as exit_info:
+        data_diff.main()
+    assert exit_info.value.code == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(line["target"], line["field"], line["new"]) for line in lines] == [
+        ("岡山2区", FIELD_CANDIDATE_MEMO, "元職")]
+
+
+def test_cli_missing_file(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["data_diff.py", str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+    with pytest.raises(SystemExit) as exit_info:
+        data_diff.main()
+    assert exit_info.value.code == 2
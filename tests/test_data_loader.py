@@ -0,0 +1,160 @@
+"""data_loader.py: ファイルの変更検知と、スナップショットの差し替え（失敗時は直前のものを維持）・受信箱の差分の適用"""
+
+import json
+import os
+import time
+
+import pytest
+
+from data_loader import InboxReloader, StoreReloader, data_version, inbox_path, read_store
+
+
+def rewrite(path, content: str):
+    """内容を書き換え、同じ時刻・同じサイズでも変更として検知されるよう mtime を進める"""
+    stat = path.stat() if path.exists() else None
+    path.write_text(content, encoding='utf-8')
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def data_path(election_data, write_json):
+    return write_json(election_data)
+
+
+def test_read_store(data_path):
+    store = read_store(data_path)
+    assert store.version == data_version(data_path.read_bytes())
+    assert [party.id for party in store.parties] == ["ldp", "cdp", "party-2"]
+
+
+def test_initial_load_is_synchronous(data_path):
+    reloader = StoreReloader(data_path)
+    assert reloader.snapshot().version == data_version(data_path.read_bytes())
+    assert reloader.reload_count == 1 and reloader.last_error is None
+
+
+def test_change_swaps_snapshot_and_keeps_old_one_intact(data_path, election_data):
+    reloader = StoreReloader(data_path)
+    old = reloader.snapshot()
+
+    election_data["parties"][0]["name"] = "自由民主党（新）"
+    rewrite(data_path, json.dumps(election_data, ensure_ascii=False))
+    assert reloader.check_now()
+    new = reloader.snapshot()
+    assert new is not old
+    assert new.parties[0].name == "自由民主党（新）"
+    # 取得済みのスナップショットは書き換えない（実行中の再実行は古いデータで最後まで描画できる）
+    assert old.parties[0].name == "自由民主党"
+    # 変更が無ければ何もしない
+    assert not reloader.check_now()
+
+
+def test_touch_without_content_change_does_not_rebuild(data_path):
+    reloader = StoreReloader(data_path)
+    snapshot = reloader.snapshot()
+    rewrite(data_path, data_path.read_text(encoding='utf-8'))
+    assert not reloader.check_now()
+    assert reloader.snapshot() is snapshot
+    assert reloader.reload_count == 1
+
+
+def test_broken_file_keeps_previous_snapshot(data_path, election_data):
+    reloader = StoreReloader(data_path)
+    snapshot = reloader.snapshot()
+
+    rewrite(data_path, '{"parties": [')
+    assert not reloader.check_now()
+    assert reloader.snapshot() is snapshot
+    assert "JSONファイルの形式が正しくありません" in reloader.last_error
+
+    # 書き直されたら読み込み直し、エラーを消す
+    rewrite(data_path, json.dumps(election_data, ensure_ascii=False, indent=2))
+    assert reloader.check_now()
+    assert reloader.last_error is None
+
+
+def test_missing_file(tmp_path):
+    reloader = StoreReloader(tmp_path / "missing.json")
+    assert reloader.snapshot().parties == ()
+    assert "見つかりません" in reloader.last_error
+
+
+def test_background_thread_picks_up_changes(data_path, election_data):
+    reloader = StoreReloader(data_path, interval=0.01).start()
+    try:
+        election_data["parties"].pop()
+        rewrite(data_path, json.dumps(election_data, ensure_ascii=False))
+        for _ in range(500):
+            if len(reloader.snapshot().parties) == 2:
+                break
+            time.sleep(0.01)
+        assert len(reloader.snapshot().parties) == 2
+    finally:
+        reloader.stop()
+
+
+def write_patch(inbox, name: str, operations):
+    inbox.mkdir(exist_ok=True)
+    rewrite(inbox / name, json.dumps(operations, ensure_ascii=False))
+
+
+@pytest.fixture
+def inbox(data_path):
+    return inbox_path(data_path)
+
+
+def test_inbox_patches_are_applied_in_order_and_published_once(data_path, inbox):
+    published = []
+    reloader = InboxReloader(data_path, on_change=lambda old, new: published.append(new))
+    base = reloader.snapshot()
+
+    write_patch(inbox, "002.json", [{"op": "test", "path": "/districts/千葉8区/0/memo", "value": "元職"},
+                                    {"op": "replace", "path": "/districts/千葉8区/0/memo", "value": "元職・2期"}])
+    write_patch(inbox, "001.json", [{"op": "replace", "path": "/districts/千葉8区/0/memo", "value": "元職"}])
+    assert reloader.check_now()
+    store = reloader.snapshot()
+    assert store.districts["千葉8区"][0].memo == "元職・2期"
+    assert reloader.patch_count == 2 and reloader.last_error is None
+    # 適用途中のストアは公開しない
+    assert published == [store]
+    assert reloader.changes[0].base_version == base.version
+    # 変わっていない政党・選挙区は共有する
+    assert store.parties[0] is base.parties[0]
+    assert store.districts["岡山2区"] is base.districts["岡山2区"]
+    assert not reloader.check_now()
+
+
+def test_failed_patch_is_held_back_until_rewritten(data_path, inbox):
+    reloader = InboxReloader(data_path)
+    write_patch(inbox, "001.json", [{"op": "replace", "path": "/districts/千葉8区/0/memo", "value": "元職"}])
+    write_patch(inbox, "002.json", [{"op": "test", "path": "/districts/千葉8区/0/memo", "value": 1}])
+    write_patch(inbox, "003.json", [{"op": "add", "path": "/districts/岡山2区/0/memo", "value": "新人"}])
+
+    assert reloader.check_now()
+    store = reloader.snapshot()
+    assert store.districts["千葉8区"][0].memo == "元職"
+    # 失敗したファイル以降は保留する
+    assert store.districts["岡山2区"][0].memo == ""
+    assert "002.json" in reloader.last_error
+    # 書き換えられるまで再試行しない
+    assert not reloader.check_now()
+    assert reloader.snapshot() is store
+
+    write_patch(inbox, "002.json", [{"op": "test", "path": "/districts/千葉8区/0/memo", "value": "元職"}])
+    assert reloader.check_now()
+    assert reloader.snapshot().districts["岡山2区"][0].memo == "新人"
+    assert reloader.patch_count == 3 and reloader.last_error is None
+
+
+def test_patches_are_reapplied_after_base_file_changes(data_path, inbox, election_data):
+    reloader = InboxReloader(data_path)
+    write_patch(inbox, "001.json", [{"op": "replace", "path": "/districts/千葉8区/0/memo", "value": "元職"}])
+    assert reloader.check_now()
+
+    election_data["parties"][0]["name"] = "自由民主党（新）"
+    rewrite(data_path, json.dumps(election_data, ensure_ascii=False))
+    assert reloader.check_now()
+    store = reloader.snapshot()
+    assert store.parties[0].name == "自由民主党（新）"
+    assert store.districts["千葉8区"][0].memo == "元職"
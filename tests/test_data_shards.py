@@ -0,0 +1,104 @@
+"""data_shards.py: 分割形式の書き出しと、内容を照合する遅延読み込み"""
+
+import pytest
+
+import data_shards
+from data_shards import (
+    MANIFEST_NAME,
+    ShardIntegrityError,
+    compile_sharded_store,
+    load_sharded_data,
+    read_manifest,
+    write_shards,
+)
+from election_store import compile_election_data
+
+
+def _items(items):
+    return [(item.text, item.explanation) for item in items]
+
+
+@pytest.fixture
+def shard_dir(election_data, tmp_path):
+    out_dir = tmp_path / "election_data"
+    write_shards(election_data, out_dir)
+    return out_dir
+
+
+def test_round_trip(shard_dir, election_data):
+    assert load_sharded_data(shard_dir) == election_data
+
+
+def test_shards_are_loaded_lazily(shard_dir, election_data, monkeypatch):
+    loaded = []
+    read_shard = data_shards.read_shard
+    monkeypatch.setattr(data_shards, "read_shard", lambda path, sha256=None: loaded.append(path.parent.name)
+                        or read_shard(path, sha256))
+
+    store = compile_sharded_store(shard_dir)
+    # マニフェストだけで一覧・索引・候補者数が分かる
+    assert [party.id for party in store.parties] == ["ldp", "cdp", "party-2"]
+    assert store.professions == ("医師", "看護師")
+    assert store.candidate_count("ldp") == 1
+    assert "千葉8区" in store.districts
+    assert loaded == []
+
+    expected = compile_election_data(election_data)
+    assert _items(store.parties[0].personalized["医師"]) == _items(expected.parties[0].personalized["医師"])
+    assert [c.party_id for c in store.districts["千葉8区"]] == ["ldp", "cdp", "party-2"]
+    assert loaded == ["parties", "districts"]
+    # 2回目以降はキャッシュから
+    store.parties[0].general
+    store.districts["千葉8区"]
+    assert loaded == ["parties", "districts"]
+
+
+def test_corrupted_shard_raises_integrity_error(shard_dir):
+    manifest = read_manifest(shard_dir)
+    party_file = shard_dir / manifest["parties"][0]["file"]
+    party_file.write_bytes(party_file.read_bytes().replace("地域医療".encode('utf-8'), "改ざん".encode('utf-8')))
+    district_file = shard_dir / manifest["districts"][0]["file"]
+    district_file.write_bytes(district_file.read_bytes() + b" ")
+
+    store = compile_sharded_store(shard_dir)
+    with pytest.raises(ShardIntegrityError) as error:
+        store.parties[0].personalized
+    assert error.value.path == party_file
+    with pytest.raises(ShardIntegrityError):
+        store.districts["千葉8区"]
+    # 他のシャードは読める
+    assert store.parties[1].general["消費税"].text == "食料品の税率を下げる。"
+
+
+def _party_file(shard_dir, index=0):
+    return read_manifest(shard_dir)["parties"][index]["file"]
+
+
+def test_rebuild_keeps_previous_generation(shard_dir, election_data):
+    old_store = compile_sharded_store(shard_dir)
+    election_data["parties"].reverse()
+    write_shards(election_data, shard_dir)
+    # 前のマニフェストから組み立てたストアは、同じ位置の政党を正しく読む（内容ハッシュの名前なので上書きされない）
+    assert old_store.parties[0].general["消費税"].text == "税率を維持する。"
+    assert old_store.parties[2].personalized["看護師"][0].text == "人員を増やす。"
+
+
+def test_rebuild_prunes_shards_older_than_previous_generation(shard_dir, election_data):
+    first = _party_file(shard_dir)
+    election_data["parties"][0]["general_policies"]["年金"] = "第2世代。"
+    write_shards(election_data, shard_dir)
+    second = _party_file(shard_dir)
+    assert (shard_dir / first).exists()
+
+    election_data["parties"][0]["general_policies"]["年金"] = "第3世代。"
+    write_shards(election_data, shard_dir)
+    assert not (shard_dir / first).exists()
+    assert (shard_dir / second).exists()
+    assert (shard_dir / _party_file(shard_dir)).exists()
+    assert not list(shard_dir.rglob("*.tmp"))
+
+
+def test_invalid_manifest(tmp_path):
+    (tmp_path / MANIFEST_NAME).write_text('{"format": "other"}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_manifest(tmp_path)
@@ -0,0 +1,73 @@
+"""district_search.py: 前方一致・よみがな・市区町村・誤字許容の選挙区検索"""
+
+import pytest
+
+from district_search import DistrictSearchIndex, district_terms, normalize_text, split_prefecture
+
+
+DISTRICTS = ("千葉1区", "千葉8区", "東京1区", "岡山2区", "北海道1区", "大阪10区")
+AREAS = {"千葉8区": (("柏市", "かしわし"), ("我孫子市", ""))}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DistrictSearchIndex(DISTRICTS, AREAS)
+
+
+def test_normalize_text():
+    assert normalize_text("チバ ８区") == "ちば8区"
+    assert normalize_text("ＡＢＣ") == "abc"
+
+
+def test_split_prefecture():
+    assert split_prefecture("北海道1区") == "北海道"
+    assert split_prefecture("千葉8区") == "千葉"
+    assert split_prefecture("比例東京") is None
+
+
+def test_district_terms_include_readings():
+    terms = district_terms("千葉8区", AREAS["千葉8区"])
+    assert {"千葉8区", "千葉", "千葉県", "ちば", "ちばけん", "ちば8く", "柏市", "かしわし", "我孫子市"} <= set(terms)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("千葉8区", "千葉8区"),
+    ("千葉８区", "千葉8区"),
+    ("ちば8く", "千葉8区"),
+    ("8区", "千葉8区"),
+    ("柏", "千葉8区"),
+    ("かしわし", "千葉8区"),
+    ("ｶｼﾜｼ", "千葉8区"),
+    ("おかやま", "岡山2区"),
+    ("とうきょうと", "東京1区"),
+    ("ほっかいどう", "北海道1区"),
+])
+def test_best_match(index, query, expected):
+    assert index.search(query)[0] == expected
+
+
+def test_prefecture_matches_are_in_name_order(index):
+    assert index.search("ちば") == ["千葉1区", "千葉8区"]
+    assert index.search("チバ") == ["千葉1区", "千葉8区"]
+
+
+def test_typo_tolerance(index):
+    # 1文字の置換・脱字
+    assert index.search("ちぱ") == ["千葉1区", "千葉8区"]
+    assert index.search("おかやな") == ["岡山2区"]
+    assert index.search("かしし") == ["千葉8区"]
+
+
+def test_no_match(index):
+    assert index.search("") == []
+    assert index.search("xyz") == []
+
+
+def test_limit(index):
+    assert len(index.search("区", limit=2)) == 2
+
+
+def test_state_round_trip(index):
+    restored = DistrictSearchIndex.from_state(index.state())
+    for query in ("ちば", "柏", "ちぱ", "大阪10区"):
+        assert restored.search(query) == index.search(query)
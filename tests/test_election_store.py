@@ -0,0 +1,120 @@
+"""election_store.py: コンパイル・索引・解説の対応付け・差分の部分適用"""
+
+from election_store import (
+    compile_election_data,
+    normalize_explanation,
+    patch_election_data,
+    patch_scope,
+)
+
+
+def test_facet_indexes(election_data):
+    store = compile_election_data(election_data, version="v1")
+    assert store.version == "v1"
+    assert store.professions == ("医師", "看護師")
+    assert store.topics == ("年金", "消費税")
+    assert [party.id for party in store.parties_for_profession("看護師")] == ["ldp", "party-2"]
+    assert [party.id for party in store.parties_for_topic("消費税")] == ["ldp", "cdp"]
+    assert store.parties_for_topic("存在しない") == []
+
+
+def test_party_without_fields(election_data):
+    store = compile_election_data(election_data)
+    cdp = store.parties[1]
+    # フィールド自体が無い場合は None（空の辞書とは区別する）
+    assert cdp.personalized is None
+    assert set(cdp.general) == {"消費税"}
+    assert store.parties[2].name == "日本共産党"
+
+
+def test_explanations_are_aligned(election_data):
+    store = compile_election_data(election_data)
+    ldp = store.parties[0]
+    doctor = ldp.personalized["医師"]
+    assert [item.text for item in doctor] == ["地域医療を支える。", "研修制度を見直す。"]
+    assert [item.bullet for item in doctor] == [True, True]
+    assert doctor[1].explanation == "研修先を選びやすくします。財源は予算措置で決まります。"
+
+    nurse = ldp.personalized["看護師"]
+    assert len(nurse) == 1 and not nurse[0].bullet
+    assert nurse[0].explanation == "夜勤手当を見直します。"
+
+    # リスト形式の解説は空の段落を除いて連結する
+    assert ldp.general["消費税"].explanation == "社会保障の財源です。\n\n軽減税率も維持します。"
+    assert ldp.general["年金"].explanation == ""
+
+
+def test_normalize_explanation():
+    assert normalize_explanation(["  a ", "", "b"]) == "a\n\nb"
+    assert normalize_explanation("  text  ") == "text"
+    assert normalize_explanation(None) == ""
+
+
+def test_shared_texts_round_trip(election_data):
+    # 文単位で共有しても、表示される解説は元のテキストと一致する
+    store = compile_election_data(election_data)
+    raw = election_data["parties"][0]["personalized_explanations"]["医師"]
+    assert [item.explanation for item in store.parties[0].personalized["医師"]] == raw
+
+
+def test_invalid_top_level_values_are_ignored():
+    store = compile_election_data({"parties": "x", "districts": []})
+    assert store.parties == ()
+    assert dict(store.districts) == {}
+
+
+def test_duplicate_party_ids_are_made_unique(election_data):
+    election_data["parties"][1]["id"] = "ldp"
+    store = compile_election_data(election_data)
+    ids = [party.id for party in store.parties]
+    assert len(set(ids)) == len(ids)
+    assert ids[0] == "ldp"
+
+
+def test_district_names_and_search(election_data):
+    store = compile_election_data(election_data)
+    assert store.district_names == ("千葉8区", "岡山2区")
+    assert store.district_search.search("かしわし") == ["千葉8区"]
+
+
+def test_candidates_resolve_party_aliases(election_data):
+    store = compile_election_data(election_data)
+    candidates = store.districts["千葉8区"]
+    assert [c.party_id for c in candidates] == ["ldp", "cdp", "party-2"]
+    assert candidates[2].memo == "新人"
+    assert store.districts["岡山2区"][0].party_id is None
+
+    assert [(name, c.name) for name, c in store.candidates_for_party("ldp")] == [("千葉8区", "山田太郎")]
+    assert store.candidate_count("cdp") == 1
+    assert store.candidate_count("unknown") == 0
+
+
+def test_patch_scope():
+    assert patch_scope([["parties", "0", "general_policies", "消費税"], ["districts", "千葉8区", "0"]]) == (
+        frozenset({0}), frozenset({"千葉8区"}))
+    # 政党IDの対応付けが変わる変更・その他の項目は全体を作り直す
+    assert patch_scope([["parties", "0", "name"]]) is None
+    assert patch_scope([["parties", "1"]]) is None
+    assert patch_scope([["district_areas"]]) is None
+
+
+def test_patch_election_data_shares_unchanged_records(election_data):
+    store = compile_election_data(election_data, version="v1")
+    election_data["parties"][0]["general_policies"]["消費税"] = "税率を引き下げる。"
+    election_data["districts"]["千葉8区"][0]["memo"] = "元職"
+
+    patched = patch_election_data(store, election_data, {0}, {"千葉8区"}, "v2")
+    assert patched is not None and patched.version == "v2"
+    assert patched.parties[0].general["消費税"].text == "税率を引き下げる。"
+    assert patched.parties[1] is store.parties[1]
+    assert patched.districts["岡山2区"] is store.districts["岡山2区"]
+    assert patched.districts["千葉8区"][0].memo == "元職"
+    # 元のストアは書き換えない
+    assert store.parties[0].general["消費税"].text == "税率を維持する。"
+    assert store.districts["千葉8区"][0].memo == "現職"
+
+
+def test_patch_election_data_requires_matching_parties(election_data):
+    store = compile_election_data(election_data)
+    election_data["parties"].pop()
+    assert patch_election_data(store, election_data, {0}, (), "v2") is None
@@ -0,0 +1,74 @@
+"""explanation_blob.py: 解説のブロブの書き出しと1件ずつの読み込み、デコードしない内容ハッシュ"""
+
+import pytest
+
+from data_artifact import read_artifact, write_artifact
+from data_diff import StoreFingerprint, content_hash, parts_hash
+from election_store import compile_election_data
+from explanation_blob import ExplanationBlob, ExplanationRef, build_explanation_blob
+from text_table import StringTable
+
+
+TEXTS = [
+    "地方の病院を支援します。財源は予算措置で決まります。",
+    "",
+    "研修先を選びやすくします。財源は予算措置で決まります。",
+    "改行を含む解説です。\n2行目",
+]
+
+
+def test_round_trip():
+    table = StringTable()
+    blob = ExplanationBlob(build_explanation_blob(TEXTS, table))
+    assert len(blob) == len(TEXTS)
+    assert [blob.get(i) for i in range(len(TEXTS))] == TEXTS
+    # 共通の文は1回だけ書き出す
+    assert table.saved_bytes() == len("財源は予算措置で決まります。".encode('utf-8'))
+
+
+def test_blob_after_header():
+    header = b"HEADER"
+    blob = ExplanationBlob(header + build_explanation_blob(TEXTS), base=len(header))
+    assert blob.get(3) == TEXTS[3]
+
+
+def test_empty_blob():
+    blob = ExplanationBlob(build_explanation_blob([]))
+    assert len(blob) == 0
+    with pytest.raises(IndexError):
+        blob.get(0)
+
+
+@pytest.mark.parametrize("buffer", [b"", b"\x01\x00\x00\x00", build_explanation_blob(TEXTS)[:12]])
+def test_invalid_buffer(buffer):
+    with pytest.raises(ValueError):
+        ExplanationBlob(buffer)
+
+
+def test_index_out_of_range():
+    blob = ExplanationBlob(build_explanation_blob(TEXTS))
+    with pytest.raises(IndexError):
+        blob.get(len(TEXTS))
+    with pytest.raises(IndexError):
+        blob.get(-1)
+
+
+def test_parts_hash_matches_decoded_text():
+    ref = ExplanationRef(ExplanationBlob(build_explanation_blob(TEXTS)), 0)
+    assert len(ref.encoded_parts()) == 2
+    assert parts_hash(ref.encoded_parts()) == content_hash(ref.load())
+
+
+def test_fingerprint_does_not_decode_explanations(election_data, tmp_path, monkeypatch):
+    store = compile_election_data(election_data, version="0123456789abcdef")
+    loaded = read_artifact(write_artifact(store, tmp_path / "election_data.bin"))
+
+    def fail(self, index):
+        raise AssertionError("解説をデコードしました")
+
+    monkeypatch.setattr(ExplanationBlob, "get", fail)
+    # JSONからコンパイルしたストア（共有の文の列）と同じハッシュになる
+    fingerprint = StoreFingerprint.from_store(loaded)
+    expected = StoreFingerprint.from_store(store)
+    assert {party_id: fp.leaves for party_id, fp in fingerprint.parties.items()} == \
+        {party_id: fp.leaves for party_id, fp in expected.parties.items()}
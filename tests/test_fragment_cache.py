@@ -0,0 +1,77 @@
+"""fragment_cache.py: バイト数上限付きLRUと、条件に合うエントリの破棄"""
+
+import sys
+
+from fragment_cache import FragmentCache, normalize_selection
+
+
+def html(n: int) -> str:
+    return "x" * n
+
+
+def test_normalize_selection():
+    assert normalize_selection(["看護師", "医師", "看護師"]) == ("医師", "看護師")
+
+
+def test_get_or_render_counts_hits_and_misses():
+    cache = FragmentCache()
+    calls = []
+
+    def render():
+        calls.append(1)
+        return "<div>card</div>"
+
+    assert cache.get_or_render("a", render) == "<div>card</div>"
+    assert cache.get_or_render("a", render) == "<div>card</div>"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == sys.getsizeof("<div>card</div>")
+
+
+def test_evicts_least_recently_used_by_bytes():
+    size = sys.getsizeof(html(100))
+    cache = FragmentCache(max_bytes=size * 2)
+    cache.put("a", html(100))
+    cache.put("b", html(100))
+    # a を参照すると、次に追い出されるのは b
+    cache.get_or_render("a", lambda: "unused")
+    cache.put("c", html(100))
+
+    assert cache.get_or_render("b", lambda: "rendered") == "rendered"
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["entries"] == 2
+
+
+def test_replacing_a_key_updates_bytes():
+    cache = FragmentCache()
+    cache.put("a", html(10))
+    cache.put("a", html(1000))
+    assert cache.stats()["bytes"] == sys.getsizeof(html(1000))
+    assert cache.stats()["entries"] == 1
+
+
+def test_oversized_fragment_is_not_stored():
+    cache = FragmentCache(max_bytes=100)
+    cache.put("big", html(1000))
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_discard_and_clear():
+    cache = FragmentCache()
+    for key in [("ldp", "v1"), ("cdp", "v1"), ("ldp", "v2")]:
+        cache.put(key, html(10))
+
+    assert cache.discard(lambda key: key[0] == "ldp") == 2
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == sys.getsizeof(html(10))
+
+    cache.get_or_render(("cdp", "v2"), lambda: html(10))
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+    # カウンターは維持する
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,125 @@
+"""json_patch.py: RFC 6902 の各操作と、元の文書を書き換えない適用"""
+
+import copy
+
+import pytest
+
+from json_patch import JsonPatchError, apply_patch, parse_pointer
+
+
+DOCUMENT = {
+    "parties": [{"id": "a", "tags": ["x"]}, {"id": "b"}],
+    "districts": {"千葉8区": [{"name": "山田"}], "岡山2区": []},
+    "a/b": {"~c": 1},
+}
+
+
+@pytest.fixture
+def document():
+    return copy.deepcopy(DOCUMENT)
+
+
+def test_parse_pointer():
+    assert parse_pointer("") == []
+    assert parse_pointer("/a~1b/~0c") == ["a/b", "~c"]
+    with pytest.raises(JsonPatchError):
+        parse_pointer("parties")
+    with pytest.raises(JsonPatchError):
+        parse_pointer(1)
+
+
+def test_operations(document):
+    patched, changed = apply_patch(document, [
+        {"op": "replace", "path": "/parties/0/id", "value": "c"},
+        {"op": "add", "path": "/parties/0/tags/-", "value": "y"},
+        {"op": "add", "path": "/parties/1", "value": {"id": "new"}},
+        {"op": "remove", "path": "/districts/岡山2区"},
+        {"op": "copy", "from": "/districts/千葉8区/0", "path": "/districts/千葉8区/-"},
+        {"op": "move", "from": "/a~1b/~0c", "path": "/moved"},
+        {"op": "test", "path": "/parties/0/id", "value": "c"},
+    ])
+    assert patched == {
+        "parties": [{"id": "c", "tags": ["x", "y"]}, {"id": "new"}, {"id": "b"}],
+        "districts": {"千葉8区": [{"name": "山田"}, {"name": "山田"}]},
+        "a/b": {},
+        "moved": 1,
+    }
+    # move は移動元も変更されたパスに含める（test は含めない）
+    assert changed == [["parties", "0", "id"], ["parties", "0", "tags", "-"], ["parties", "1"],
+                       ["districts", "岡山2区"], ["districts", "千葉8区", "-"], ["a/b", "~c"], ["moved"]]
+
+
+def test_original_is_not_modified_and_unchanged_parts_are_shared(document):
+    patched, _ = apply_patch(document, [{"op": "replace", "path": "/parties/1/id", "value": "z"}])
+    assert document == DOCUMENT
+    assert patched["parties"][1] == {"id": "z"}
+    assert patched["parties"] is not document["parties"]
+    # 変更した経路の外側は複製しない
+    assert patched["parties"][0] is document["parties"][0]
+    assert patched["districts"] is document["districts"]
+
+
+def test_copied_value_is_independent(document):
+    patched, _ = apply_patch(document, [
+        {"op": "copy", "from": "/parties/0", "path": "/parties/-"},
+        {"op": "add", "path": "/parties/2/tags/-", "value": "only-copy"},
+    ])
+    assert patched["parties"][0]["tags"] == ["x"]
+    assert patched["parties"][2]["tags"] == ["x", "only-copy"]
+
+
+def test_replace_whole_document(document):
+    patched, changed = apply_patch(document, [{"op": "replace", "path": "", "value": {"parties": []}}])
+    assert patched == {"parties": []}
+    assert changed == [[]]
+
+
+@pytest.mark.parametrize("operations", [
+    {"op": "add"},
+    [{"op": "replace", "path": "/missing", "value": 1}],
+    [{"op": "remove", "path": "/parties/2"}],
+    [{"op": "add", "path": "/parties/01", "value": 1}],
+    [{"op": "add", "path": "/parties/0/id/x", "value": 1}],
+    [{"op": "add", "path": "/parties/0"}],
+    [{"op": "remove", "path": ""}],
+    [{"op": "move", "from": "/parties", "path": "/parties/0"}],
+    [{"op": "unknown", "path": "/parties"}],
+    ["replace"],
+])
+def test_invalid_patches(document, operations):
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, operations)
+    assert document == DOCUMENT
+
+
+def test_failed_test_rejects_whole_patch(document):
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, [
+            {"op": "replace", "path": "/parties/0/id", "value": "changed"},
+            {"op": "test", "path": "/parties/1/id", "value": "not-b"},
+        ])
+    assert document == DOCUMENT
+
+
+@pytest.mark.parametrize("actual, expected, equal", [
+    (1, 1, True),
+    (1, True, False),
+    (0, False, False),
+    (1, 1.0, False),
+    (None, 0, False),
+    ("1", 1, False),
+    ([1, [True]], [1, [True]], True),
+    ([1, [True]], [1, [1]], False),
+    ([1], [1, 1], False),
+    ({"a": {"b": 1}}, {"a": {"b": 1}}, True),
+    ({"a": {"b": 1}}, {"a": {"b": 1.0}}, False),
+    ({"a": 1}, {"a": 1, "b": 2}, False),
+])
+def test_test_operation_compares_types(actual, expected, equal):
+    document = {"value": actual}
+    operations = [{"op": "test", "path": "/value", "value": expected}]
+    if equal:
+        assert apply_patch(document, operations)[0] is document
+    else:
+        with pytest.raises(JsonPatchError):
+            apply_patch(document, operations)
@@ -0,0 +1,58 @@
+"""json_stream.py: 逐次読み込みのイベント（バッファの境界をまたいでも json.loads と同じ値になること）"""
+
+import io
+import json
+
+import pytest
+
+from json_stream import JsonStreamError, iter_events
+
+
+DOCUMENT = {
+    "parties": [{"name": "政党\"A\"", "tags": ["x", "y"]}, {"name": "政党B", "memo": None}],
+    "version": 3,
+    "districts": {"千葉8区": [{"name": "山田"}], "空": []},
+    "district_areas": {"千葉8区": ["柏市"]},
+}
+
+
+def events(text, chunk_size=7, sources=False):
+    return list(iter_events(io.StringIO(text), ("parties", "districts"), chunk_size=chunk_size, sources=sources))
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_events(indent, chunk_size):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent)
+    assert events(text, chunk_size) == [
+        ("start", "parties", None, []),
+        ("item", "parties", 0, DOCUMENT["parties"][0]),
+        ("item", "parties", 1, DOCUMENT["parties"][1]),
+        ("end", "parties", None, None),
+        ("member", "version", None, 3),
+        ("start", "districts", None, {}),
+        ("item", "districts", "千葉8区", [{"name": "山田"}]),
+        ("item", "districts", "空", []),
+        ("end", "districts", None, None),
+        ("member", "district_areas", None, {"千葉8区": ["柏市"]}),
+    ]
+
+
+def test_sources_are_the_raw_item_text():
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+    for kind, key, name, value, source in events(text, sources=True):
+        if kind == "item":
+            assert json.loads(source) == value
+            assert source in text
+        else:
+            assert source is None
+
+
+def test_streamed_key_with_other_type_is_a_member():
+    assert events('{"parties": "x"}') == [("member", "parties", None, "x")]
+
+
+@pytest.mark.parametrize("text", ['{"parties": [1,]}', '{"parties": [1}', '[1]', '{"a": 1} x', '{"a" 1}', ''])
+def test_syntax_errors(text):
+    with pytest.raises(JsonStreamError):
+        events(text)
@@ -0,0 +1,101 @@
+"""policy_search.py: 政策・解説の全文検索（インデックスは解説のテキストを持たない）"""
+
+import pytest
+
+from data_artifact import read_artifact, write_artifact
+from election_store import compile_election_data
+from explanation_blob import ExplanationBlob
+from policy_search import (
+    FIELD_EXPLANATION,
+    FIELD_POLICY,
+    PolicySearchIndex,
+    collect_documents,
+    ngrams,
+    normalize_for_search,
+    render_snippet,
+)
+
+
+@pytest.fixture
+def store(election_data):
+    election_data["parties"][1]["general_explanations"] = {"消費税": "**食料品**の税率をゼロにします。"}
+    return compile_election_data(election_data)
+
+
+def hits(index, query):
+    return [(hit.document.party_id, hit.document.key, hit.document.field, hit.count)
+            for hit in index.search(query)]
+
+
+def test_normalize_for_search_keeps_length():
+    text = "ＡＢＣタスクシフト１"
+    normalized = normalize_for_search(text)
+    assert normalized == "abcたすくしふと1"
+    assert len(normalized) == len(text)
+
+
+def test_collect_documents(store):
+    documents = collect_documents(store)
+    # 解説の無い項目は政策本文だけ
+    assert [(doc.key, doc.field) for doc in documents if doc.party_id == "cdp"] == \
+        [("消費税", FIELD_POLICY), ("消費税", FIELD_EXPLANATION)]
+    # 太字記法は除去する
+    assert [doc.text for doc in documents if doc.party_id == "cdp"][1] == "食料品の税率をゼロにします。"
+
+
+def test_search(store):
+    index = PolicySearchIndex.from_store(store)
+    # 政策本文の一致を解説より優先する
+    assert hits(index, "税率") == [("ldp", "消費税", FIELD_POLICY, 1), ("cdp", "消費税", FIELD_POLICY, 1),
+                                 ("ldp", "消費税", FIELD_EXPLANATION, 1), ("cdp", "消費税", FIELD_EXPLANATION, 1)]
+    assert hits(index, "予算措置 研修") == [("ldp", "医師", FIELD_EXPLANATION, 2)]
+    assert hits(index, "ケンシュウ") == []
+    assert hits(index, "措") == [("ldp", "医師", FIELD_EXPLANATION, 1)] * 2
+    assert hits(index, "存在しない語") == []
+    assert hits(index, "  ") == []
+
+
+def test_snippet_marks_terms():
+    text = "食料品の税率を下げる。"
+    assert render_snippet(text, normalize_for_search(text), ["税率"]) == "食料品の<mark>税率</mark>を下げる。"
+    long_text = "あ" * 40 + "税率" + "い" * 40
+    snippet = render_snippet(long_text, normalize_for_search(long_text), ["税率"])
+    assert snippet.startswith("…") and snippet.endswith("…") and "<mark>税率</mark>" in snippet
+
+
+def test_index_keeps_no_explanation_text(store, tmp_path, monkeypatch):
+    loaded = read_artifact(write_artifact(store, tmp_path / "election_data.bin"))
+    index = PolicySearchIndex.from_store(loaded)
+    assert not any(isinstance(value, str) and "予算措置" in value for value in vars(index).values())
+
+    decoded = []
+    get = ExplanationBlob.get
+    monkeypatch.setattr(ExplanationBlob, "get", lambda self, i: decoded.append(i) or get(self, i))
+    # 検索では、n-gramで絞り込んだ文書の解説だけを読み込む
+    assert hits(index, "研修先") == [("ldp", "医師", FIELD_EXPLANATION, 1)]
+    assert len(decoded) == 1
+    assert hits(index, "研修先") == hits(PolicySearchIndex.from_store(store), "研修先")
+
+
+def postings_of_whole_texts(index):
+    postings = {}
+    for doc_id, document in enumerate(index.documents):
+        for gram in ngrams(normalize_for_search(document.text)):
+            postings.setdefault(gram, []).append(doc_id)
+    return {gram: tuple(ids) for gram, ids in postings.items()}
+
+
+def test_index_is_built_from_shared_segments(store, tmp_path, monkeypatch):
+    loaded = read_artifact(write_artifact(store, tmp_path / "election_data.bin"))
+    decoded = []
+    encoded_segment = ExplanationBlob.encoded_segment
+    monkeypatch.setattr(ExplanationBlob, "encoded_segment",
+                        lambda self, i: decoded.append(i) or encoded_segment(self, i))
+    index = PolicySearchIndex.from_store(loaded)
+    # 共通の文（財源は予算措置で決まります。）も1回だけデコードする
+    assert decoded and len(decoded) == len(set(decoded))
+
+    # 文ごとに作ったn-gramは、文書全体を正規化して作ったものと一致する
+    assert index._postings == postings_of_whole_texts(index)
+    json_index = PolicySearchIndex.from_store(store)
+    assert json_index._postings == postings_of_whole_texts(json_index)
@@ -0,0 +1,133 @@
+"""postal_resolver.py: CSVから作るバイナリ表と、郵便番号・市区町村名からの選挙区の解決"""
+
+import os
+
+import pytest
+
+from postal_resolver import (
+    PostalResolver,
+    build_postal_table,
+    load_postal_resolver,
+    normalize_municipality,
+    normalize_postal_code,
+    postal_table_is_stale,
+)
+
+
+CSV = """postal_code,municipality,district
+277-0005,柏市,千葉8区
+2770871,柏市,千葉8区
+270-1151,我孫子市,千葉8区
+100-0001,千代田区,東京1区
+999-9999,分割市,A区
+999-9999,分割市,B区
+,市区町村だけ,C区
+123-4567,,
+"""
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    csv_path = tmp_path / "postal_districts.csv"
+    csv_path.write_text(CSV, encoding='utf-8')
+    resolver = PostalResolver(build_table(csv_path))
+    yield resolver
+    resolver.close()
+
+
+def build_table(csv_path):
+    out_path = csv_path.with_suffix(".bin")
+    build_postal_table(csv_path, out_path)
+    return out_path
+
+
+def test_normalize_postal_code():
+    assert normalize_postal_code("〒277-0005") == 2770005
+    assert normalize_postal_code("２７７－０００５") == 2770005
+    assert normalize_postal_code("277-000") is None
+    assert normalize_postal_code("柏市") is None
+
+
+def test_normalize_municipality():
+    assert normalize_municipality(" 柏 市 ") == "柏市"
+    assert normalize_municipality("ｶｼﾜ") == "カシワ"
+
+
+def test_postal_lookup(resolver):
+    assert resolver.districts_for_postal("277-0005") == ["千葉8区"]
+    assert resolver.districts_for_postal("２７０１１５１") == ["千葉8区"]
+    assert resolver.districts_for_postal("999-9999") == ["A区", "B区"]
+    assert resolver.districts_for_postal("000-0000") == []
+    assert resolver.districts_for_postal("abc") == []
+    # 選挙区の無い行は登録しない
+    assert resolver.districts_for_postal("123-4567") == []
+
+
+def test_municipality_lookup(resolver):
+    assert resolver.districts_for_municipality("柏市") == ["千葉8区"]
+    assert resolver.districts_for_municipality(" 我孫子市") == ["千葉8区"]
+    assert resolver.districts_for_municipality("分割市") == ["A区", "B区"]
+    assert resolver.districts_for_municipality("市区町村だけ") == ["C区"]
+    assert resolver.districts_for_municipality("柏") == []
+    assert resolver.districts_for_municipality("") == []
+
+
+def test_counts(resolver):
+    # 同じ市区町村と選挙区の組（柏市 → 千葉8区）は1件にまとめる
+    assert len(resolver) == 6 + 6
+    assert resolver.has_postal_codes and resolver.has_municipalities
+
+
+def test_header_only_csv(tmp_path):
+    csv_path = tmp_path / "postal_districts.csv"
+    csv_path.write_text("postal_code,municipality,district\n", encoding='utf-8')
+    table_path = build_table(csv_path)
+    resolver = PostalResolver(table_path)
+    assert len(resolver) == 0
+    assert not resolver.has_postal_codes and not resolver.has_municipalities
+    assert resolver.districts_for_postal("277-0005") == []
+    assert resolver.districts_for_municipality("柏市") == []
+    resolver.close()
+    # 登録が無ければ検索は無効
+    assert load_postal_resolver(csv_path, table_path) is None
+
+
+def test_build_uses_a_per_process_temporary_file(tmp_path):
+    csv_path = tmp_path / "postal_districts.csv"
+    csv_path.write_text(CSV, encoding='utf-8')
+    build_table(csv_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["postal_districts.bin", "postal_districts.csv"]
+
+
+def test_load_does_not_build_and_ignores_stale_table(tmp_path):
+    csv_path = tmp_path / "postal_districts.csv"
+    table_path = tmp_path / "postal_districts.bin"
+    csv_path.write_text("postal_code,municipality,district\n277-0005,柏市,千葉8区\n", encoding='utf-8')
+    # アプリからは作成しない
+    assert postal_table_is_stale(csv_path, table_path)
+    assert load_postal_resolver(csv_path, table_path) is None
+    assert not table_path.exists()
+
+    build_postal_table(csv_path, table_path)
+    first = load_postal_resolver(csv_path, table_path)
+    assert first.districts_for_postal("2770005") == ["千葉8区"]
+    first.close()
+
+    # CSVの方が新しければ、作り直すまで無効
+    csv_path.write_text("postal_code,municipality,district\n277-0005,柏市,千葉9区\n", encoding='utf-8')
+    stat = csv_path.stat()
+    os.utime(table_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+    assert postal_table_is_stale(csv_path, table_path)
+    assert load_postal_resolver(csv_path, table_path) is None
+
+    build_postal_table(csv_path, table_path)
+    second = load_postal_resolver(csv_path, table_path)
+    assert second.districts_for_postal("2770005") == ["千葉9区"]
+    second.close()
+
+
+def test_invalid_table(tmp_path):
+    path = tmp_path / "broken.bin"
+    path.write_bytes(b"XXXX" + bytes(12))
+    with pytest.raises(ValueError):
+        PostalResolver(path)
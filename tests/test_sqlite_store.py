@@ -0,0 +1,84 @@
+"""sqlite_store.py: SQLiteから候補者を読むストア（メモリ保持と同じ内容になること）と候補者の全文検索"""
+
+import threading
+
+import pytest
+
+from election_store import BACKEND_SQLITE, compile_election_data
+from sqlite_store import compile_sqlite_store, database_path, read_database_version
+
+
+def candidates(store):
+    return {name: [(c.name, c.party, c.memo, c.party_id) for c in records]
+            for name, records in store.districts.items()}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return database_path(tmp_path / "election_data.json")
+
+
+def test_database_path(tmp_path):
+    assert database_path(tmp_path / "election_data.json") == tmp_path / "election_data.sqlite"
+
+
+def test_matches_in_memory_store(election_data, db_path):
+    store = compile_sqlite_store(election_data, db_path, version="v1")
+    expected = compile_election_data(election_data, version="v1")
+    assert store.backend == BACKEND_SQLITE and store.lazy_candidates
+    assert read_database_version(db_path) == "v1"
+
+    assert list(store.districts) == list(expected.districts)
+    assert candidates(store) == candidates(expected)
+    assert "千葉8区" in store.districts and "東京1区" not in store.districts
+    with pytest.raises(KeyError):
+        store.districts["東京1区"]
+
+    for party in expected.parties:
+        assert [(d, c.name) for d, c in store.candidates_for_party(party.id)] == \
+            [(d, c.name) for d, c in expected.candidates_for_party(party.id)]
+        assert store.candidate_count(party.id) == expected.candidate_count(party.id)
+    assert [party.id for party in store.parties] == [party.id for party in expected.parties]
+
+
+def test_database_is_rebuilt_only_when_version_changes(election_data, db_path):
+    compile_sqlite_store(election_data, db_path, version="v1")
+    mtime = db_path.stat().st_mtime_ns
+    compile_sqlite_store(election_data, db_path, version="v1")
+    assert db_path.stat().st_mtime_ns == mtime
+
+    election_data["districts"]["岡山2区"][0]["memo"] = "元職"
+    store = compile_sqlite_store(election_data, db_path, version="v2")
+    assert read_database_version(db_path) == "v2"
+    assert store.districts["岡山2区"][0].memo == "元職"
+    assert not list(db_path.parent.glob("*.tmp"))
+
+
+def test_read_database_version_of_missing_or_foreign_file(tmp_path):
+    assert read_database_version(tmp_path / "missing.sqlite") is None
+    foreign = tmp_path / "foreign.sqlite"
+    foreign.write_bytes(b"not a database")
+    assert read_database_version(foreign) is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("山田太郎", ["千葉8区"]),  # FTS5（3文字以上）
+    ("田中", ["岡山2区"]),      # 部分一致（3文字未満）
+    ("現職", ["千葉8区"]),      # メモ
+    ("100%", []),
+    ("", []),
+])
+def test_search_candidates(election_data, db_path, query, expected):
+    store = compile_sqlite_store(election_data, db_path, version="v1")
+    assert store.districts.search_candidates(query) == expected
+
+
+def test_each_thread_uses_its_own_connection(election_data, db_path):
+    store = compile_sqlite_store(election_data, db_path, version="v1")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(candidates(store))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [candidates(store)] * 4
@@ -0,0 +1,76 @@
+"""static_export.py: 内容ハッシュ名の断片と、1つ前の世代を残す書き出し"""
+
+import json
+
+import pytest
+
+from election_store import compile_election_data
+from static_export import STATIC_FORMAT, export_static_site
+
+
+def read_site(out_dir):
+    return json.loads((out_dir / "data" / "site.json").read_text(encoding='utf-8'))
+
+
+def fragment_files(site):
+    return {entry["file"] for key in ("professions", "topics", "districts") for entry in site[key]}
+
+
+def export(data, out_dir, version):
+    return export_static_site(compile_election_data(data, version=version), out_dir)
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    return tmp_path / "site"
+
+
+def test_export_layout(election_data, out_dir):
+    result = export(election_data, out_dir, "v1")
+    site = read_site(out_dir)
+    assert site["format"] == STATIC_FORMAT and site["version"] == "v1"
+    assert [entry["name"] for entry in site["professions"]] == ["医師", "看護師"]
+    assert [party["id"] for party in site["parties"]] == ["ldp", "cdp", "party-2"]
+    assert site["parties"][1]["personalized"] is False
+    for name in ("index.html", "compose.js", "styles.css"):
+        assert (out_dir / name).exists()
+    for relative in fragment_files(site):
+        assert (out_dir / relative).exists()
+    assert result["files"] == len(fragment_files(site)) + 4
+
+    doctor = json.loads((out_dir / site["professions"][0]["file"]).read_text(encoding='utf-8'))
+    assert set(doctor["plain"]) == {"ldp"}
+    # 解説ありの断片は解説なしと異なる場合だけ持つ
+    assert set(doctor["explained"]) == {"ldp"}
+    assert not list(out_dir.rglob("*.tmp"))
+
+
+def test_unchanged_fragments_keep_their_names(election_data, out_dir):
+    export(election_data, out_dir, "v1")
+    first = read_site(out_dir)
+    election_data["districts"]["岡山2区"][0]["memo"] = "元職"
+    export(election_data, out_dir, "v2")
+    second = read_site(out_dir)
+
+    assert first["professions"] == second["professions"]
+    assert first["topics"] == second["topics"]
+    changed = {entry["name"] for old, entry in zip(first["districts"], second["districts"]) if old != entry}
+    assert changed == {"岡山2区"}
+
+
+def test_previous_generation_is_kept_then_pruned(election_data, out_dir):
+    export(election_data, out_dir, "v1")
+    first = fragment_files(read_site(out_dir))
+
+    election_data["districts"]["岡山2区"][0]["memo"] = "第2世代"
+    export(election_data, out_dir, "v2")
+    second = fragment_files(read_site(out_dir))
+    # 1つ前の対応表を読んだブラウザのために、古い断片も残す
+    assert all((out_dir / relative).exists() for relative in first | second)
+
+    election_data["districts"]["岡山2区"][0]["memo"] = "第3世代"
+    export(election_data, out_dir, "v3")
+    third = fragment_files(read_site(out_dir))
+    remaining = {path.relative_to(out_dir).as_posix() for path in (out_dir / "data").glob("*/*")}
+    assert remaining == second | third
+    assert first - second - third
@@ -0,0 +1,72 @@
+"""text_table.py: 文単位の分割と共有（連結すれば元のテキストに戻ること）"""
+
+import pytest
+
+from text_table import SegmentedText, StringTable, count_segments, split_segments
+
+
+TEXTS = [
+    "地方の病院を支援します。財源は予算措置で決まります。",
+    "研修先を選びやすくします！財源は予算措置で決まります。",
+    "本当に？\n\n改行を含む解説です。末尾に句点なし",
+    "。。先頭が句点",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_split_round_trip(text):
+    assert "".join(split_segments(text)) == text
+
+
+def test_split_segments():
+    assert split_segments("一文目。二文目！三文目？？四文目") == ["一文目。", "二文目！", "三文目？？", "四文目"]
+    assert split_segments("段落1\n\n段落2") == ["段落1\n\n", "段落2"]
+    assert split_segments("") == []
+
+
+def test_count_segments_counts_each_text_once():
+    counts = count_segments(TEXTS[:2] + TEXTS[:1])
+    assert counts["財源は予算措置で決まります。"] == 2
+    assert counts["地方の病院を支援します。"] == 1
+
+
+def test_share_returns_one_object_per_content():
+    table = StringTable()
+    first = table.share("".join(["同じ", "内容"]))
+    second = table.share("".join(["同じ", "内", "容"]))
+    assert first is second
+    assert len(table) == 1
+    assert table.total_bytes == 2 * len("同じ内容".encode('utf-8'))
+    assert table.saved_bytes() == len("同じ内容".encode('utf-8'))
+
+
+def test_segments_are_shared_across_texts():
+    table = StringTable()
+    a = table.segments(TEXTS[0])
+    b = table.segments(TEXTS[1])
+    assert a[-1] is b[-1]
+    assert SegmentedText(a).load() == TEXTS[0]
+    assert [table.strings[i] for i in table.segment_ids(TEXTS[1])] == list(b)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_pieces_round_trip(text):
+    table = StringTable()
+    counts = count_segments(TEXTS)
+    assert "".join(table.pieces(text, counts)) == text
+
+
+def test_pieces_split_only_common_sentences():
+    long_common = "".join(f"この定型文{i}は複数の政党の解説にそのまま繰り返し現れるため、共有すると解説全体の大きさを減らせます。"
+                          for i in range(4))
+    # 共通の文が2テキストだけだと参照の列の方が大きくなるため、4テキストで共有する
+    texts = [f"固有の文その{i}です。" + long_common for i in range(1, 5)]
+    table = StringTable()
+    counts = count_segments(texts)
+    first = table.pieces(texts[0], counts)
+    second = table.pieces(texts[1], counts)
+    assert first[0] == "固有の文その1です。"
+    assert first[1] is second[1]
+    # 共通の文が無いテキストは1要素のまま
+    assert table.pieces("どこにも無い文。別の文。", counts) == ("どこにも無い文。別の文。",)
@@ -0,0 +1,138 @@
+"""validate_data.py: 検証結果と統計情報（一括・並列・逐次解析で同じになること）、政党・選挙区ごとの検証キャッシュ"""
+
+import json
+import sys
+
+import pytest
+
+import validate_data
+from json_stream import JsonStreamError
+from validate_data import (
+    ValidationCache,
+    get_statistics,
+    parse_with_sources,
+    validate_document,
+    validate_stream,
+    validate_structure,
+)
+
+
+@pytest.fixture
+def broken_data(election_data):
+    """問題点を含むデータ"""
+    del election_data["parties"][1]["name"]
+    election_data["parties"][0]["personalized_policies"] = "リストではない"
+    election_data["districts"]["千葉8区"][2] = {"name": "鈴木一郎"}
+    election_data["districts"]["空の区"] = []
+    election_data["district_areas"]["存在しない区"] = [{"name": "どこか市"}]
+    return election_data
+
+
+def test_document_matches_structure_and_statistics(broken_data):
+    issues, stats = validate_document(broken_data)
+    assert issues
+    assert issues == validate_structure(broken_data)
+    assert stats == get_statistics(broken_data)
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_parse_with_sources(broken_data, indent):
+    text = json.dumps(broken_data, ensure_ascii=False, indent=indent)
+    data, sources = parse_with_sources(text)
+    assert data == json.loads(text)
+    assert [json.loads(source) for source in sources["parties"]] == broken_data["parties"]
+    assert {name: json.loads(source) for name, source in sources["districts"].items()} == broken_data["districts"]
+
+
+def test_parse_with_sources_errors():
+    with pytest.raises(json.JSONDecodeError):
+        parse_with_sources('{"parties": [}')
+    # トップレベルが辞書でなければ元のテキストなしで返す（検証で指摘する）
+    assert parse_with_sources("[1]") == ([1], {})
+
+
+def test_cache_revalidates_only_changed_items(broken_data, write_json, tmp_path):
+    cache_path = tmp_path / "election_data.validation_cache.json"
+    path = write_json(broken_data, "election_data.json", indent=2)
+    data, sources = parse_with_sources(path.read_text(encoding='utf-8'))
+    cache = ValidationCache.load(cache_path)
+    first = validate_document(data, cache=cache, sources=sources)
+    cache.save()
+    assert (cache.hits, cache.misses) == (0, len(data["parties"]) + len(data["districts"]))
+
+    broken_data["districts"]["岡山2区"][0]["memo"] = "元職"
+    path = write_json(broken_data, "election_data.json", indent=2)
+    data, sources = parse_with_sources(path.read_text(encoding='utf-8'))
+    cache = ValidationCache.load(cache_path)
+    second = validate_document(data, cache=cache, sources=sources)
+    assert (cache.hits, cache.misses) == (len(data["parties"]) + len(data["districts"]) - 1, 1)
+    assert second == validate_document(data)
+    assert second[0] == first[0]
+
+
+def test_cache_is_discarded_when_validator_changes(tmp_path, monkeypatch):
+    cache_path = tmp_path / "election_data.validation_cache.json"
+    cache = ValidationCache(cache_path)
+    cache.store("party[0]", "fingerprint", [], {})
+    cache.save()
+    assert ValidationCache.load(cache_path).lookup("party[0]", "fingerprint") == ([], {})
+
+    monkeypatch.setattr(ValidationCache, "validator_hash", staticmethod(lambda: "changed"))
+    assert ValidationCache.load(cache_path).lookup("party[0]", "fingerprint") is None
+
+
+def run_main(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, "argv", ["validate_data.py", *map(str, args), "--no-compile"])
+    with pytest.raises(SystemExit):
+        validate_data.main()
+    return capsys.readouterr().out
+
+
+def test_file_summary_is_kept_per_mode(election_data, write_json, monkeypatch, capsys):
+    # キーが無いことは逐次解析では最後まで読まないと分からないため、問題点の並び順が一括解析と異なる
+    del election_data["parties"]
+    election_data["districts"]["名前なし区"] = [{"party": "自民"}]
+    path = write_json(election_data)
+
+    streamed = run_main(monkeypatch, capsys, path, "--stream")
+    assert streamed.index("'parties' キーが存在しません") > streamed.index("名前なし区")
+    # 同じファイルでも、逐次解析の結果（並び順）を一括解析で使い回さない
+    in_memory = run_main(monkeypatch, capsys, path)
+    assert in_memory.index("'parties' キーが存在しません") < in_memory.index("名前なし区")
+    # 2回目以降はそれぞれの方法の結果をそのまま使う
+    assert run_main(monkeypatch, capsys, path).split("♻️")[0] == in_memory.split("♻️")[0]
+
+
+def test_parallel_matches_serial(broken_data):
+    assert validate_document(broken_data, jobs=2) == validate_document(broken_data)
+
+
+def _stream(path, cache=None):
+    stats = get_statistics({})
+    issues = list(validate_stream(path, stats, cache))
+    return issues, stats
+
+
+def test_stream_matches_document(broken_data, write_json):
+    path = write_json(broken_data, "election_data.json", indent=2)
+    assert _stream(path) == validate_document(broken_data)
+
+
+def test_stream_shares_the_per_item_cache(broken_data, write_json, tmp_path):
+    cache_path = tmp_path / "election_data.validation_cache.json"
+    path = write_json(broken_data, "election_data.json", indent=2)
+    data, sources = parse_with_sources(path.read_text(encoding='utf-8'))
+    cache = ValidationCache.load(cache_path)
+    expected = validate_document(data, cache=cache, sources=sources)
+    cache.save()
+
+    cache = ValidationCache.load(cache_path)
+    assert _stream(path, cache) == expected
+    assert cache.misses == 0
+
+
+def test_stream_syntax_error(tmp_path):
+    path = tmp_path / "election_data.json"
+    path.write_text('{"parties": [{"name": "a"}, }', encoding='utf-8')
+    with pytest.raises(JsonStreamError):
+        _stream(path)
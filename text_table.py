@@ -0,0 +1,126 @@
+"""
+政策・解説テキストの重複除去
+解説には「具体化のタイミングは、予算措置や次回の報酬改定・制度改正で決まります。」のような定型文が
+政党・職種をまたいでそのまま繰り返されるため、文（句点・改行）単位に分けて共有の文字列表にまとめ、
+各項目はその参照だけを持つようにします
+
+分割は区切り文字を直前の文に含めるだけなので、連結すれば元のテキストと完全に一致します
+"""
+
+import re
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+
+# 文の区切り（句点・感嘆符・疑問符の連続、または改行の連続までを1つの文とする）
+_SEGMENT_PATTERN = re.compile(r"[^。！？\n]*(?:[。！？]+|\n+|$)")
+
+
+def split_segments(text: str) -> List[str]:
+    """テキストを文単位に分割（"".join(結果) == text）"""
+    return [segment for segment in _SEGMENT_PATTERN.findall(text) if segment]
+
+
+def count_segments(texts: Iterable[str]) -> Counter:
+    """文ごとの出現数（同じテキストは1回として数える）"""
+    counts: Counter = Counter()
+    for text in set(texts):
+        counts.update(split_segments(text))
+    return counts
+
+
+class SegmentedText:
+    """
+    共有の文字列表の文を並べた解説（PolicyItem.explanation を参照した時点で連結する）
+    """
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: Tuple[str, ...]):
+        self.segments = segments
+
+    def load(self) -> str:
+        return "".join(self.segments)
+
+    def encoded_parts(self) -> List[bytes]:
+        return [segment.encode('utf-8') for segment in self.segments]
+
+    def shared_segments(self, decoded: Dict) -> Tuple[str, ...]:
+        return self.segments
+
+
+_SEGMENTED_TEXT_SIZE = sys.getsizeof(SegmentedText(()))
+
+
+class StringTable:
+    """
+    文字列・文の共有表（同じ内容は1つのオブジェクト・1つの番号にまとめる）
+    登録されたテキストの延べバイト数と、重複を除いた後のバイト数を数える
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.unique_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def _intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+            self.unique_bytes += len(value.encode('utf-8'))
+        return string_id
+
+    def _count(self, text: str):
+        self.total_bytes += len(text.encode('utf-8'))
+
+    def share(self, text: str) -> str:
+        """テキスト全体を共有し、表にある同じ内容のオブジェクトを返す"""
+        self._count(text)
+        return self.strings[self._intern(text)]
+
+    def segment_ids(self, text: str) -> Tuple[int, ...]:
+        """テキストを文単位で登録し、文の番号の列を返す"""
+        self._count(text)
+        return tuple(self._intern(segment) for segment in split_segments(text))
+
+    def segments(self, text: str) -> Tuple[str, ...]:
+        """テキストを文単位で登録し、共有された文の列を返す"""
+        return tuple(self.strings[i] for i in self.segment_ids(text))
+
+    def pieces(self, text: str, counts: Counter) -> Tuple[str, ...]:
+        """
+        テキストを、他のテキストと共通の文と、それ以外の部分（連続する固有の文をまとめたもの）に分けて共有する
+        参照の列にしてもメモリが減らない場合（共通の文が無い・短い）はテキスト全体の1要素にする
+        """
+        pieces: List[str] = []
+        # 分割した場合の大きさ（共通の文は出現数で割って按分する）
+        size = _SEGMENTED_TEXT_SIZE
+        unique_run: List[str] = []
+        for segment in split_segments(text):
+            if counts[segment] > 1:
+                if unique_run:
+                    pieces.append("".join(unique_run))
+                    size += sys.getsizeof(pieces[-1])
+                    unique_run = []
+                pieces.append(segment)
+                size += sys.getsizeof(segment) / counts[segment]
+            else:
+                unique_run.append(segment)
+        if unique_run:
+            pieces.append("".join(unique_run))
+            size += sys.getsizeof(pieces[-1])
+        size += sys.getsizeof(tuple(pieces))
+
+        if len(pieces) <= 1 or size >= sys.getsizeof(text):
+            return (self.share(text),)
+        self._count(text)
+        return tuple(self.strings[self._intern(piece)] for piece in pieces)
+
+    def saved_bytes(self) -> int:
+        """重複除去で減ったUTF-8のバイト数"""
+        return self.total_bytes - self.unique_bytes
@@ -2,12 +2,34 @@
 """
 election_data.json の構造を検証するスクリプト
 Geminiが生成したデータが正しい形式かチェックします
+
+使い方:
+    python validate_data.py                      # election_data.json を検証し、election_data.bin を作成
+    python validate_data.py --no-compile         # 検証のみ
+    python validate_data.py election_data/       # 分割形式（マニフェスト＋シャード）を検証
+    python validate_data.py --full               # 前回の検証結果を使わずすべて検証し直す
+    python validate_data.py election_data/ -j 8  # 8プロセスで並列に検証
+    python validate_data.py --stream             # 巨大なファイルを逐次解析して検証（メモリ使用量を抑える）
+
+前回の検証結果は政党・選挙区ごとの内容ハッシュ（分割形式ではシャードのハッシュ）とともに
+election_data.validation_cache.json に保存し、変更のあった政党・選挙区だけを検証し直します
 """
 
+import argparse
+import hashlib
+import io
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
+
+from data_artifact import artifact_path, compile_artifact, read_artifact_version
+from data_loader import data_version
+from data_shards import MANIFEST_NAME, SHARD_FORMAT
+from json_stream import JsonStreamError, iter_events
+from postal_resolver import CSV_PATH, TABLE_PATH, build_postal_table, postal_table_is_stale
 
 
 def validate_json_syntax(file_path: Path) -> tuple[bool, str]:
@@ -22,9 +44,67 @@ def validate_json_syntax(file_path: Path) -> tuple[bool, str]:
         return False, f"❌ ファイル読み込みエラー: {e}"
 
 
-def validate_structure(data: Dict) -> List[str]:
-    """データ構造を検証"""
+def parallel_map(func: Callable[[Any], Any], items: List[Any], jobs: int = 1) -> List[Any]:
+    """
+    jobs が2以上ならプロセスプールで並列に実行する（結果は常に入力の順序）
+    要素はまとまった件数ごとに各プロセスへ渡し、プロセス間通信の回数を抑える
+    """
+    if jobs <= 1 or len(items) < 2:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, items, chunksize=max(1, len(items) // (jobs * 4))))
+
+
+def _validate_indexed_party(item: Tuple[int, Dict]) -> List[str]:
+    index, party = item
+    return validate_party(party, index)
+
+
+def _validate_named_district(item: Tuple[str, List]) -> List[str]:
+    district_name, candidates = item
+    return validate_district(district_name, candidates)
+
+
+def source_hash(source: str) -> str:
+    """政党1件・選挙区1件の元のテキスト（UTF-8のバイト列）の内容ハッシュ"""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _check_items(items: List[Tuple[str, Any, Any]], func: Callable[[Any], List[str]],
+                 statistics: Callable[[Any], Dict[str, Any]], cache: Optional["ValidationCache"],
+                 sources: Optional[List[str]], jobs: int) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    政党・選挙区ごとの (問題点, 統計情報)（items は (キャッシュのキー, 検証関数の引数, 統計情報の引数) の列）
+    cache と元のテキスト sources を渡すと、前回から内容の変わっていない要素は検証を省く
+    """
+    results: List[Optional[Tuple[List[str], Dict[str, Any]]]] = [None] * len(items)
+    pending: List[Tuple[int, Optional[str]]] = []
+    for pos, (key, _, _) in enumerate(items):
+        fingerprint = source_hash(sources[pos]) if cache is not None and sources is not None else None
+        cached = cache.lookup(key, fingerprint) if fingerprint is not None else None
+        if cached is not None:
+            results[pos] = cached
+        else:
+            pending.append((pos, fingerprint))
+
+    checked = parallel_map(func, [items[pos][1] for pos, _ in pending], jobs)
+    for (pos, fingerprint), item_issues in zip(pending, checked):
+        results[pos] = item_issues, statistics(items[pos][2])
+        if fingerprint is not None:
+            cache.store(items[pos][0], fingerprint, *results[pos])
+    return results
+
+
+def validate_document(data: Dict, jobs: int = 1, cache: Optional["ValidationCache"] = None,
+                      sources: Optional[Dict[str, Any]] = None) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    データ構造を検証し、問題点と統計情報を返す（jobs が2以上なら政党・選挙区の検証を並列に行う）
+    sources（{"parties": [元のテキスト], "districts": {選挙区名: 元のテキスト}}）と cache を渡すと、
+    前回から内容の変わっていない政党・選挙区は前回の結果を使う
+    """
     issues = []
+    stats_parts = []
+    sources = sources or {}
     
     # トップレベルのキーをチェック
     if "parties" not in data:
@@ -41,9 +121,11 @@ def validate_structure(data: Dict) -> List[str]:
         elif len(parties) == 0:
             issues.append("⚠️  'parties' が空です")
         else:
-            for i, party in enumerate(parties):
-                party_issues = validate_party(party, i)
+            items = [(f"party[{i}]", (i, party), {"parties": [party]}) for i, party in enumerate(parties)]
+            for party_issues, party_stats in _check_items(items, _validate_indexed_party, get_statistics,
+                                                          cache, sources.get("parties"), jobs):
                 issues.extend(party_issues)
+                stats_parts.append(party_stats)
     
     # districts の検証
     if "districts" in data:
@@ -54,11 +136,56 @@ def validate_structure(data: Dict) -> List[str]:
         elif len(districts) == 0:
             issues.append("⚠️  'districts' が空です")
         else:
-            for district_name, candidates in districts.items():
-                district_issues = validate_district(district_name, candidates)
+            district_sources = sources.get("districts")
+            items = [(f"district[{name}]", (name, candidates), {"districts": {name: candidates}})
+                     for name, candidates in districts.items()]
+            for district_issues, district_stats in _check_items(
+                    items, _validate_named_district, get_statistics, cache,
+                    [district_sources[name] for name in districts] if district_sources is not None else None,
+                    jobs):
                 issues.extend(district_issues)
+                stats_parts.append(district_stats)
     
-    return issues
+    # district_areas の検証（オプション）
+    if "district_areas" in data:
+        issues.extend(validate_district_areas(data["district_areas"], data.get("districts")))
+    
+    return issues, merge_statistics(stats_parts)
+
+
+def validate_structure(data: Dict, jobs: int = 1) -> List[str]:
+    """データ構造を検証（jobs が2以上なら政党・選挙区の検証を並列に行う）"""
+    return validate_document(data, jobs)[0]
+
+
+def parse_with_sources(text: str) -> Tuple[Dict, Dict[str, Any]]:
+    """
+    JSONを解析し、データと、政党・選挙区ごとの元のテキストを返す（結果は json.loads と同じ）
+    構文エラーは json.JSONDecodeError
+    """
+    data: Dict[str, Any] = {}
+    sources: Dict[str, Any] = {}
+    try:
+        # ファイル全体を1回で読み込ませ、要素ごとの解析し直しを避ける
+        for kind, key, name, value, source in iter_events(io.StringIO(text), ("parties", "districts"),
+                                                          chunk_size=max(len(text), 1), sources=True):
+            if kind in ("member", "start"):
+                data[key] = value
+                if kind == "start":
+                    sources[key] = [] if isinstance(value, list) else {}
+                else:
+                    sources.pop(key, None)
+            elif kind == "item":
+                if isinstance(data[key], list):
+                    data[key].append(value)
+                    sources[key].append(source)
+                else:
+                    data[key][name] = value
+                    sources[key][name] = source
+    except JsonStreamError:
+        # 構文エラーは json.load と同じ形式で送出し、トップレベルが辞書でないだけなら要素ごとの元のテキストなしで返す
+        return json.loads(text), {}
+    return data, sources
 
 
 def validate_party(party: Dict, index: int) -> List[str]:
@@ -136,6 +263,13 @@ def validate_party(party: Dict, index: int) -> List[str]:
                 if not isinstance(explanation, str):
                     issues.append(f"❌ {party_name} - {topic}の解説: 文字列である必要があります")
     
+    # aliases の検証（オプション: 候補者データで使う略称）
+    if "aliases" in party:
+        aliases = party["aliases"]
+        
+        if not isinstance(aliases, list) or not all(isinstance(a, str) for a in aliases):
+            issues.append(f"❌ {party_name}: 'aliases' は文字列のリストである必要があります")
+    
     return issues
 
 
@@ -171,6 +305,313 @@ def validate_district(district_name: str, candidates: List) -> List[str]:
     return issues
 
 
+def validate_district_areas(areas: Any, districts: Any) -> List[str]:
+    """選挙区の市区町村データ（検索用）を検証"""
+    issues = []
+    
+    if not isinstance(areas, dict):
+        issues.append("❌ 'district_areas' は辞書である必要があります")
+        return issues
+    
+    for district_name, entries in areas.items():
+        if isinstance(districts, dict) and district_name not in districts:
+            issues.append(f"⚠️  district_areas - {district_name}: 'districts' に存在しない選挙区です")
+        
+        if not isinstance(entries, list):
+            issues.append(f"❌ district_areas - {district_name}: 市区町村はリストである必要があります")
+            continue
+        
+        for i, entry in enumerate(entries):
+            if isinstance(entry, str):
+                continue
+            if not isinstance(entry, dict) or not entry.get("name"):
+                issues.append(f"❌ district_areas - {district_name}[{i}]: 文字列、または 'name' を持つ辞書である必要があります")
+    
+    return issues
+
+
+# 検証キャッシュの形式バージョン（キャッシュの構造を変えたら上げる）
+VALIDATION_CACHE_VERSION = 2
+
+# 検証結果・コンパイル結果を左右するモジュール（どれかが変わったらキャッシュ全体を捨てる）
+VALIDATOR_MODULES = ("validate_data.py", "json_stream.py", "data_shards.py", "data_artifact.py", "election_store.py")
+
+
+def validation_cache_path(json_file: Path) -> Path:
+    """検証キャッシュのパス（election_data.json → election_data.validation_cache.json）"""
+    return json_file.with_name(f"{json_file.stem}.validation_cache.json")
+
+
+def content_hash(value: Any) -> str:
+    """マニフェストの項目など、小さな値の内容ハッシュ"""
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ValidationCache:
+    """
+    前回の検証結果（問題点と統計情報）を、対象ファイルの内容ハッシュとともに保持するサイドカー
+    - 単一ファイル: ファイル全体のハッシュが同じなら解析・検証をすべて省く（--stream とそれ以外は別に保持する）。
+      変わっていれば、政党1件・選挙区1件ごとの元のテキストのハッシュが同じものだけ検証を省く
+    - 分割形式: 政党1件・選挙区1件ごとのシャードのハッシュが同じものは、読み込み・検証を省く
+    検証スクリプトや関係するモジュール（VALIDATOR_MODULES）が変わった場合は結果が変わり得るため、キャッシュ全体を捨てる
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self._previous = entries or {}
+        self._current: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def validator_hash() -> str:
+        digest = hashlib.sha256()
+        for name in VALIDATOR_MODULES:
+            digest.update(name.encode('utf-8'))
+            digest.update(hashlib.sha256((Path(__file__).parent / name).read_bytes()).digest())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, path: Path) -> "ValidationCache":
+        """保存済みのキャッシュを読み込む（無い・壊れている・検証スクリプトが変わった場合は空）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if (not isinstance(saved, dict) or saved.get("version") != VALIDATION_CACHE_VERSION
+                or saved.get("validator") != cls.validator_hash() or not isinstance(saved.get("entries"), dict)):
+            return cls(path)
+        return cls(path, saved["entries"])
+
+    def lookup(self, key: str, fingerprint: str) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+        """内容が前回と同じなら前回の (問題点, 統計情報) を返す"""
+        entry = self._previous.get(key)
+        if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+            return None
+        self.hits += 1
+        self._current[key] = entry
+        stats = dict(entry["stats"])
+        for name in ("professions", "general_topics"):
+            if name in stats:
+                stats[name] = set(stats[name])
+        return list(entry["issues"]), stats
+
+    def store(self, key: str, fingerprint: str, issues: List[str], stats: Dict[str, Any], summary: bool = False):
+        """検証し直した結果を記録する（summary はファイル全体の結果で、検証し直した件数には数えない）"""
+        if not summary:
+            self.misses += 1
+        self._current[key] = {
+            "fingerprint": fingerprint,
+            "issues": issues,
+            "stats": {name: sorted(value) if isinstance(value, set) else value for name, value in stats.items()},
+        }
+
+    def keep_previous(self):
+        """前回の結果をすべて今回も参照したものとして残す（ファイル全体が前回と同じで、要素ごとの検証を省いた場合）"""
+        for key, entry in self._previous.items():
+            self._current.setdefault(key, entry)
+
+    def save(self):
+        """今回参照した結果だけを保存する（削除された政党・選挙区の結果は残さない）"""
+        saved = {"version": VALIDATION_CACHE_VERSION, "validator": self.validator_hash(), "entries": self._current}
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, ensure_ascii=False)
+        tmp_path.replace(self.path)
+
+
+def _validate_party_shard(party: Any, entry: Dict, index: int) -> Tuple[List[str], Dict[str, Any]]:
+    """政党シャード1件: マニフェストとの一致と政党データの構造を検証"""
+    if not isinstance(party, dict):
+        return [f"❌ 政党[{index}]: 辞書である必要があります"], {}
+    issues = []
+    if entry.get("name") != (party.get("name") or "不明な政党"):
+        issues.append(f"❌ マニフェスト - 政党[{index}]: 'name' がシャードの内容と一致しません")
+    pp = party.get("personalized_policies")
+    professions = sorted(k for k, v in pp.items() if isinstance(v, (list, str))) if isinstance(pp, dict) else []
+    gp = party.get("general_policies")
+    topics = sorted(gp) if isinstance(gp, dict) else []
+    if entry.get("professions") != professions or entry.get("topics") != topics:
+        issues.append(f"❌ マニフェスト - 政党[{index}]: 職種・トピックの一覧がシャードの内容と一致しません")
+    issues.extend(validate_party(party, index))
+    return issues, get_statistics({"parties": [party]})
+
+
+def _validate_district_shard(shard: Any, entry: Dict, label: str) -> Tuple[List[str], Dict[str, Any]]:
+    """選挙区シャード1件: マニフェストとの一致と候補者データの構造を検証"""
+    if not isinstance(shard, dict) or shard.get("name") != label:
+        return [f"❌ {label}: シャードの 'name' がマニフェストと一致しません"], {}
+    issues = []
+    candidates = shard.get("candidates")
+    if isinstance(candidates, list):
+        labels = [str(c.get("party", "無所属")) for c in candidates if isinstance(c, dict)]
+        if entry.get("candidate_parties") != labels:
+            issues.append(f"❌ マニフェスト - {label}: 候補者の所属政党一覧がシャードの内容と一致しません")
+    issues.extend(validate_district(label, candidates))
+    return issues, get_statistics({"districts": {label: candidates}})
+
+
+def _check_shard(task: Tuple[bytes, str, Dict, str, int, str, str]) -> Tuple[List[str], Dict[str, Any]]:
+    """シャード1件の解析と検証（プロセスプールで実行できるよう、読み込み済みの内容を受け取る）"""
+    raw, digest, entry, kind, index, label, shard_file = task
+    try:
+        value = json.loads(raw.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return [f"❌ {label}: JSON構文エラー（{shard_file}）: {e}"], {}
+    
+    issues = []
+    if entry.get("sha256") and digest != entry["sha256"]:
+        issues.append(f"❌ {label}: シャードのハッシュがマニフェストと一致しません。アプリはこのシャードを読み込みません"
+                      f"（data_shards.py で作り直してください）")
+    if kind == "party":
+        shard_issues, stats = _validate_party_shard(value, entry, index)
+    else:
+        shard_issues, stats = _validate_district_shard(value, entry, label)
+    issues.extend(shard_issues)
+    return issues, stats
+
+
+def validate_sharded(directory: Path, cache: Optional[ValidationCache] = None,
+                     jobs: int = 1) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """
+    分割形式を検証し、問題点と統計情報を返す（マニフェスト自体が読めない場合、統計情報は None）
+    各シャードのJSON構文・ハッシュ、マニフェストの索引情報との一致、政党・選挙区の構造を確認する
+    cache を渡すと、前回から変わっていないシャードは解析・検証を省く
+    jobs が2以上なら、変わったシャードの解析・検証をプロセスプールで並列に行う
+    """
+    manifest_file = directory / MANIFEST_NAME
+    is_valid, message = validate_json_syntax(manifest_file)
+    if not is_valid:
+        return [f"{message}（{manifest_file}）"], None
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    if not isinstance(manifest, dict) or manifest.get("format") != SHARD_FORMAT:
+        return [f"❌ マニフェストの 'format' は '{SHARD_FORMAT}' である必要があります"], None
+    
+    party_entries = manifest.get("parties", [])
+    district_entries = manifest.get("districts", [])
+    
+    # (キャッシュのキー, 表示名, 種類, 位置, マニフェストの項目)
+    shards = [(f"party[{i}]", f"政党[{i}]", "party", i, entry) for i, entry in enumerate(party_entries)]
+    district_names = {}
+    for i, entry in enumerate(district_entries):
+        label = entry.get("name", "不明な選挙区") if isinstance(entry, dict) else "不明な選挙区"
+        district_names[label] = None
+        shards.append((f"district[{i}]", label, "district", i, entry))
+    
+    # 読み込みとハッシュ計算はここで行い、前回から変わったシャードだけを解析・検証に回す
+    results: List[Optional[Tuple[List[str], Dict[str, Any]]]] = [None] * len(shards)
+    pending: List[Tuple[int, str]] = []
+    tasks = []
+    for pos, (key, label, kind, index, entry) in enumerate(shards):
+        if not isinstance(entry, dict) or not isinstance(entry.get("file"), str):
+            results[pos] = [f"❌ マニフェスト - {label}: 'file' がありません"], {}
+            continue
+        shard_file = directory / entry["file"]
+        try:
+            raw = shard_file.read_bytes()
+        except FileNotFoundError:
+            results[pos] = [f"❌ {label}: シャードが見つかりません: {shard_file}"], {}
+            continue
+        
+        digest = hashlib.sha256(raw).hexdigest()
+        fingerprint = f"{digest}:{content_hash(entry)}"
+        cached = cache.lookup(key, fingerprint) if cache is not None else None
+        if cached is not None:
+            results[pos] = cached
+            continue
+        pending.append((pos, fingerprint))
+        tasks.append((raw, digest, entry, kind, index, label, str(shard_file)))
+    
+    for (pos, fingerprint), result in zip(pending, parallel_map(_check_shard, tasks, jobs)):
+        results[pos] = result
+        if cache is not None:
+            cache.store(shards[pos][0], fingerprint, *result)
+    
+    # validate_structure と同じ順序（政党 → 選挙区 → district_areas）で並べる
+    issues = []
+    if not party_entries:
+        issues.append("⚠️  'parties' が空です")
+    for shard_issues, _ in results[:len(party_entries)]:
+        issues.extend(shard_issues)
+    if not district_entries:
+        issues.append("⚠️  'districts' が空です")
+    for shard_issues, _ in results[len(party_entries):]:
+        issues.extend(shard_issues)
+    if "district_areas" in manifest:
+        issues.extend(validate_district_areas(manifest["district_areas"], district_names))
+    
+    return issues, merge_statistics([stats for _, stats in results])
+
+
+def validate_stream(json_file: Path, stats: Dict[str, Any],
+                    cache: Optional[ValidationCache] = None) -> Iterator[str]:
+    """
+    ファイルを先頭から一度だけ逐次解析し、政党・選挙区を1件読み終えるごとに検証して問題点を返す
+    ファイル全体を保持しないため、メモリ使用量は最も大きい政党・選挙区1件ぶん程度に収まる
+    統計情報は stats（get_statistics({}) で作ったもの）に加算していく
+    cache を渡すと、前回から内容の変わっていない政党・選挙区は前回の結果を使う
+
+    問題点の順序は、ファイル内のキーが parties → districts → district_areas の順なら validate_structure と同じ
+    （キーが無いことは最後まで読まないと分からないため、その指摘だけは末尾になる）
+    構文エラーは JsonStreamError（それまでに見つかった問題点は返し終えている）
+    """
+    expected = {"parties": list, "districts": dict}
+    present: Dict[str, bool] = {}  # キー → 型が正しいか
+    counts = {"parties": 0, "districts": 0}
+    district_names: Dict[str, None] = {}
+    areas: Any = None
+    has_areas = False
+    
+    with open(json_file, 'r', encoding='utf-8') as f:
+        for kind, key, name, value, source in iter_events(f, expected, sources=True):
+            if kind == "member":
+                if key in expected:
+                    present[key] = False
+                    yield f"❌ '{key}' は{'リスト' if key == 'parties' else '辞書'}である必要があります"
+                elif key == "district_areas":
+                    areas, has_areas = value, True
+            elif kind == "start":
+                present[key] = isinstance(value, expected[key])
+                if not present[key]:
+                    yield f"❌ '{key}' は{'リスト' if key == 'parties' else '辞書'}である必要があります"
+            elif kind == "item" and present[key]:
+                counts[key] += 1
+                if key == "parties":
+                    item = (f"party[{name}]", (name, value), {"parties": [value]})
+                    func = _validate_indexed_party
+                else:
+                    district_names[name] = None
+                    item = (f"district[{name}]", (name, value), {"districts": {name: value}})
+                    func = _validate_named_district
+                [(item_issues, item_stats)] = _check_items([item], func, get_statistics, cache, [source], 1)
+                yield from item_issues
+                _add_statistics(stats, item_stats)
+            elif kind == "end" and present[key] and counts[key] == 0:
+                yield f"⚠️  '{key}' が空です"
+    
+    # 同じ選挙区名が重複している場合、json.load と同様に1件として数える
+    stats["districts_count"] = len(district_names)
+    
+    for key in expected:
+        if key not in present:
+            yield f"❌ '{key}' キーが存在しません"
+    if has_areas:
+        yield from validate_district_areas(areas, district_names if present.get("districts") else None)
+
+
+def file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """ファイル全体を読み込まずに内容ハッシュを計算（data_version と同じ sha256）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def get_statistics(data: Dict) -> Dict[str, Any]:
     """データの統計情報を取得"""
     stats = {
@@ -206,10 +647,26 @@ def get_statistics(data: Dict) -> Dict[str, Any]:
     return stats
 
 
-def print_report(file_path: Path, data: Dict, issues: List[str], stats: Dict):
+def _add_statistics(stats: Dict[str, Any], part: Dict[str, Any]):
+    for name, value in part.items():
+        if isinstance(value, set):
+            stats[name] |= value
+        else:
+            stats[name] += value
+
+
+def merge_statistics(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """政党・選挙区ごとの統計情報を合算（分割形式・検証キャッシュ用）"""
+    stats = get_statistics({})
+    for part in parts:
+        _add_statistics(stats, part)
+    return stats
+
+
+def print_report(file_path: Path, issues: List[str], stats: Dict):
     """検証レポートを出力"""
     print("=" * 70)
-    print(f"📊 election_data.json 検証レポート")
+    print(f"📊 {file_path.name} 検証レポート")
     print("=" * 70)
     print()
     
@@ -275,35 +732,121 @@ def print_report(file_path: Path, data: Dict, issues: List[str], stats: Dict):
 
 def main():
     """メイン処理"""
-    # ファイルパスを取得
     script_dir = Path(__file__).parent
-    json_file = script_dir / "election_data.json"
+    parser = argparse.ArgumentParser(description="選挙データの構造を検証します")
+    parser.add_argument("path", nargs="?", default=str(script_dir / "election_data.json"),
+                        help="election_data.json、または分割形式のディレクトリ・manifest.json")
+    parser.add_argument("--no-compile", action="store_true",
+                        help="検証後にコンパイル済みデータ（election_data.bin）を作成しない")
+    parser.add_argument("--full", action="store_true",
+                        help="前回の検証結果を使わず、すべて検証し直す")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="並列に検証するプロセス数（0 でCPU数。分割形式で特に有効）")
+    parser.add_argument("--stream", action="store_true",
+                        help="単一ファイルを逐次解析して検証し、メモリ使用量を抑える（election_data.bin は作成しない）")
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    # ファイルパスを取得（ディレクトリまたは manifest.json なら分割形式）
+    json_file = Path(args.path)
+    if json_file.is_dir():
+        json_file = json_file / MANIFEST_NAME
     
     if not json_file.exists():
         print(f"❌ ファイルが見つかりません: {json_file}")
         sys.exit(1)
     
-    # JSON構文チェック
-    is_valid, message = validate_json_syntax(json_file)
-    if not is_valid:
-        print(message)
-        sys.exit(1)
-    
-    # データ読み込み
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    cache_file = validation_cache_path(json_file)
+    cache = ValidationCache(cache_file) if args.full else ValidationCache.load(cache_file)
+    raw = b""
     
-    # 構造検証
-    issues = validate_structure(data)
+    if json_file.name == MANIFEST_NAME:
+        # 分割形式: シャードごとに検証（変更のないシャードは前回の結果を再利用）
+        issues, stats = validate_sharded(json_file.parent, cache, jobs)
+        if stats is None:
+            for issue in issues:
+                print(issue)
+            sys.exit(1)
+    else:
+        # ファイル全体が前回と同じなら、解析・検証を省いて前回の結果を使う
+        # 変わっていれば、政党・選挙区ごとに元のテキストのハッシュを比べ、変わったものだけを検証し直す
+        # 逐次解析と一括解析では問題点の並び順が異なり得るため、ファイル全体の結果は方法ごとに保持する
+        summary_key = "file:stream" if args.stream else "file"
+        if args.stream:
+            fingerprint = file_hash(json_file)
+        else:
+            raw = json_file.read_bytes()
+            fingerprint = hashlib.sha256(raw).hexdigest()
+        cached = cache.lookup(summary_key, fingerprint)
+        if cached is not None:
+            issues, stats = cached
+            cache.keep_previous()
+        elif args.stream:
+            # 逐次解析: 政党・選挙区を1件ずつ読みながら検証する
+            stats = get_statistics({})
+            issues = []
+            try:
+                for issue in validate_stream(json_file, stats, cache):
+                    issues.append(issue)
+            except JsonStreamError as e:
+                print(f"❌ JSON構文エラー: {e}")
+                sys.exit(1)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"❌ ファイル読み込みエラー: {e}")
+                sys.exit(1)
+            cache.store(summary_key, fingerprint, issues, stats, summary=True)
+        else:
+            # JSON構文チェックを兼ねて一度だけ解析する（政党・選挙区ごとの元のテキストも取り出す）
+            try:
+                data, sources = parse_with_sources(raw.decode('utf-8'))
+            except json.JSONDecodeError as e:
+                print(f"❌ JSON構文エラー: {e}")
+                sys.exit(1)
+            except UnicodeDecodeError as e:
+                print(f"❌ ファイル読み込みエラー: {e}")
+                sys.exit(1)
+            
+            # 構造検証と統計情報
+            issues, stats = validate_document(data, jobs, cache, sources)
+            cache.store(summary_key, fingerprint, issues, stats, summary=True)
     
-    # 統計情報取得
-    stats = get_statistics(data)
+    try:
+        cache.save()
+    except OSError as e:
+        print(f"⚠️  検証キャッシュを保存できませんでした: {e}")
     
     # レポート出力
-    print_report(json_file, data, issues, stats)
+    print_report(json_file, issues, stats)
+    if cache.hits:
+        print(f"♻️  前回から変更のない {cache.hits}件は検証結果を再利用しました"
+              f"（検証し直した件数: {cache.misses}件。すべて検証し直すには --full）")
+    
+    has_errors = any(issue.startswith("❌") for issue in issues)
+    
+    # コンパイル済みデータの作成（単一ファイルのみ。分割形式はもともと遅延読み込みのため不要）
+    if not has_errors and not args.no_compile and json_file.name != MANIFEST_NAME:
+        out_path = artifact_path(json_file)
+        # --stream ではファイルを読み込んでいないため、逐次計算したハッシュから求める（data_version と同じ値）
+        version = fingerprint[:16] if args.stream else data_version(raw)
+        if read_artifact_version(out_path) != version:
+            if args.stream:
+                # コンパイルにはデータ全体が必要なため、逐次解析では作成しない
+                print(f"ℹ️  --stream では {out_path.name} を作成しません（python data_artifact.py で作成できます）")
+            else:
+                compile_artifact(raw, out_path, version)
+                print(f"📦 コンパイル済みデータを作成しました: {out_path.name}（{out_path.stat().st_size:,} バイト）")
+                print("   アプリは election_data.json と内容が一致する場合のみこちらを読み込みます。")
+    
+    # 郵便番号・市区町村の解決表の作成（アプリは作成済みの表を開くだけ）
+    if not has_errors and not args.no_compile and postal_table_is_stale():
+        count = build_postal_table()
+        if count:
+            print(f"📮 郵便番号・市区町村の解決表を作成しました: {TABLE_PATH.name}（{count}件）")
+        else:
+            print(f"ℹ️  {CSV_PATH.name} に登録が無いため、郵便番号・市区町村検索は無効です")
     
     # 終了コード
-    if any(issue.startswith("❌") for issue in issues):
+    if has_errors:
         sys.exit(1)  # エラーあり
     else:
         sys.exit(0)  # 正常終了